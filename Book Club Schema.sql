@@ -13,13 +13,15 @@ USE db11;
 CREATE TABLE Publishers (
     publisher_id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) UNIQUE NOT NULL,
-    INDEX idx_name (name)
+    INDEX idx_name (name),
+    FULLTEXT INDEX ft_name (name)
 ) ENGINE=InnoDB;
 
 CREATE TABLE Authors (
     author_id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
-    INDEX idx_name (name)
+    UNIQUE INDEX idx_name (name),
+    FULLTEXT INDEX ft_name (name)
 ) ENGINE=InnoDB;
 
 CREATE TABLE Books (
@@ -30,6 +32,7 @@ CREATE TABLE Books (
     image_url VARCHAR(255),
     INDEX idx_title (title),
     INDEX idx_year (year_of_publication),
+    FULLTEXT INDEX ft_title (title),
     FOREIGN KEY (publisher_id) REFERENCES Publishers(publisher_id)
         ON DELETE SET NULL
         ON UPDATE CASCADE
@@ -75,6 +78,73 @@ CREATE TABLE Ratings (
         ON UPDATE CASCADE
 ) ENGINE=InnoDB;
 
+-- Per-book rating aggregates, maintained by ratings_dao in the same transaction as Ratings
+CREATE TABLE Book_Rating_Stats (
+    ISBN VARCHAR(13) PRIMARY KEY,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    r0 INT NOT NULL DEFAULT 0,
+    r1 INT NOT NULL DEFAULT 0,
+    r2 INT NOT NULL DEFAULT 0,
+    r3 INT NOT NULL DEFAULT 0,
+    r4 INT NOT NULL DEFAULT 0,
+    r5 INT NOT NULL DEFAULT 0,
+    r6 INT NOT NULL DEFAULT 0,
+    r7 INT NOT NULL DEFAULT 0,
+    r8 INT NOT NULL DEFAULT 0,
+    r9 INT NOT NULL DEFAULT 0,
+    r10 INT NOT NULL DEFAULT 0,
+    avg_rating DECIMAL(6,4) AS (rating_sum / NULLIF(rating_count, 0)) STORED,
+    INDEX idx_avg_rating (avg_rating, rating_count),
+    INDEX idx_rating_count (rating_count),
+    FOREIGN KEY (ISBN) REFERENCES Books(ISBN)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- Per-user rating summary and per-(user, author) rating counts, maintained by ratings_dao
+CREATE TABLE User_Rating_Summary (
+    user_id INT PRIMARY KEY,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    r0 INT NOT NULL DEFAULT 0,
+    r1 INT NOT NULL DEFAULT 0,
+    r2 INT NOT NULL DEFAULT 0,
+    r3 INT NOT NULL DEFAULT 0,
+    r4 INT NOT NULL DEFAULT 0,
+    r5 INT NOT NULL DEFAULT 0,
+    r6 INT NOT NULL DEFAULT 0,
+    r7 INT NOT NULL DEFAULT 0,
+    r8 INT NOT NULL DEFAULT 0,
+    r9 INT NOT NULL DEFAULT 0,
+    r10 INT NOT NULL DEFAULT 0,
+    distinct_authors INT NOT NULL DEFAULT 0,
+    top_author_id INT NULL,
+    avg_rating DECIMAL(6,4) AS (rating_sum / NULLIF(rating_count, 0)) STORED,
+    min_rating TINYINT AS (CASE WHEN r0 > 0 THEN 0 WHEN r1 > 0 THEN 1 WHEN r2 > 0 THEN 2 WHEN r3 > 0 THEN 3 WHEN r4 > 0 THEN 4 WHEN r5 > 0 THEN 5 WHEN r6 > 0 THEN 6 WHEN r7 > 0 THEN 7 WHEN r8 > 0 THEN 8 WHEN r9 > 0 THEN 9 WHEN r10 > 0 THEN 10 END) STORED,
+    max_rating TINYINT AS (CASE WHEN r10 > 0 THEN 10 WHEN r9 > 0 THEN 9 WHEN r8 > 0 THEN 8 WHEN r7 > 0 THEN 7 WHEN r6 > 0 THEN 6 WHEN r5 > 0 THEN 5 WHEN r4 > 0 THEN 4 WHEN r3 > 0 THEN 3 WHEN r2 > 0 THEN 2 WHEN r1 > 0 THEN 1 WHEN r0 > 0 THEN 0 END) STORED,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    FOREIGN KEY (top_author_id) REFERENCES Authors(author_id)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE User_Author_Counts (
+    user_id INT,
+    author_id INT,
+    rating_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, author_id),
+    INDEX idx_user_count (user_id, rating_count),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    FOREIGN KEY (author_id) REFERENCES Authors(author_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
 CREATE TABLE Book_Clubs (
     club_id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Standalone micro-benchmarks, run from the project root with python -m benchmarks.<name>
+"""
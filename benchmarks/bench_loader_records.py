@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Loader record-building benchmark
+Compares the old iterrows loop against the column-wise builders (data_loader/records.py)
+
+A synthetic ratings.csv in the Book-Crossing format is written to a temporary
+directory and read in the loader's 50k-row chunks, so no database is needed.
+Run from the project root:
+
+    python -m benchmarks.bench_loader_records --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_loader'))
+
+from records import clean_ratings_chunk, to_records, rating_frame  # noqa: E402
+
+CHUNK_SIZE = 50000
+
+
+def write_ratings_csv(path, rows, users, books, seed=7):
+    """Synthetic ratings.csv (semicolon separated, quoted, with 0 ratings and bad ids mixed in)"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'User-ID': rng.integers(1, users + users // 10, rows),
+        'ISBN': np.char.mod('%09dX', rng.integers(0, books + books // 10, rows)),
+        'Book-Rating': rng.integers(0, 11, rows),
+    })
+    frame.to_csv(path, sep=';', index=False, quoting=1, encoding='ISO-8859-1')
+
+
+def legacy_records(chunk):
+    """Record building as the loaders did it before: one boxed Series per row"""
+    records = []
+    for _, row in chunk.iterrows():
+        records.append((int(row['User-ID']), row['ISBN'], int(row['Book-Rating'])))
+    return records
+
+
+def run(path, build, valid_users, valid_books):
+    chunks = pd.read_csv(path, sep=';', encoding='ISO-8859-1', on_bad_lines='skip',
+                         chunksize=CHUNK_SIZE)
+    clean_seconds = build_seconds = 0.0
+    count = 0
+    for chunk in chunks:
+        started = time.perf_counter()
+        chunk = clean_ratings_chunk(chunk, valid_users, valid_books)
+        cleaned = time.perf_counter()
+        count += len(build(chunk))
+        build_seconds += time.perf_counter() - cleaned
+        clean_seconds += cleaned - started
+    return count, clean_seconds, build_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help="ratings in the synthetic CSV")
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--books', type=int, default=250000)
+    args = parser.parse_args(argv)
+
+    valid_users = set(range(1, args.users))
+    valid_books = set(f"{i:09d}X" for i in range(args.books))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ratings.csv')
+        print(f"Writing {args.rows:,} synthetic ratings...")
+        write_ratings_csv(path, args.rows, args.users, args.books)
+
+        results = {}
+        for name, build in (('iterrows', legacy_records),
+                            ('columnar', lambda chunk: to_records(rating_frame(chunk)))):
+            results[name] = run(path, build, valid_users, valid_books)
+            count, clean_seconds, build_seconds = results[name]
+            print(f"{name:>9}: {count:,} records, clean {clean_seconds:6.2f}s, "
+                  f"build {build_seconds:6.2f}s ({count / build_seconds:,.0f} records/s)")
+
+    old, new = results['iterrows'][2], results['columnar'][2]
+    assert results['iterrows'][0] == results['columnar'][0]
+    print(f"Record building speed-up: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
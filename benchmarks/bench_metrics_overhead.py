@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Query metrics overhead benchmark
+Measures what db.metrics adds to each statement issued through DBConnection
+
+By default only the instrumentation itself is timed (no database needed)
+and compared against a reference statement latency. With --live, SELECT 1
+is run against the configured database with metrics enabled and disabled.
+Run from the project root:
+
+    python -m benchmarks.bench_metrics_overhead
+    python -m benchmarks.bench_metrics_overhead --live
+"""
+
+import argparse
+import time
+
+from db.metrics import MetricsRegistry
+
+
+def search_books(registry):
+    # Stands in for a DAO function so caller_tag() walks a realistic stack
+    timer = registry.timer("SELECT 1", ('x',))
+    timer.acquired()
+    timer.rows = 20
+    timer.finish()
+
+
+def instrumentation_cost(iterations):
+    """Seconds per statement spent in timer()/acquired()/finish()"""
+    registry = MetricsRegistry(slow_query_ms=10 ** 9, slow_query_log=None)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        search_books(registry)
+    return (time.perf_counter() - start) / iterations
+
+
+def live_cost(iterations):
+    """Seconds per SELECT 1 with metrics on and off"""
+    from db.connection import db
+
+    def run():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            db.execute_query("SELECT 1", fetch_one=True)
+        return (time.perf_counter() - start) / iterations
+
+    run()   # warm the pool
+    results = {}
+    for enabled in (False, True, False, True):
+        db.metrics.enabled = enabled
+        results[enabled] = min(results.get(enabled, float('inf')), run())
+    db.metrics.enabled = True
+    return results[False], results[True]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--query-ms', type=float, default=0.2,
+                        help="reference statement latency for the overhead ratio (default: 0.2 ms)")
+    parser.add_argument('--live', action='store_true', help="also time SELECT 1 against the database")
+    args = parser.parse_args()
+
+    per_call = instrumentation_cost(args.iterations)
+    print(f"instrumentation: {per_call * 1e6:.2f} us per statement "
+          f"({per_call * 1000 / args.query_ms:.2%} of a {args.query_ms} ms statement)")
+
+    if args.live:
+        off, on = live_cost(min(args.iterations, 5000))
+        print(f"SELECT 1 metrics off: {off * 1e6:.1f} us, on: {on * 1e6:.1f} us "
+              f"(overhead {(on - off) / off:.2%})")
+
+
+if __name__ == "__main__":
+    main()
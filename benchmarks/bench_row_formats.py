@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Row format micro-benchmark
+Compares memory and build time of dict rows against compact records (db.rows)
+
+Rows are synthetic and shaped like books_dao.search_books results, so no
+database is needed. Run from the project root:
+
+    python -m benchmarks.bench_row_formats --rows 500 50000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from db.rows import record_type
+
+COLUMNS = ('ISBN', 'title', 'year_of_publication', 'image_url', 'publisher_name',
+           'publisher_id', 'authors', 'avg_rating', 'rating_count')
+
+
+def make_raw_rows(count):
+    """Tuples as a raw (non-dictionary) cursor would return them"""
+    return [
+        (f"{i:010d}", f"Book title {i}", 1990 + i % 30, f"http://images/{i}.jpg",
+         f"Publisher {i % 500}", i % 500, f"Author {i % 900}", 7.25, i % 40)
+        for i in range(count)
+    ]
+
+
+def build_dicts(raw_rows):
+    # Same construction the connector's dictionary cursor performs per row
+    return [dict(zip(COLUMNS, row)) for row in raw_rows]
+
+
+def build_records(raw_rows):
+    return list(map(record_type(COLUMNS), raw_rows))
+
+
+def measure(builder, raw_rows, repeat):
+    """Return (best build seconds, bytes retained by the built list)"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        rows = builder(raw_rows)
+        best = min(best, time.perf_counter() - start)
+        del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = builder(raw_rows)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return best, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[500, 50000],
+                        help="result sizes to measure")
+    parser.add_argument('--repeat', type=int, default=5, help="timing repetitions (best is kept)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'format':>8} {'build ms':>10} {'memory KiB':>11} {'bytes/row':>10}")
+    for count in args.rows:
+        raw_rows = make_raw_rows(count)
+        results = {}
+        for name, builder in (('dict', build_dicts), ('record', build_records)):
+            seconds, retained = measure(builder, raw_rows, args.repeat)
+            results[name] = (seconds, retained)
+            print(f"{count:>8} {name:>8} {seconds * 1000:>10.2f} {retained / 1024:>11.1f} "
+                  f"{retained / count:>10.1f}")
+
+        dict_time, dict_mem = results['dict']
+        rec_time, rec_mem = results['record']
+        print(f"{'':>8} {'ratio':>8} {rec_time / dict_time:>10.2f} {rec_mem / dict_mem:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
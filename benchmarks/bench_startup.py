@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Measures the time from process start to the main window's first paint
+
+Each run starts a fresh interpreter that launches the app the way main.py
+does and reports when its imports finished, when the window was built, when
+it was first painted and when the initial data loads had finished. Times are
+taken with time.monotonic() in both processes, measured from just before the
+child is spawned, so interpreter startup is included. Needs a display (use
+xvfb-run on a headless machine); the database is optional, without it the
+loads fail fast and only the paint times mean much. Run from the project root:
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MILESTONES = ('imported', 'window', 'painted', 'loaded')
+
+
+def child(timeout):
+    """Launch the app, print the milestone timestamps as JSON and exit"""
+    marks = {}
+    import tkinter as tk
+    import main
+    marks['imported'] = time.monotonic()
+
+    root = tk.Tk()
+    app = main.start(root)
+    marks['window'] = time.monotonic()
+
+    def painted(event):
+        if event.widget is root and 'painted' not in marks:
+            root.update_idletasks()
+            marks['painted'] = time.monotonic()
+            root.after(1, wait_for_loads)
+
+    def wait_for_loads():
+        # Initial loads are done when the task runner has nothing outstanding
+        if app.tasks.pending() and time.monotonic() - marks['painted'] < timeout:
+            root.after(5, wait_for_loads)
+            return
+        if not app.tasks.pending():
+            marks['loaded'] = time.monotonic()
+        finish()
+
+    def finish():
+        print(json.dumps(marks), flush=True)
+        app.close()
+
+    root.bind('<Expose>', painted)
+    root.after(int(timeout * 1000), finish)
+    root.mainloop()
+
+
+def run_once(timeout):
+    """Milestone times in seconds since the child process was spawned"""
+    started = time.monotonic()
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', '--timeout', str(timeout)],
+        cwd=ROOT, capture_output=True, text=True, timeout=timeout + 30
+    )
+    for line in reversed(output.stdout.splitlines()):
+        if line.startswith('{'):
+            marks = json.loads(line)
+            return {name: marks[name] - started for name in MILESTONES if name in marks}
+    raise RuntimeError(f"Startup run failed:\n{output.stderr.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='Seconds to wait for the window and its initial loads')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.timeout)
+        return
+
+    results = {name: [] for name in MILESTONES}
+    for run in range(args.runs):
+        marks = run_once(args.timeout)
+        for name, seconds in marks.items():
+            results[name].append(seconds)
+        print(f"  run {run + 1}: " + "  ".join(f"{name} {seconds * 1000:.0f} ms"
+                                              for name, seconds in marks.items()))
+
+    print(f"\nStartup over {args.runs} runs (ms since process start)")
+    print(f"  {'milestone':<10} {'min':>8} {'median':>8} {'max':>8}")
+    for name in MILESTONES:
+        times = results[name]
+        if times:
+            print(f"  {name:<10} {min(times) * 1000:8.0f} {statistics.median(times) * 1000:8.0f} "
+                  f"{max(times) * 1000:8.0f}")
+        else:
+            print(f"  {name:<10} {'-':>8} {'-':>8} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,51 @@ DB_CONFIG = {
     'use_unicode': True
 }
 
+# Connection pool (db/pool.py)
+POOL_CONFIG = {
+    'min_size': 1,              # idle connections kept warm
+    'max_size': 10,             # hard limit on open connections
+    'idle_timeout': 300,        # seconds before extra idle connections are closed
+    'max_lifetime': 3600,       # seconds before a connection is recycled
+    'acquire_timeout': 30,      # seconds to wait for a free connection
+    'health_check_after': 5     # idle seconds before a connection is pinged on checkout
+}
+
+# Prepared statements cached per pooled connection (LRU, keyed by SQL text)
+STATEMENT_CACHE_SIZE = 32
+
+# Author/publisher name -> id lookups cached per process (LRU)
+NAME_CACHE_SIZE = 4096
+
+# Query timing (db/metrics.py)
+METRICS_CONFIG = {
+    'enabled': True,
+    'sample_size': 1024,            # recent timings kept per caller for p50/p95/p99
+    'slow_query_ms': 500,           # statements slower than this go to the slow-query log
+    'slow_query_log': './logs/slow_queries.log',   # JSON lines; None disables the log
+    'log_params': False             # parameters may hold passwords - off by default
+}
+
+# EXPLAIN FORMAT=JSON captured once per statement shape for slow queries (db/explain.py)
+PLAN_CAPTURE_CONFIG = {
+    'enabled': True,
+    'store': './logs/query_plans.jsonl'     # report with: python -m db.explain
+}
+
+# Rows per page in the Books, Users and Ratings tabs
+PAGE_SIZE = 500
+
+# Background DAO calls from the UI (ui/tasks.py)
+TASK_CONFIG = {
+    'workers': 4,               # worker threads (each holds at most one pooled connection)
+    'poll_ms': 50               # how often the Tk loop picks up finished tasks
+}
+
+# Result tables that only create items for the visible rows (ui/virtual_tree.py)
+VIRTUAL_TREE_CONFIG = {
+    'page_size': 200            # rows read ahead of the view at a time
+}
+
 # Data file paths
 DATA_DIR = './data/'
 BOOKS_FILE = DATA_DIR + 'books.csv'
@@ -20,4 +65,49 @@ MAX_YEAR = 2025
 MIN_AGE = 6
 MAX_AGE = 120
 MIN_USER_RATINGS = 3
-BATCH_SIZE = 1000
\ No newline at end of file
+BATCH_SIZE = 1000
+BOOKS_CHUNK_SIZE = 20000    # books.csv rows per chunk in the streaming loader (--stream)
+
+# LOAD DATA LOCAL INFILE mode of the data loaders (python data_loader.py --bulk)
+BULK_LOAD_CONFIG = {
+    'enabled': False,           # default for --bulk
+    'disable_checks': False,    # default for --no-checks: skip unique/FK checks, then revalidate
+    'tmp_dir': None             # where the temporary TSV files go (None = system temp dir)
+}
+
+# Parallel ratings ingest (python data_loader.py --workers N)
+PARALLEL_LOAD_CONFIG = {
+    'workers': 1,               # default for --workers: writer connections (1 = sequential)
+    'processes': None,          # processes cleaning CSV chunks (None = one per CPU)
+    'queue_size': 8,            # batches buffered per writer before the reader waits
+    'errors_shown': 20          # failed rows printed at the end (all are counted)
+}
+
+# Progress of python data_loader.py, read back by --resume (data_loader/checkpoint.py)
+CHECKPOINT_CONFIG = {
+    'manifest': './logs/load_manifest.json'
+}
+
+# Cleaned CSV inputs cached as Parquet between loader runs (data_loader/cache.py, needs pyarrow)
+LOADER_CACHE_CONFIG = {
+    'enabled': True,
+    'dir': DATA_DIR + 'cache/'
+}
+
+# Synthetic dataset generator (data_loader/generate_synthetic.py); counts are for --scale 1
+SYNTHETIC_CONFIG = {
+    'seed': 42,
+    'users': 100000,
+    'books': 100000,
+    'ratings': 1000000,         # --scale 10 gives the 10M-rating dataset
+    'clubs': 2000,
+    'members': 60000,           # club memberships in total, creators included
+    'discussions': 20000,       # general and chapter discussions in total
+    'comments': 200000,
+    'zipf_books': 1.0,          # popularity exponents (rank ** -s)
+    'zipf_clubs': 1.0,
+    'zipf_users': 0.8,          # how unevenly activity is spread over users
+    'zipf_threads': 1.0,        # comments per discussion
+    'max_ratings_per_user': 5000,
+    'chunk_size': 200000        # rows generated and written at a time
+}
@@ -0,0 +1,168 @@
+"""
+Bulk load helpers
+Write cleaned DataFrames to tab-separated files and load them with LOAD DATA LOCAL INFILE
+
+The server needs local_infile=ON (SET GLOBAL local_infile = 1) for the
+client-side file to be accepted.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+import mysql.connector
+import pandas as pd
+from config import DB_CONFIG, BULK_LOAD_CONFIG
+
+NULL = '\\N'
+
+# (child table, column, parent table, parent column) checked after a load without FK checks
+FOREIGN_KEYS = [
+    ('Books', 'publisher_id', 'Publishers', 'publisher_id'),
+    ('Book_Authors', 'ISBN', 'Books', 'ISBN'),
+    ('Book_Authors', 'author_id', 'Authors', 'author_id'),
+    ('Ratings', 'user_id', 'Users', 'user_id'),
+    ('Ratings', 'ISBN', 'Books', 'ISBN'),
+]
+
+# (table, unique columns, primary key) checked after a load without unique checks.
+# Primary keys are always enforced, so only secondary unique keys are listed.
+UNIQUE_KEYS = [
+    ('Users', ('username',), 'user_id'),
+    ('Ratings', ('user_id', 'ISBN'), 'rating_id'),
+]
+
+
+def get_bulk_connection():
+    """Connection that may send local files to the server"""
+    return mysql.connector.connect(**DB_CONFIG, allow_local_infile=True)
+
+
+def _escape(series):
+    """Render a column in LOAD DATA's default text format (backslash escapes, \\N for NULL)"""
+    missing = series.isna()
+    if pd.api.types.is_float_dtype(series):
+        # Integer columns holding NULLs come out of pandas as floats
+        text = series.fillna(0).astype('int64').astype(str)
+    else:
+        text = (series.astype(str)
+                .str.replace('\\', '\\\\', regex=False)
+                .str.replace('\t', '\\t', regex=False)
+                .str.replace('\n', '\\n', regex=False)
+                .str.replace('\r', '\\r', regex=False))
+    return text.mask(missing, NULL)
+
+
+def write_tsv(df, columns, path, append=False):
+    """
+    Write columns of df to path as LOAD DATA input
+
+    Returns:
+        Number of rows written
+    """
+    if df.empty:
+        if not append:
+            open(path, 'w', encoding='utf-8').close()
+        return 0
+
+    fields = [_escape(df[column]) for column in columns]
+    lines = fields[0].str.cat(fields[1:], sep='\t') if len(fields) > 1 else fields[0]
+    with open(path, 'a' if append else 'w', encoding='utf-8', newline='\n') as out:
+        out.write('\n'.join(lines))
+        out.write('\n')
+    return len(df)
+
+
+def temp_tsv(prefix):
+    """Path of a new temporary file in BULK_LOAD_CONFIG['tmp_dir'] (system default if None)"""
+    handle, path = tempfile.mkstemp(prefix=prefix, suffix='.tsv', dir=BULK_LOAD_CONFIG['tmp_dir'])
+    os.close(handle)
+    return path
+
+
+def load_file(cursor, path, table, columns):
+    """
+    LOAD DATA LOCAL INFILE path into table (duplicate keys are skipped like INSERT IGNORE)
+
+    Returns:
+        Number of rows inserted
+    """
+    cursor.execute(
+        f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table} "
+        f"CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+        f"LINES TERMINATED BY '\\n' "
+        f"({', '.join(columns)})",
+        (os.path.abspath(path),)
+    )
+    return cursor.rowcount
+
+
+def bulk_insert(cursor, conn, df, table, columns):
+    """
+    Load columns of df into table through a temporary file and commit
+
+    Returns:
+        Number of rows inserted
+    """
+    path = temp_tsv(f"{table.lower()}_")
+    try:
+        write_tsv(df, columns, path)
+        rows = load_file(cursor, path, table, columns)
+        conn.commit()
+    finally:
+        os.remove(path)
+    return rows
+
+
+@contextmanager
+def relaxed_checks(cursor, enabled=True):
+    """Turn unique and foreign-key checks off for this session while the block runs"""
+    if not enabled:
+        yield
+        return
+    cursor.execute("SET SESSION unique_checks = 0")
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+    try:
+        yield
+    finally:
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.execute("SET SESSION unique_checks = 1")
+
+
+def revalidate(cursor, conn, tables):
+    """
+    Repair what the relaxed checks let through for the given tables
+
+    Rows whose foreign key has no parent are deleted, and for duplicate
+    unique keys only the row with the lowest primary key is kept.
+
+    Returns:
+        Dict of table -> number of rows removed
+    """
+    removed = {}
+
+    for table, columns, key in UNIQUE_KEYS:
+        if table not in tables:
+            continue
+        match = ' AND '.join(f"a.{column} = b.{column}" for column in columns)
+        cursor.execute(
+            f"DELETE a FROM {table} a JOIN {table} b ON {match} AND a.{key} > b.{key}"
+        )
+        removed[table] = removed.get(table, 0) + cursor.rowcount
+
+    for child, column, parent, parent_column in FOREIGN_KEYS:
+        if child not in tables:
+            continue
+        cursor.execute(
+            f"DELETE c FROM {child} c "
+            f"LEFT JOIN {parent} p ON p.{parent_column} = c.{column} "
+            f"WHERE c.{column} IS NOT NULL AND p.{parent_column} IS NULL"
+        )
+        removed[child] = removed.get(child, 0) + cursor.rowcount
+
+    conn.commit()
+    for table, rows in removed.items():
+        if rows:
+            print(f"    Revalidation removed {rows} invalid rows from {table}")
+    return removed
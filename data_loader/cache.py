@@ -0,0 +1,167 @@
+"""
+Cleaned input cache
+Parquet copies of the cleaned loader DataFrames, keyed by source file hash and filter settings
+
+A repeat load reads the Parquet file instead of parsing the CSV and running the
+row-wise cleaning again. Any change to the CSV contents, the filter settings or
+CACHE_VERSION gives a new key, and older files for the same input are deleted.
+
+Needs pyarrow; without it the loaders parse the CSVs as before.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+from config import LOADER_CACHE_CONFIG
+
+# Bump when the cleaning code changes in a way that alters the cached frames
+CACHE_VERSION = 1
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+_warned = False
+
+
+def cache_available():
+    """True when the cache is enabled and pyarrow is installed"""
+    global _warned
+    if not LOADER_CACHE_CONFIG['enabled']:
+        return False
+    if pq is None:
+        if not _warned:
+            print("    (pyarrow is not installed - cleaned-input cache disabled)")
+            _warned = True
+        return False
+    return True
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(name, source, settings):
+    """Cache file for input `name` built from source with the given settings"""
+    key = hashlib.sha256(json.dumps({
+        'version': CACHE_VERSION,
+        'source': file_hash(source),
+        'settings': settings,
+    }, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(LOADER_CACHE_CONFIG['dir'], f"{name}-{key}.parquet")
+
+
+def _replace(path, temp_path, name):
+    """Move a finished cache file into place and drop stale ones for the same input"""
+    os.replace(temp_path, path)
+    for stale in glob.glob(os.path.join(os.path.dirname(path), f"{name}-*.parquet")):
+        if stale != path:
+            os.remove(stale)
+
+
+def cached_frame(name, source, settings, build, use_cache=True):
+    """
+    Cleaned DataFrame for source, from the cache when possible
+
+    Args:
+        name: Input name ('books', 'users')
+        source: CSV file the frame is built from
+        settings: Dict of config values the cleaning depends on
+        build: Function returning the cleaned frame when the cache misses
+        use_cache: False to bypass the cache for this run
+
+    Returns:
+        The cleaned DataFrame
+    """
+    if not (use_cache and cache_available()):
+        return build()
+
+    path = cache_path(name, source, settings)
+    if os.path.exists(path):
+        print(f"  Using cached {name} ({os.path.basename(path)})")
+        return pd.read_parquet(path)
+
+    df = build()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    try:
+        df.to_parquet(temp_path, index=False)
+        _replace(path, temp_path, name)
+    except (pa.ArrowException, OSError) as e:
+        print(f"    Could not cache {name}: {e}")
+    return df
+
+
+def cached_chunks(name, source, settings, read_chunks, clean, skip=0, use_cache=True):
+    """
+    Cleaned chunks for a chunked source, from the cache when possible
+
+    Each chunk is stored as one Parquet row group, so a cached read yields
+    exactly the chunks the CSV would (chunk numbers stay valid for --resume).
+    The cache file is only kept if the whole source was read.
+
+    Args:
+        name: Input name ('ratings')
+        source: CSV file the chunks come from
+        settings: Dict of settings the chunks depend on (include the chunk size)
+        read_chunks: Function returning an iterator of raw CSV chunks
+        clean: Function cleaning one raw chunk (must not drop rows)
+        skip: Number of leading chunks not to yield (they are still cached)
+        use_cache: False to bypass the cache for this run
+
+    Yields:
+        Cleaned DataFrame chunks
+    """
+    if not (use_cache and cache_available()):
+        for index, chunk in enumerate(read_chunks()):
+            if index >= skip:
+                yield clean(chunk)
+        return
+
+    path = cache_path(name, source, settings)
+    if os.path.exists(path):
+        print(f"  Using cached {name} ({os.path.basename(path)})")
+        parquet = pq.ParquetFile(path)
+        for index in range(skip, parquet.num_row_groups):
+            yield parquet.read_row_group(index).to_pandas()
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    writer = None
+    caching = True
+    try:
+        for index, chunk in enumerate(read_chunks()):
+            if index < skip and not caching:
+                continue
+            chunk = clean(chunk)
+            if caching:
+                try:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(temp_path, table.schema)
+                    writer.write_table(table, row_group_size=max(len(chunk), 1))
+                except (pa.ArrowException, OSError) as e:
+                    print(f"    Could not cache {name}: {e}")
+                    caching = False
+            if index >= skip:
+                yield chunk
+        if writer is not None and caching:
+            writer.close()
+            writer = None
+            _replace(path, temp_path, name)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
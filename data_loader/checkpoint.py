@@ -0,0 +1,148 @@
+"""
+Load checkpoints
+JSON manifest of finished stages and committed chunk offsets, so an interrupted load can resume
+
+    {
+      "stages": {
+        "books":   {"status": "done", ...},
+        "ratings": {"status": "running", "source": {...}, "chunk_size": 50000,
+                    "chunks": 7, "rows": 331000, "dirty_through": 9}
+      }
+    }
+
+"chunks" is the committed prefix. Chunks after it up to "dirty_through" may
+have been partly written when the run stopped; loaders replay them with
+INSERT IGNORE on resume.
+
+Each stage's source CSV is fingerprinted (size and mtime); if the file has
+changed since the checkpoint, its offset is discarded and the stage starts over.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+def file_fingerprint(path):
+    """Size and modification time of a source file"""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+class Checkpoint:
+    """
+    Stage and chunk progress of one data load, saved after every change
+
+    Args:
+        path: Manifest file
+        resume: Keep the progress of a previous run; otherwise it is cleared
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stages = {}
+        if resume and os.path.exists(path):
+            with open(path, encoding='utf-8') as manifest:
+                self.stages = json.load(manifest).get('stages', {})
+        self._save()
+
+    def is_done(self, stage):
+        return self.stages.get(stage, {}).get('status') == 'done'
+
+    def start(self, stage, source=None, chunk_size=None):
+        """
+        Begin (or continue) a stage
+
+        Returns:
+            Number of chunks already committed for source, 0 when starting fresh
+        """
+        with self._lock:
+            previous = self.stages.get(stage, {})
+            fingerprint = file_fingerprint(source) if source else None
+            resumable = (
+                previous.get('status') == 'running'
+                and previous.get('source') == fingerprint
+                and previous.get('chunk_size') == chunk_size
+            )
+            if previous.get('chunks') and not resumable:
+                print(f"    Checkpoint for {stage} does not match {source}; starting the stage over")
+
+            self.stages[stage] = {
+                'status': 'running',
+                'source': fingerprint,
+                'chunk_size': chunk_size,
+                'chunks': previous.get('chunks', 0) if resumable else 0,
+                'rows': previous.get('rows', 0) if resumable else 0,
+                'dirty_through': previous.get('dirty_through', 0) if resumable else 0,
+                'started': previous.get('started') if resumable else time.time(),
+            }
+            self._save()
+            return self.stages[stage]['chunks']
+
+    def chunk_started(self, stage, chunk_num):
+        """Record that chunk_num is about to be written"""
+        with self._lock:
+            entry = self.stages[stage]
+            if chunk_num > entry.get('dirty_through', 0):
+                entry['dirty_through'] = chunk_num
+                self._save()
+
+    def replay_through(self, stage):
+        """Last chunk that may hold partly committed rows from an earlier run"""
+        return self.stages.get(stage, {}).get('dirty_through', 0)
+
+    def chunk_committed(self, stage, chunks, rows):
+        """Record that the first `chunks` chunks of the stage are committed (rows in total)"""
+        with self._lock:
+            entry = self.stages[stage]
+            entry['chunks'] = chunks
+            entry['rows'] = rows
+            self._save()
+
+    def rows(self, stage):
+        """Rows committed by the stage so far"""
+        return self.stages.get(stage, {}).get('rows', 0)
+
+    def done(self, stage):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {})
+            entry['status'] = 'done'
+            entry['finished'] = time.time()
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as manifest:
+            json.dump({'stages': self.stages}, manifest, indent=2)
+        # Atomic swap so a crash never leaves a half-written manifest
+        os.replace(temp_path, self.path)
+
+
+class NoCheckpoint:
+    """Stand-in used when loaders are run on their own"""
+
+    def is_done(self, stage):
+        return False
+
+    def start(self, stage, source=None, chunk_size=None):
+        return 0
+
+    def chunk_started(self, stage, chunk_num):
+        pass
+
+    def replay_through(self, stage):
+        return 0
+
+    def chunk_committed(self, stage, chunks, rows):
+        pass
+
+    def rows(self, stage):
+        return 0
+
+    def done(self, stage):
+        pass
@@ -4,9 +4,11 @@ Main data loader script for Book Club Database
 Orchestrates loading of all data from CSV files
 """
 
+import argparse
 import mysql.connector
 import time
-from config import DB_CONFIG
+from config import DB_CONFIG, BULK_LOAD_CONFIG, PARALLEL_LOAD_CONFIG, CHECKPOINT_CONFIG
+from checkpoint import Checkpoint
 from load_books import load_books_data
 from load_users import load_users_data
 from load_ratings import load_ratings_data
@@ -18,8 +20,36 @@ def get_connection():
     return mysql.connector.connect(**DB_CONFIG)
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load the Book-Crossing CSV files into the database")
+    parser.add_argument('--bulk', action='store_true', default=BULK_LOAD_CONFIG['enabled'],
+                        help="load through LOAD DATA LOCAL INFILE (needs local_infile=ON on the server)")
+    parser.add_argument('--no-checks', action='store_true', default=BULK_LOAD_CONFIG['disable_checks'],
+                        help="with --bulk, turn off unique/foreign-key checks during the load and revalidate afterwards")
+    parser.add_argument('--workers', type=int, default=PARALLEL_LOAD_CONFIG['workers'],
+                        help="writer connections for the ratings load (above 1 enables the parallel ingest)")
+    parser.add_argument('--stream', action='store_true',
+                        help="load books.csv in chunks with bounded memory (not with --bulk)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="parse the CSVs even if a cleaned copy is cached")
+    parser.add_argument('--resume', action='store_true',
+                        help=f"skip stages and chunks recorded as committed in {CHECKPOINT_CONFIG['manifest']}")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.bulk and args.workers > 1:
+        parser.error("--workers cannot be combined with --bulk")
+    if args.bulk and args.stream:
+        parser.error("--stream cannot be combined with --bulk")
+    return args
+
+
+def main(argv=None):
     """Main data loading orchestrator"""
+    args = parse_args(argv)
+    disable_checks = args.bulk and args.no_checks
+    checkpoint = Checkpoint(CHECKPOINT_CONFIG['manifest'], resume=args.resume)
+    
     print("=" * 60)
     print("BOOK CLUB DATABASE - DATA LOADER")
     print("=" * 60)
@@ -39,33 +69,54 @@ def main():
         
         # Load books (includes publishers and authors)
         print("\n[1/4] Loading Books, Authors, and Publishers...")
-        load_books_data()
+        if checkpoint.is_done('books'):
+            print("Already loaded - skipping (checkpoint)")
+        else:
+            load_books_data(bulk=args.bulk, disable_checks=disable_checks, use_cache=not args.no_cache,
+                            stream=args.stream, checkpoint=checkpoint)
+            checkpoint.done('books')
         
         # Load users
         print("\n[2/4] Loading Users...")
-        load_users_data()
+        if checkpoint.is_done('users'):
+            print("Already loaded - skipping (checkpoint)")
+        else:
+            load_users_data(bulk=args.bulk, disable_checks=disable_checks, checkpoint=checkpoint,
+                            use_cache=not args.no_cache)
+            checkpoint.done('users')
         
         # Load ratings
         print("\n[3/4] Loading Ratings...")
-        load_ratings_data()
+        if checkpoint.is_done('ratings'):
+            print("Already loaded - skipping (checkpoint)")
+        else:
+            load_ratings_data(bulk=args.bulk, disable_checks=disable_checks, workers=args.workers,
+                              checkpoint=checkpoint, use_cache=not args.no_cache)
+            checkpoint.done('ratings')
         
         # Generate sample clubs (optional)
         print("\n[4/4] Generating Sample Book Clubs...")
-        response = input("Generate sample book clubs? (y/n): ").strip().lower()
-        if response == 'y':
-            num_clubs = int(input("How many clubs? (10-20 recommended): "))
-            generate_sample_clubs(num_clubs)
+        if checkpoint.is_done('clubs'):
+            print("Already handled - skipping (checkpoint)")
         else:
-            print("Skipping sample club generation.")
+            response = input("Generate sample book clubs? (y/n): ").strip().lower()
+            if response == 'y':
+                num_clubs = int(input("How many clubs? (10-20 recommended): "))
+                generate_sample_clubs(num_clubs)
+            else:
+                print("Skipping sample club generation.")
+            checkpoint.done('clubs')
         
         elapsed_time = time.time() - start_time
         print("\n" + "=" * 60)
         print(f"[SUCCESS] DATA LOADING COMPLETE!")
+        print(f"Checkpoint manifest: {CHECKPOINT_CONFIG['manifest']}")
         print(f"Total time: {elapsed_time:.2f} seconds ({elapsed_time/60:.2f} minutes)")
         print("=" * 60)
         
     except Exception as e:
         print(f"\n[ERROR] {str(e)}")
+        print("Committed progress is saved - rerun with --resume to continue")
         import traceback
         traceback.print_exc()
         return 1
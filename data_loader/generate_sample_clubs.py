@@ -1,178 +1,225 @@
 import mysql.connector
 import random
 from datetime import datetime, timedelta
+from mysql.connector import Error
 from config import DB_CONFIG
 
+# Rows fetched per round trip while sampling
+FETCH_SIZE = 5000
+
 
 def get_connection():
     return mysql.connector.connect(**DB_CONFIG)
 
 
-def get_random_users(cursor, count):
-    """Get random user IDs"""
-    cursor.execute(f"SELECT user_id FROM Users ORDER BY RAND() LIMIT {count}")
-    return [row[0] for row in cursor.fetchall()]
-
-
-def get_random_books(cursor, count):
-    """Get random ISBNs"""
-    cursor.execute(f"SELECT ISBN FROM Books ORDER BY RAND() LIMIT {count}")
-    return [row[0] for row in cursor.fetchall()]
+def get_random_users(cursor, count, rng=random):
+    """
+    Get up to count random user IDs
+
+    Draws candidate ids from the MIN..MAX id range and keeps the ones that
+    exist, so only primary-key lookups are needed (no sort of the whole table).
+    """
+    cursor.execute("SELECT MIN(user_id), MAX(user_id), COUNT(*) FROM Users")
+    low, high, total = cursor.fetchone()
+    if not total:
+        return []
+    count = min(count, total)
+    density = total / (high - low + 1)
+
+    found = set()
+    while len(found) < count:
+        # Oversample by the share of the range that is actually used
+        needed = count - len(found)
+        candidates = list({rng.randint(low, high) for _ in range(int(needed / density * 1.2) + 10)} - found)
+        for start in range(0, len(candidates), FETCH_SIZE):
+            batch = candidates[start:start + FETCH_SIZE]
+            cursor.execute(
+                f"SELECT user_id FROM Users WHERE user_id IN ({', '.join(['%s'] * len(batch))})",
+                batch
+            )
+            found.update(row[0] for row in cursor.fetchall())
+
+    users = sorted(found)
+    rng.shuffle(users)
+    return users[:count]
+
+
+def get_random_books(cursor, count, rng=random):
+    """
+    Get up to count random ISBNs
+
+    ISBNs are strings, so there is no id range to draw from: the primary key is
+    streamed once and reservoir-sampled, keeping only count ISBNs in memory.
+    """
+    reservoir = []
+    seen = 0
+    cursor.execute("SELECT ISBN FROM Books")
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for (isbn,) in rows:
+            seen += 1
+            if len(reservoir) < count:
+                reservoir.append(isbn)
+            else:
+                index = rng.randrange(seen)
+                if index < count:
+                    reservoir[index] = isbn
+    rng.shuffle(reservoir)
+    return reservoir
 
 
 def create_club(cursor, name, description, is_public, creator_id):
     """Create a book club and return its ID"""
-    sql = """INSERT INTO Book_Clubs(name, description, is_public, created_by) 
+    sql = """INSERT INTO Book_Clubs(name, description, is_public, created_by)
              VALUES (%s, %s, %s, %s)"""
     cursor.execute(sql, (name, description, is_public, creator_id))
     return cursor.lastrowid
 
 
-def add_club_member(cursor, club_id, user_id, role='member'):
-    """Add a member to a club"""
+def add_club_members(cursor, club_id, members):
+    """Add members to a club; members is a list of (user_id, role) with distinct users"""
     sql = "INSERT INTO Club_Members(club_id, user_id, role) VALUES (%s, %s, %s)"
-    try:
-        cursor.execute(sql, (club_id, user_id, role))
-    except:
-        pass  # Member might already exist
+    cursor.executemany(sql, [(club_id, user_id, role) for user_id, role in members])
 
 
-def set_current_book(cursor, club_id, isbn):
-    sql = """INSERT INTO Reading_History(club_id, ISBN, start_date, end_date) 
-             VALUES (%s, %s, CURDATE(), NULL)"""
-    try:
-        cursor.execute(sql, (club_id, isbn))
-    except:
-        pass
-
-
-def add_to_queue(cursor, club_id, isbn, position, added_by):
-    """Add a book to reading queue"""
-    sql = """INSERT INTO Reading_Queue(club_id, ISBN, queue_position, added_by) 
+def add_to_queue(cursor, club_id, books, added_by):
+    """Add distinct books to a club's reading queue, in order"""
+    sql = """INSERT INTO Reading_Queue(club_id, ISBN, queue_position, added_by)
              VALUES (%s, %s, %s, %s)"""
-    try:
-        cursor.execute(sql, (club_id, isbn, position, added_by))
-    except:
-        pass  # Book might already be in queue
+    cursor.executemany(sql, [(club_id, isbn, position, added_by)
+                             for position, isbn in enumerate(books, start=1)])
+
 
+def past_reading_dates(rng=random):
+    """Random (start_date, end_date) of a book finished in the last few months"""
+    end_days_ago = rng.randint(10, 90)
+    start_days_ago = end_days_ago + rng.randint(14, 44)
 
-def add_to_history(cursor, club_id, isbn):
-    """Add a completed book to reading history (with end_date)"""
-    # Random dates in the past
-    end_days_ago = random.randint(10, 90)
-    start_days_ago = end_days_ago + random.randint(14, 44)
-    
     end_date = datetime.now() - timedelta(days=end_days_ago)
     start_date = datetime.now() - timedelta(days=start_days_ago)
-    
-    sql = """INSERT INTO Reading_History(club_id, ISBN, start_date, end_date) 
+    return start_date.date(), end_date.date()
+
+
+def add_to_history(cursor, club_id, current_book, finished_books, rng=random):
+    """Record the current book (no end date) and completed books with past dates"""
+    sql = """INSERT INTO Reading_History(club_id, ISBN, start_date, end_date)
              VALUES (%s, %s, %s, %s)"""
-    try:
-        cursor.execute(sql, (club_id, isbn, start_date.date(), end_date.date()))
-    except:
-        pass
+    rows = [(club_id, current_book, datetime.now().date(), None)]
+    rows += [(club_id, isbn, *past_reading_dates(rng)) for isbn in finished_books]
+    cursor.executemany(sql, rows)
 
 
-def create_general_discussion(cursor, club_id, user_id, title, content):
-    """Create a general discussion"""
-    sql = """INSERT INTO General_Discussions(club_id, user_id, title, content) 
+def create_general_discussions(cursor, club_id, discussions):
+    """Create general discussions from (user_id, title, content) tuples"""
+    sql = """INSERT INTO General_Discussions(club_id, user_id, title, content)
              VALUES (%s, %s, %s, %s)"""
-    cursor.execute(sql, (club_id, user_id, title, content))
+    cursor.executemany(sql, [(club_id, *discussion) for discussion in discussions])
 
 
-def create_chapter_discussion(cursor, club_id, isbn, chapter, user_id, title, content):
-    """Create a chapter discussion"""
-    sql = """INSERT INTO Chapter_Discussions(club_id, ISBN, chapter_number, user_id, title, content) 
+def create_chapter_discussions(cursor, club_id, isbn, discussions):
+    """Create chapter discussions from (chapter, user_id, title, content) tuples"""
+    sql = """INSERT INTO Chapter_Discussions(club_id, ISBN, chapter_number, user_id, title, content)
              VALUES (%s, %s, %s, %s, %s, %s)"""
-    cursor.execute(sql, (club_id, isbn, chapter, user_id, title, content))
-
+    cursor.executemany(sql, [(club_id, isbn, *discussion) for discussion in discussions])
+
+
+def create_sample_club(cursor, number, all_users, all_books, creator_id, rng=random):
+    """Insert one club with its members, books and discussions (caller commits)"""
+    club_name = f"Book Club {number}"
+    description = f"A wonderful book club for passionate readers!"
+    is_public = rng.choice([True, False])
+
+    club_id = create_club(cursor, club_name, description, is_public, creator_id)
+
+    # Creator is the admin, 5-15 random members, up to 3 of them moderators
+    members = [(creator_id, 'admin')]
+    member_ids = [creator_id]
+    moderator_count = 0
+    for member_id in rng.sample(all_users, min(rng.randint(5, 15), len(all_users))):
+        if member_id == creator_id:
+            continue
+        role = 'member'
+        if moderator_count < 3 and rng.random() < 0.2:
+            role = 'moderator'
+            moderator_count += 1
+        members.append((member_id, role))
+        member_ids.append(member_id)
+    add_club_members(cursor, club_id, members)
+
+    # Distinct books for the current book, the queue (2-5) and the history (1-3)
+    queue_size = rng.randint(2, 5)
+    history_size = rng.randint(1, 3)
+    books = rng.sample(all_books, min(1 + queue_size + history_size, len(all_books)))
+    current_book = books[0]
+    add_to_queue(cursor, club_id, books[1:1 + queue_size], creator_id)
+    add_to_history(cursor, club_id, current_book, books[1 + queue_size:], rng)
+
+    general = []
+    for j in range(rng.randint(1, 3)):
+        general.append((rng.choice(member_ids), f"General Discussion Topic {j + 1}",
+                        "This is an interesting topic for discussion!"))
+    create_general_discussions(cursor, club_id, general)
+
+    chapters = []
+    for _ in range(rng.randint(2, 4)):
+        chapter = rng.randint(1, 10)
+        chapters.append((chapter, rng.choice(member_ids), f"Chapter {chapter} Discussion",
+                         f"What did everyone think about chapter {chapter}?"))
+    create_chapter_discussions(cursor, club_id, current_book, chapters)
+    return club_name
+
+
+def generate_sample_clubs(num_clubs=15, seed=None):
+    """
+    Generate sample book clubs with members and discussions
+
+    Each club is inserted in one transaction with multi-row statements; a club
+    that fails is rolled back and reported, and the others are still created.
+
+    Args:
+        num_clubs: Number of clubs to create
+        seed: Seed for reproducible clubs (None = random)
+    """
 
-def generate_sample_clubs(num_clubs=15):
-    """Generate sample book clubs with members and discussions"""
-    
     print(f"  Generating {num_clubs} sample book clubs...")
-    
+    rng = random.Random(seed)
+
     conn = get_connection()
     cursor = conn.cursor()
-    
+    created = 0
+
     try:
         # Get random users and books
-        print("  Fetching random users and books...")
-        all_users = get_random_users(cursor, num_clubs * 20)
-        all_books = get_random_books(cursor, num_clubs * 10)
-        
+        print("  Sampling users and books...")
+        all_users = get_random_users(cursor, num_clubs * 20, rng)
+        all_books = get_random_books(cursor, num_clubs * 10, rng)
+        if not all_users or not all_books:
+            print("  [ERROR] Users and Books must be loaded before generating clubs")
+            return 0
+
         for i in range(num_clubs):
-            club_name = f"Book Club {i + 1}"
-            description = f"A wonderful book club for passionate readers!"
-            is_public = random.choice([True, False])
-            creator_id = all_users[i]
-            
-            # Create club
-            club_id = create_club(cursor, club_name, description, is_public, creator_id)
-            
-            # Add creator as admin
-            add_club_member(cursor, club_id, creator_id, 'admin')
-            
-            # Add random members (5-15 per club)
-            num_members = random.randint(5, 15)
-            member_ids = random.sample(all_users, num_members)
-            
-            moderator_count = 0
-            for member_id in member_ids:
-                if member_id == creator_id:
-                    continue
-                
-                # Randomly assign moderators (max 3)
-                role = 'member'
-                if moderator_count < 3 and random.random() < 0.2:
-                    role = 'moderator'
-                    moderator_count += 1
-                
-                add_club_member(cursor, club_id, member_id, role)
-            
-            # Set current book
-            current_book = random.choice(all_books)
-            set_current_book(cursor, club_id, current_book)
-            
-            # Add books to reading queue
-            queue_size = random.randint(2, 5)
-            for pos in range(1, queue_size + 1):
-                book = random.choice(all_books)
-                add_to_queue(cursor, club_id, book, pos, creator_id)
-            
-            # Add reading history
-            history_size = random.randint(1, 3)
-            for _ in range(history_size):
-                book = random.choice(all_books)
-                add_to_history(cursor, club_id, book)
-            
-            # Create general discussions
-            num_general = random.randint(1, 3)
-            for j in range(num_general):
-                user = random.choice(member_ids)
-                title = f"General Discussion Topic {j + 1}"
-                content = "This is an interesting topic for discussion!"
-                create_general_discussion(cursor, club_id, user, title, content)
-            
-            # Create chapter discussions
-            num_chapter = random.randint(2, 4)
-            for j in range(num_chapter):
-                user = random.choice(member_ids)
-                chapter = random.randint(1, 10)
-                title = f"Chapter {chapter} Discussion"
-                content = f"What did everyone think about chapter {chapter}?"
-                create_chapter_discussion(cursor, club_id, current_book, chapter, 
-                                        user, title, content)
-            
-            conn.commit()
-            print(f"    Created club {i + 1}/{num_clubs}: {club_name}")
-        
-        print(f"  [SUCCESS] Generated {num_clubs} sample clubs!")
-        
+            try:
+                club_name = create_sample_club(cursor, i + 1, all_users, all_books,
+                                               all_users[i % len(all_users)], rng)
+                conn.commit()
+                created += 1
+            except Error as e:
+                conn.rollback()
+                print(f"    [ERROR] Club {i + 1} was not created: {e}")
+                continue
+
+            if num_clubs <= 50 or (i + 1) % 100 == 0 or i + 1 == num_clubs:
+                print(f"    Created club {i + 1}/{num_clubs}: {club_name}")
+
+        print(f"  [SUCCESS] Generated {created} sample clubs!")
+        return created
+
     finally:
         cursor.close()
         conn.close()
 
 
 if __name__ == "__main__":
-    generate_sample_clubs(30)
\ No newline at end of file
+    generate_sample_clubs(30)
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator
+Production-scale users, books, ratings, clubs and discussions with skewed, reproducible distributions
+
+    python generate_synthetic.py --scale 10              # ~10M ratings into the database
+    python generate_synthetic.py --scale 10 --bulk       # same, through LOAD DATA LOCAL INFILE
+    python generate_synthetic.py --out ./data/synthetic  # TSV files + load.sql, no database
+
+Popularity follows Zipf's law (weight = rank ** -s): a few books collect most
+ratings, queue and history entries, a few clubs most members and discussions,
+and a few threads most comments. User activity is skewed the same way, capped
+at max_ratings_per_user. Every table draws from its own stream spawned from
+the seed, so the same seed and counts give the same rows; only the ids shift
+(they continue after the highest ids already in the database).
+
+Rows are generated and written chunk_size at a time, as multi-row INSERTs or
+LOAD DATA files (bulk_load.py). Generated keys are unique and reference rows
+generated before them, so --no-checks is safe and needs no revalidation.
+"""
+
+import argparse
+import os
+import time
+from contextlib import nullcontext
+from datetime import date
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+from config import DB_CONFIG, BATCH_SIZE, MIN_AGE, MAX_AGE, SYNTHETIC_CONFIG
+from bulk_load import get_bulk_connection, bulk_insert, relaxed_checks, write_tsv
+from records import to_records
+from load_ratings import rebuild_rating_stats
+
+# One random stream per table, in this order (appending is safe, reordering changes the data)
+STREAMS = ['catalog', 'users', 'ratings', 'clubs', 'members', 'queue', 'history',
+           'discussions', 'comments']
+
+WORDS = np.array([
+    'shadow', 'river', 'garden', 'secret', 'winter', 'empire', 'night', 'stone',
+    'silver', 'house', 'letters', 'journey', 'storm', 'island', 'summer', 'crown',
+    'forest', 'memory', 'light', 'city', 'dragon', 'ocean', 'daughter', 'war',
+    'song', 'glass', 'fire', 'mountain', 'heart', 'road', 'kingdom', 'promise',
+    'chapter', 'ending', 'character', 'plot', 'favourite', 'twist', 'pacing', 'theme',
+])
+
+LOCATIONS = np.array([
+    'toronto, ontario, canada', 'london, england, united kingdom', 'new york, new york, usa',
+    'barcelona, barcelona, spain', 'berlin, berlin, germany', 'seattle, washington, usa',
+    'sydney, new south wales, australia', 'portland, oregon, usa', 'madrid, madrid, spain',
+    'chicago, illinois, usa', 'vancouver, british columbia, canada', 'paris, ile de france, france',
+    'tel aviv, tel aviv, israel', 'milano, lombardia, italy', 'austin, texas, usa',
+    'lisboa, lisboa, portugal', 'dublin, dublin, ireland', 'auckland, auckland, new zealand',
+])
+
+MAX_ROUNDS = 50
+SECONDS_PER_DAY = 86400
+
+
+def get_connection():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def zipf_cdf(rng, n, exponent):
+    """
+    Cumulative Zipf weights over n items, ranks assigned in random order
+
+    Returns:
+        (probabilities, cdf)
+    """
+    weights = np.empty(n)
+    weights[rng.permutation(n)] = np.arange(1, n + 1, dtype=np.float64) ** -exponent
+    probabilities = weights / weights.sum()
+    cdf = np.cumsum(probabilities)
+    cdf[-1] = 1.0
+    return probabilities, cdf
+
+
+def draw(rng, cdf, size):
+    """size item indexes drawn from a cumulative distribution"""
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side='right'), len(cdf) - 1)
+
+
+def sample_unique(rng, wanted, cdf):
+    """
+    For every group g, draw wanted[g] distinct items from cdf
+
+    Duplicates are redrawn for MAX_ROUNDS rounds; a group that still falls
+    short (only possible when it wants most of the items) keeps fewer.
+
+    Returns:
+        (groups, items) sorted by group, then item
+    """
+    n_items = len(cdf)
+    group_ids = np.arange(len(wanted))
+    groups = np.repeat(group_ids, wanted)
+    items = draw(rng, cdf, len(groups))
+    for _ in range(MAX_ROUNDS):
+        keys = np.unique(groups.astype(np.int64) * n_items + items)
+        groups, items = keys // n_items, keys % n_items
+        missing = wanted - np.bincount(groups, minlength=len(wanted))
+        if not missing.any():
+            break
+        extra = np.repeat(group_ids, missing)
+        groups = np.concatenate([groups, extra])
+        items = np.concatenate([items, draw(rng, cdf, len(extra))])
+    return groups, items
+
+
+def group_positions(groups):
+    """0-based position of every row within its group (groups must be sorted)"""
+    return np.arange(len(groups)) - np.searchsorted(groups, groups, side='left')
+
+
+def spread_counts(rng, total, probabilities, cap):
+    """Split total over categories by probabilities with no category above cap"""
+    counts = rng.multinomial(total, probabilities)
+    while True:
+        excess = int(np.maximum(counts - cap, 0).sum())
+        counts = np.minimum(counts, cap)
+        if not excess:
+            return counts
+        free = counts < cap
+        counts[free] += rng.multinomial(excess, probabilities[free] / probabilities[free].sum())
+
+
+def phrases(rng, n, words):
+    """n random phrases of `words` words"""
+    picks = pd.DataFrame(WORDS[rng.integers(0, len(WORDS), (n, words))])
+    return picks[0].str.cat([picks[column] for column in picks.columns[1:]], sep=' ')
+
+
+def timestamps(as_of, seconds_before):
+    """'YYYY-MM-DD HH:MM:SS' strings seconds_before seconds before the end of as_of"""
+    end = np.datetime64(as_of) + np.timedelta64(1, 'D')
+    return pd.Series(end - seconds_before.astype('timedelta64[s]')).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def dates(as_of, days_before):
+    """'YYYY-MM-DD' strings days_before days before as_of"""
+    return pd.Series(np.datetime64(as_of) - days_before.astype('timedelta64[D]')).dt.strftime('%Y-%m-%d')
+
+
+def chunks(total, size):
+    """(start, stop) ranges covering total rows"""
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+class DatabaseOutput:
+    """
+    Writes generated frames to the database
+
+    Args:
+        conn: Connection (from get_bulk_connection with bulk)
+        bulk: LOAD DATA each frame from a temporary file instead of multi-row INSERTs
+    """
+
+    def __init__(self, conn, bulk=False):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.bulk = bulk
+
+    def write(self, table, frame):
+        """Insert frame into table and commit; returns the number of rows"""
+        columns = list(frame.columns)
+        if self.bulk:
+            return bulk_insert(self.cursor, self.conn, frame, table, columns)
+
+        # executemany sends each batch as a single multi-row INSERT
+        sql = f"INSERT INTO {table}({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        records = to_records(frame)
+        for start in range(0, len(records), BATCH_SIZE):
+            self.cursor.executemany(sql, records[start:start + BATCH_SIZE])
+        self.conn.commit()
+        return len(records)
+
+    def close(self):
+        self.cursor.close()
+        self.conn.close()
+
+
+class FileOutput:
+    """
+    Writes generated frames to <directory>/<table>.tsv and a load.sql that LOADs them in order
+
+    Args:
+        directory: Output directory (created if missing, earlier files are replaced)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, table, frame):
+        path = os.path.join(self.directory, f"{table}.tsv")
+        append = table in self.tables
+        self.tables[table] = list(frame.columns)
+        return write_tsv(frame, self.tables[table], path, append=append)
+
+    def close(self):
+        with open(os.path.join(self.directory, 'load.sql'), 'w', encoding='utf-8') as script:
+            for table, columns in self.tables.items():
+                path = os.path.abspath(os.path.join(self.directory, f"{table}.tsv"))
+                script.write(
+                    f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+                    f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                    f"LINES TERMINATED BY '\\n' ({', '.join(columns)});\n"
+                )
+
+
+def id_offsets(cursor):
+    """Highest ids already in the database, so generated rows continue after them"""
+    queries = {
+        'publisher': "SELECT MAX(publisher_id) FROM Publishers",
+        'author': "SELECT MAX(author_id) FROM Authors",
+        'book': "SELECT MAX(CAST(SUBSTRING(ISBN, 2) AS UNSIGNED)) FROM Books WHERE ISBN LIKE 'S%'",
+        'user': "SELECT MAX(user_id) FROM Users",
+        'club': "SELECT MAX(club_id) FROM Book_Clubs",
+        'general': "SELECT MAX(discussion_id) FROM General_Discussions",
+        'chapter': "SELECT MAX(discussion_id) FROM Chapter_Discussions",
+    }
+    offsets = {}
+    for name, query in queries.items():
+        cursor.execute(query)
+        offsets[name] = int(cursor.fetchone()[0] or 0)
+    return offsets
+
+
+class SyntheticDataset:
+    """
+    Generates the tables in foreign-key order and hands each chunk to an output
+
+    Args:
+        output: DatabaseOutput or FileOutput
+        counts: Dict with users, books, ratings, clubs, members, discussions, comments
+        seed: Seed of the random streams
+        as_of: Date the generated activity ends on
+        offsets: Highest existing ids (see id_offsets), all 0 for an empty database
+        settings: SYNTHETIC_CONFIG-shaped dict of exponents and limits
+    """
+
+    def __init__(self, output, counts, seed, as_of, offsets, settings=SYNTHETIC_CONFIG):
+        self.output = output
+        self.counts = counts
+        self.as_of = as_of
+        self.offsets = offsets
+        self.settings = settings
+        self.chunk_size = settings['chunk_size']
+        self.rng = dict(zip(STREAMS, (np.random.default_rng(child)
+                                      for child in np.random.SeedSequence(seed).spawn(len(STREAMS)))))
+        self.written = {}
+
+    def _write(self, table, frame):
+        self.written[table] = self.written.get(table, 0) + self.output.write(table, frame)
+
+    def isbns(self, indexes):
+        """ISBNs of generated books ('S' never appears in a real ISBN)"""
+        return pd.Series(np.char.mod('S%012d', self.offsets['book'] + 1 + indexes))
+
+    def user_ids(self, indexes):
+        return self.offsets['user'] + 1 + indexes
+
+    def run(self):
+        steps = [
+            ('Books, Authors and Publishers', self.generate_catalog),
+            ('Users', self.generate_users),
+            ('Ratings', self.generate_ratings),
+            ('Book clubs and members', self.generate_clubs),
+            ('Reading queues and history', self.generate_reading),
+            ('Discussions', self.generate_discussions),
+            ('Comments', self.generate_comments),
+        ]
+        for label, step in steps:
+            started = time.time()
+            print(f"  Generating {label}...")
+            step()
+            print(f"    done in {time.time() - started:.1f}s")
+        return self.written
+
+    def generate_catalog(self):
+        rng = self.rng['catalog']
+        books = self.counts['books']
+        n_publishers = max(1, books // 50)
+        n_authors = max(1, books // 4)
+
+        publisher_ids = self.offsets['publisher'] + 1 + np.arange(n_publishers)
+        self._write('Publishers', pd.DataFrame({
+            'publisher_id': publisher_ids,
+            'name': pd.Series(np.char.mod('Synthetic Publisher %d', publisher_ids)),
+        }))
+        author_ids = self.offsets['author'] + 1 + np.arange(n_authors)
+        for start, stop in chunks(n_authors, self.chunk_size):
+            self._write('Authors', pd.DataFrame({
+                'author_id': author_ids[start:stop],
+                'name': pd.Series(np.char.mod('Synthetic Author %d', author_ids[start:stop])),
+            }))
+
+        # Big publishers and prolific authors
+        _, publisher_cdf = zipf_cdf(rng, n_publishers, 1.0)
+        _, author_cdf = zipf_cdf(rng, n_authors, 1.0)
+        for start, stop in chunks(books, self.chunk_size):
+            n = stop - start
+            isbns = self.isbns(np.arange(start, stop))
+            years = self.as_of.year - np.minimum(rng.gamma(1.5, 10.0, n), 120).astype(int)
+            self._write('Books', pd.DataFrame({
+                'ISBN': isbns,
+                'title': phrases(rng, n, 3).str.title(),
+                'year_of_publication': years,
+                'publisher_id': publisher_ids[draw(rng, publisher_cdf, n)],
+            }))
+            # One author per book, a second one for about one book in ten
+            first = draw(rng, author_cdf, n)
+            second = draw(rng, author_cdf, n)
+            co_written = (rng.random(n) < 0.1) & (second != first)
+            self._write('Book_Authors', pd.DataFrame({
+                'ISBN': pd.concat([isbns, isbns[co_written]], ignore_index=True),
+                'author_id': np.concatenate([author_ids[first], author_ids[second[co_written]]]),
+            }))
+
+        # Popularity shared by ratings, reading queues and history
+        self.book_p, self.book_cdf = zipf_cdf(rng, books, self.settings['zipf_books'])
+
+    def generate_users(self):
+        rng = self.rng['users']
+        users = self.counts['users']
+        _, location_cdf = zipf_cdf(rng, len(LOCATIONS), 1.0)
+        for start, stop in chunks(users, self.chunk_size):
+            n = stop - start
+            user_ids = self.user_ids(np.arange(start, stop))
+            ages = np.clip(np.rint(rng.normal(36, 13, n)), MIN_AGE, MAX_AGE).astype(int)
+            self._write('Users', pd.DataFrame({
+                'user_id': user_ids,
+                'username': pd.Series(np.char.mod('synth_user_%d', user_ids)),
+                'password': 'synthetic',
+                'location': pd.Series(LOCATIONS[draw(rng, location_cdf, n)]),
+                'birth_year': self.as_of.year - ages,
+            }))
+
+        # Activity shared by ratings, club membership and posting
+        self.user_p, self.user_cdf = zipf_cdf(rng, users, self.settings['zipf_users'])
+
+    def ratings_cap(self):
+        """Most ratings one user can get"""
+        return max(1, min(self.settings['max_ratings_per_user'], self.counts['books'] // 4))
+
+    def generate_ratings(self):
+        rng = self.rng['ratings']
+        per_user = spread_counts(rng, self.counts['ratings'], self.user_p, self.ratings_cap())
+        # Some books are simply liked more than others
+        book_mean = np.clip(rng.normal(7.6, 1.0, self.counts['books']), 3.0, 9.5)
+
+        # Whole users per chunk, so (user, book) pairs can be kept unique chunk by chunk
+        totals = np.cumsum(per_user)
+        bounds = np.searchsorted(totals, np.arange(self.chunk_size, totals[-1], self.chunk_size),
+                                 side='left') + 1
+        edges = np.unique(np.concatenate([[0], bounds, [len(per_user)]]))
+        for start, stop in zip(edges[:-1], edges[1:]):
+            groups, books = sample_unique(rng, per_user[start:stop], self.book_cdf)
+            noise = rng.normal(0.0, 1.5, len(books))
+            self._write('Ratings', pd.DataFrame({
+                'user_id': self.user_ids(start + groups),
+                'ISBN': self.isbns(books),
+                'rating': np.clip(np.rint(book_mean[books] + noise), 1, 10).astype(int),
+            }))
+
+    def generate_clubs(self):
+        rng = self.rng['clubs']
+        clubs = self.counts['clubs']
+        self.club_ids = self.offsets['club'] + 1 + np.arange(clubs)
+        self.club_p, self.club_cdf = zipf_cdf(rng, clubs, self.settings['zipf_clubs'])
+        creators = draw(rng, self.user_cdf, clubs)
+        is_public = rng.random(clubs) < 0.8
+
+        # Members other than the creator, spread over the clubs by popularity
+        joined = spread_counts(self.rng['members'], max(self.counts['members'] - clubs, 0),
+                               self.club_p, max(1, self.counts['users'] // 2))
+        groups, users = sample_unique(self.rng['members'], joined, self.user_cdf)
+        keep = users != creators[groups]
+        groups = np.concatenate([np.arange(clubs), groups[keep]])
+        users = np.concatenate([creators, users[keep]])
+        roles = np.where(self.rng['members'].random(len(groups)) < 0.05, 'moderator', 'member')
+        roles[:clubs] = 'admin'
+        order = np.argsort(groups, kind='stable')
+        self.member_clubs, self.member_users = groups[order], users[order]
+        self.club_first = np.searchsorted(self.member_clubs, np.arange(clubs), side='left')
+        self.club_size = np.bincount(self.member_clubs, minlength=clubs)
+
+        for start, stop in chunks(clubs, self.chunk_size):
+            self._write('Book_Clubs', pd.DataFrame({
+                'club_id': self.club_ids[start:stop],
+                'name': pd.Series(np.char.mod('Synthetic Club %d', self.club_ids[start:stop])),
+                'description': phrases(rng, stop - start, 8).str.capitalize(),
+                'is_public': is_public[start:stop].astype(int),
+                'created_by': self.user_ids(creators[start:stop]),
+                'max_members': np.maximum(50, self.club_size[start:stop]),
+            }))
+        roles = roles[order]
+        for start, stop in chunks(len(self.member_clubs), self.chunk_size):
+            self._write('Club_Members', pd.DataFrame({
+                'club_id': self.club_ids[self.member_clubs[start:stop]],
+                'user_id': self.user_ids(self.member_users[start:stop]),
+                'role': pd.Series(roles[start:stop]),
+            }))
+        self.creators = creators
+
+    def pick_members(self, rng, clubs):
+        """A random member of each club in clubs (as user indexes)"""
+        offset = np.floor(rng.random(len(clubs)) * self.club_size[clubs]).astype(int)
+        return self.member_users[self.club_first[clubs] + offset]
+
+    def generate_reading(self):
+        clubs = self.counts['clubs']
+
+        rng = self.rng['queue']
+        groups, books = sample_unique(rng, rng.integers(0, 6, clubs), self.book_cdf)
+        self._write('Reading_Queue', pd.DataFrame({
+            'club_id': self.club_ids[groups],
+            'ISBN': self.isbns(books),
+            'queue_position': group_positions(groups) + 1,
+            'added_by': self.user_ids(self.creators[groups]),
+        }))
+
+        # Position 0 of every club is its current book, the rest were finished before it
+        rng = self.rng['history']
+        groups, books = sample_unique(rng, rng.integers(1, 5, clubs), self.book_cdf)
+        position = group_positions(groups)
+        current_start = rng.integers(0, 31, clubs)
+        end = current_start[groups] + 1 + (position - 1) * 40 + rng.integers(0, 6, len(groups))
+        start = np.where(position == 0, current_start[groups], end + rng.integers(14, 36, len(groups)))
+        end_dates = dates(self.as_of, end).where(position > 0, None)
+        self._write('Reading_History', pd.DataFrame({
+            'club_id': self.club_ids[groups],
+            'ISBN': self.isbns(books),
+            'start_date': dates(self.as_of, start),
+            'end_date': end_dates,
+        }))
+        self.current_book = books[position == 0]
+
+    def generate_discussions(self):
+        rng = self.rng['discussions']
+        total = self.counts['discussions']
+        n_general = int(rng.binomial(total, 0.5))
+
+        self.threads = {}
+        for table, n, chapters in (('General_Discussions', n_general, False),
+                                   ('Chapter_Discussions', total - n_general, True)):
+            offset = self.offsets['chapter' if chapters else 'general']
+            clubs = draw(rng, self.club_cdf, n)
+            age = rng.integers(0, 730 * SECONDS_PER_DAY, n)
+            frame = pd.DataFrame({
+                'discussion_id': offset + 1 + np.arange(n),
+                'club_id': self.club_ids[clubs],
+                'user_id': self.user_ids(self.pick_members(rng, clubs)),
+                'title': phrases(rng, n, 4).str.capitalize(),
+                'content': phrases(rng, n, 15).str.capitalize() + '.',
+                'created_date': timestamps(self.as_of, age),
+            })
+            if chapters:
+                frame.insert(2, 'ISBN', self.isbns(self.current_book[clubs]))
+                frame.insert(3, 'chapter_number', np.minimum(rng.geometric(0.15, n), 40))
+            for start, stop in chunks(n, self.chunk_size):
+                self._write(table, frame.iloc[start:stop])
+            self.threads[table] = (clubs, age)
+
+    def generate_comments(self):
+        rng = self.rng['comments']
+        total = self.counts['comments']
+        n_general = len(self.threads['General_Discussions'][0])
+        share = n_general / max(self.counts['discussions'], 1)
+        n_general_comments = int(rng.binomial(total, share))
+
+        for table, parent, n in (
+            ('General_Discussion_Comments', 'General_Discussions', n_general_comments),
+            ('Chapter_Discussion_Comments', 'Chapter_Discussions', total - n_general_comments),
+        ):
+            clubs, age = self.threads[parent]
+            if not len(clubs) or not n:
+                continue
+            offset = self.offsets['chapter' if parent == 'Chapter_Discussions' else 'general']
+            # A few hot threads get most replies, usually within days of the post
+            _, thread_cdf = zipf_cdf(rng, len(clubs), self.settings['zipf_threads'])
+            for start, stop in chunks(n, self.chunk_size):
+                size = stop - start
+                threads = draw(rng, thread_cdf, size)
+                delay = rng.exponential(2 * SECONDS_PER_DAY, size).astype(np.int64)
+                frame = pd.DataFrame({
+                    'discussion_id': offset + 1 + threads,
+                    'user_id': self.user_ids(self.pick_members(rng, clubs[threads])),
+                    'content': phrases(rng, size, 12).str.capitalize() + '.',
+                    'created_date': timestamps(self.as_of, np.maximum(age[threads] - delay, 0)),
+                })
+                if table == 'General_Discussion_Comments':
+                    frame.insert(2, 'title', 'Re: ' + phrases(rng, size, 3))
+                self._write(table, frame)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic book club dataset")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="multiply every default count (10 gives ~10M ratings)")
+    for name in ('users', 'books', 'ratings', 'clubs', 'members', 'discussions', 'comments'):
+        parser.add_argument(f'--{name}', type=int,
+                            help=f"{name} to generate (default {SYNTHETIC_CONFIG[name]:,} x scale)")
+    parser.add_argument('--seed', type=int, default=SYNTHETIC_CONFIG['seed'])
+    parser.add_argument('--as-of', type=date.fromisoformat, default=date.today(),
+                        help="date the generated activity ends on, YYYY-MM-DD (default today)")
+    parser.add_argument('--bulk', action='store_true',
+                        help="load through LOAD DATA LOCAL INFILE (needs local_infile=ON on the server)")
+    parser.add_argument('--no-checks', action='store_true',
+                        help="turn off unique/foreign-key checks while writing")
+    parser.add_argument('--out', metavar='DIR',
+                        help="write TSV files and load.sql to DIR instead of the database")
+    args = parser.parse_args(argv)
+
+    counts = {}
+    for name in ('users', 'books', 'ratings', 'clubs', 'members', 'discussions', 'comments'):
+        value = getattr(args, name)
+        counts[name] = value if value is not None else int(SYNTHETIC_CONFIG[name] * args.scale)
+        if counts[name] < 0:
+            parser.error(f"--{name} cannot be negative")
+    for name in ('users', 'books', 'clubs'):
+        if counts[name] < 1:
+            parser.error(f"--{name} must be at least 1")
+
+    cap = max(1, min(SYNTHETIC_CONFIG['max_ratings_per_user'], counts['books'] // 4))
+    if counts['ratings'] > counts['users'] * cap:
+        parser.error(f"--ratings is more than {counts['users']:,} users x {cap:,} ratings each")
+    if counts['members'] - counts['clubs'] > counts['clubs'] * (counts['users'] // 2):
+        parser.error("--members is too large for the number of users")
+    if args.out and (args.bulk or args.no_checks):
+        parser.error("--out cannot be combined with --bulk or --no-checks")
+    args.counts = counts
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("BOOK CLUB DATABASE - SYNTHETIC DATA")
+    print("=" * 60)
+    for name, count in args.counts.items():
+        print(f"  {name:>12}: {count:,}")
+    print(f"  {'seed':>12}: {args.seed}")
+
+    start_time = time.time()
+    if args.out:
+        output = FileOutput(args.out)
+        offsets = dict.fromkeys(('publisher', 'author', 'book', 'user', 'club', 'general', 'chapter'), 0)
+    else:
+        output = DatabaseOutput(get_bulk_connection() if args.bulk else get_connection(), bulk=args.bulk)
+        offsets = id_offsets(output.cursor)
+
+    try:
+        dataset = SyntheticDataset(output, args.counts, args.seed, args.as_of, offsets)
+        checks = nullcontext() if args.out else relaxed_checks(output.cursor, args.no_checks)
+        with checks:
+            written = dataset.run()
+
+        if args.out:
+            print(f"\n  Files written to {args.out}; load them with: mysql --local-infile=1 <database> < load.sql")
+            print("  Then rebuild the rating aggregates: python -m db.rating_stats")
+        else:
+            print("  Rebuilding rating stats...")
+            books, users = rebuild_rating_stats(output.cursor, output.conn)
+            print(f"    Stats for {books} books and {users} users")
+    finally:
+        output.close()
+
+    print("\n" + "=" * 60)
+    for table, rows in written.items():
+        print(f"  {table:>28}: {rows:,}")
+    print(f"  Time: {time.time() - start_time:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,18 @@
 import pandas as pd
 import mysql.connector
-from config import DB_CONFIG, BOOKS_FILE, MIN_YEAR, MAX_YEAR, BATCH_SIZE
+from config import DB_CONFIG, BOOKS_FILE, MIN_YEAR, MAX_YEAR, BATCH_SIZE, BOOKS_CHUNK_SIZE
+from bulk_load import get_bulk_connection, bulk_insert, relaxed_checks, revalidate
+from records import to_records, book_frame, book_author_frame
+from cache import cached_frame, cached_chunks
+from checkpoint import NoCheckpoint
+
+
+# Columns of books.csv the loader uses (and caches)
+BOOK_COLUMNS = ['ISBN', 'Book-Title', 'Book-Author', 'Year-Of-Publication', 'Publisher', 'Image-URL-M']
+
+BOOKS_INSERT = """INSERT IGNORE INTO Books(ISBN, title, year_of_publication, publisher_id, image_url) 
+             VALUES (%s, %s, %s, %s, %s)"""
+BOOK_AUTHORS_INSERT = "INSERT IGNORE INTO Book_Authors(ISBN, author_id) VALUES (%s, %s)"
 
 
 def get_connection():
@@ -89,96 +101,83 @@ def load_authors(cursor, conn, authors):
     return author_map
 
 
+def insert_batches(cursor, conn, sql, records, label):
+    """executemany records in BATCH_SIZE batches, committing after each"""
+    for start in range(0, len(records), BATCH_SIZE):
+        cursor.executemany(sql, records[start:start + BATCH_SIZE])
+        conn.commit()
+        print(f"    Loaded {min(start + BATCH_SIZE, len(records))} {label}...")
+
+
 def load_books(cursor, conn, df, publisher_map):
     """Load books - UPDATED for single image_url field"""
-    # Use Image-URL-M (medium) as the single image_url
-    sql = """INSERT IGNORE INTO Books(ISBN, title, year_of_publication, publisher_id, image_url) 
-             VALUES (%s, %s, %s, %s, %s)"""
-    
-    batch = []
-    count = 0
-    skipped = 0
-    
-    for _, row in df.iterrows():
-        try:
-            isbn = row['ISBN']
-            title = row['Book-Title']
-            year = int(row['Year-Of-Publication']) if pd.notna(row['Year-Of-Publication']) else None
-            publisher_id = publisher_map.get(row['Publisher'])
-            # Use medium image URL as the single image_url
-            img_url = row['Image-URL-M']
-            
-            batch.append((isbn, title, year, publisher_id, img_url))
-            count += 1
-            
-            if len(batch) >= BATCH_SIZE:
-                cursor.executemany(sql, batch)
-                conn.commit()
-                batch = []
-                print(f"    Loaded {count} books...")
-                
-        except Exception as e:
-            skipped += 1
+    records = to_records(book_frame(df, publisher_map))
+    insert_batches(cursor, conn, BOOKS_INSERT, records, "books")
     
-    if batch:
-        cursor.executemany(sql, batch)
-        conn.commit()
-    
-    print(f"    Total books loaded: {count}")
-    if skipped > 0:
-        print(f"    Books skipped: {skipped}")
+    print(f"    Total books loaded: {len(records)}")
 
 
 def load_book_authors(cursor, conn, df, author_map):
     """Load book-author relationships"""
-    sql = "INSERT IGNORE INTO Book_Authors(ISBN, author_id) VALUES (%s, %s)"
+    links, skipped = book_author_frame(df, author_map)
+    records = to_records(links)
+    insert_batches(cursor, conn, BOOK_AUTHORS_INSERT, records, "book-author links")
     
-    batch = []
-    count = 0
-    skipped = 0
+    print(f"    Total book-author links: {len(records)}")
+    if skipped > 0:
+        print(f"    Links skipped: {skipped}")
+
+
+def fetch_name_map(cursor, table, id_column):
+    """Return name->id mapping for a lookup table"""
+    cursor.execute(f"SELECT {id_column}, name FROM {table}")
+    return {name: row_id for row_id, name in cursor.fetchall()}
+
+
+def load_books_bulk(df, publishers, authors, disable_checks=False):
+    """Load publishers, authors, books and links with LOAD DATA LOCAL INFILE"""
+    conn = get_bulk_connection()
+    cursor = conn.cursor()
     
-    for _, row in df.iterrows():
-        isbn = row['ISBN']
-        author = row['Book-Author']
-        author_id = author_map.get(author)
+    try:
+        print("  Bulk loading Publishers table...")
+        bulk_insert(cursor, conn, pd.DataFrame({'name': publishers}), 'Publishers', ['name'])
+        publisher_map = fetch_name_map(cursor, 'Publishers', 'publisher_id')
+        print(f"    Total unique publishers loaded: {len(publisher_map)}")
         
-        if not author_id:
-            skipped += 1
-            continue
+        print("  Bulk loading Authors table...")
+        bulk_insert(cursor, conn, pd.DataFrame({'name': authors}), 'Authors', ['name'])
+        author_map = fetch_name_map(cursor, 'Authors', 'author_id')
+        print(f"    Total unique authors loaded: {len(author_map)}")
+        
+        books = book_frame(df, publisher_map)
+        links, _ = book_author_frame(df, author_map)
         
-        try:
-            batch.append((isbn, author_id))
-            count += 1
+        with relaxed_checks(cursor, disable_checks):
+            print("  Bulk loading Books table...")
+            count = bulk_insert(cursor, conn, books, 'Books', list(books.columns))
+            print(f"    Total books loaded: {count}")
             
-            if len(batch) >= BATCH_SIZE:
-                cursor.executemany(sql, batch)
-                conn.commit()
-                batch = []
-                print(f"    Loaded {count} book-author links...")
-                
-        except Exception as e:
-            skipped += 1
-    
-    if batch:
-        cursor.executemany(sql, batch)
-        conn.commit()
-    
-    print(f"    Total book-author links: {count}")
-    if skipped > 0:
-        print(f"    Links skipped: {skipped}")
+            print("  Bulk loading Book_Authors table...")
+            count = bulk_insert(cursor, conn, links, 'Book_Authors', list(links.columns))
+            print(f"    Total book-author links: {count}")
+        
+        if disable_checks:
+            print("  Revalidating Books and Book_Authors...")
+            revalidate(cursor, conn, {'Books', 'Book_Authors'})
+        
+        print("  [SUCCESS] Books data loaded successfully!")
+        
+    finally:
+        cursor.close()
+        conn.close()
 
 
-def load_books_data():
-    """Main function to load books data"""
-    
-    print("  Reading books.csv...")
-    df = pd.read_csv(BOOKS_FILE, sep=';', encoding='ISO-8859-1', 
-                     on_bad_lines='skip', low_memory=False)
-    
-    print(f"  Read {len(df)} rows from CSV")
-    
+def normalize_books_chunk(df):
+    """Clean the fields of raw books.csv rows without dropping any"""
     # Clean column names
     df.columns = df.columns.str.strip().str.replace('"', '')
+    df = df[BOOK_COLUMNS].copy()
     
     # Clean fields
     df['ISBN'] = df['ISBN'].apply(clean_field)
@@ -188,23 +187,156 @@ def load_books_data():
     df['Image-URL-M'] = df['Image-URL-M'].apply(clean_field)
     
     # Convert year to numeric
-    df['Year-Of-Publication'] = pd.to_numeric(df['Year-Of-Publication'], errors='coerce')
-    
-    print("  Filtering data...")
-    # Filter books
-    df = df[
+    df['Year-Of-Publication'] = pd.to_numeric(df['Year-Of-Publication'], errors='coerce').astype('float64')
+    return df
+
+
+def filter_books(df):
+    """Keep the cleaned rows that make valid books"""
+    return df[
         df['ISBN'].notna() &
         df['Book-Title'].notna() &           
         (df['Book-Title'].str.len() > 0) &
         df['Book-Author'].notna() &
         (df['Book-Author'].str.lower() != 'unknown') &
-        df['ISBN'].apply(is_valid_isbn) &
+        df['ISBN'].apply(is_valid_isbn).astype(bool) &
         (
             df['Year-Of-Publication'].isna() |
             ((df['Year-Of-Publication'] >= MIN_YEAR) & 
              (df['Year-Of-Publication'] <= MAX_YEAR))
         )
     ]
+
+
+def read_clean_books():
+    """Parse books.csv and return the cleaned, filtered rows"""
+    print("  Reading books.csv...")
+    df = pd.read_csv(BOOKS_FILE, sep=';', encoding='ISO-8859-1', 
+                     on_bad_lines='skip', low_memory=False)
+    
+    print(f"  Read {len(df)} rows from CSV")
+    
+    df = normalize_books_chunk(df)
+    
+    print("  Filtering data...")
+    return filter_books(df).reset_index(drop=True)
+
+
+def upsert_names(cursor, table, id_column, names, name_map):
+    """
+    Create the names not in name_map yet and add their ids to it
+
+    Only the new names are inserted and read back; name matching falls back
+    to casefold and then to a per-name upsert because the name columns use a
+    case- and accent-insensitive collation.
+    """
+    missing = [name for name in dict.fromkeys(names) if name not in name_map]
+    for start in range(0, len(missing), BATCH_SIZE):
+        part = missing[start:start + BATCH_SIZE]
+        cursor.execute(
+            f"INSERT IGNORE INTO {table}(name) VALUES {', '.join(['(%s)'] * len(part))}",
+            tuple(part)
+        )
+        cursor.execute(
+            f"SELECT name, {id_column} FROM {table} WHERE name IN ({', '.join(['%s'] * len(part))})",
+            tuple(part)
+        )
+        found = dict(cursor.fetchall())
+        folded = {name.casefold(): row_id for name, row_id in found.items()}
+        for name in part:
+            row_id = found.get(name, folded.get(name.casefold()))
+            if row_id is None:
+                cursor.execute(
+                    f"INSERT INTO {table}(name) VALUES (%s) "
+                    f"ON DUPLICATE KEY UPDATE {id_column} = LAST_INSERT_ID({id_column})",
+                    (name,)
+                )
+                row_id = cursor.lastrowid
+            name_map[name] = row_id
+
+
+def load_books_streaming(chunk_size, checkpoint, use_cache=True):
+    """
+    Load books.csv chunk by chunk in a single pass
+
+    Each chunk is cleaned, its new publishers and authors are upserted, and
+    its Books and Book_Authors rows are written and committed together, so
+    memory holds one chunk plus the name -> id maps (which grow with the
+    number of distinct names, not with the file).
+    """
+    done_chunks = checkpoint.start('books', BOOKS_FILE, chunk_size)
+    if done_chunks:
+        print(f"  Resuming after chunk {done_chunks}")
+    
+    chunks = cached_chunks(
+        'books-stream', BOOKS_FILE, {'chunk_size': chunk_size},
+        lambda: pd.read_csv(BOOKS_FILE, sep=';', encoding='ISO-8859-1',
+                            on_bad_lines='skip', low_memory=False, chunksize=chunk_size),
+        normalize_books_chunk, skip=done_chunks, use_cache=use_cache
+    )
+    
+    publisher_map = {}
+    author_map = {}
+    total_books = checkpoint.rows('books')
+    total_links = 0
+    total_skipped = 0
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    try:
+        for chunk_num, chunk in enumerate(chunks, start=done_chunks + 1):
+            df = filter_books(chunk)
+            
+            upsert_names(cursor, 'Publishers', 'publisher_id', df['Publisher'].dropna(), publisher_map)
+            upsert_names(cursor, 'Authors', 'author_id', df['Book-Author'].dropna(), author_map)
+            
+            books = to_records(book_frame(df, publisher_map))
+            links, skipped = book_author_frame(df, author_map)
+            links = to_records(links)
+            if books:
+                cursor.executemany(BOOKS_INSERT, books)
+            if links:
+                cursor.executemany(BOOK_AUTHORS_INSERT, links)
+            conn.commit()
+            
+            total_books += len(books)
+            total_links += len(links)
+            total_skipped += len(chunk) - len(df)
+            checkpoint.chunk_committed('books', chunk_num, total_books)
+            print(f"    Chunk {chunk_num}: {len(books)} books, {len(links)} links, "
+                  f"skipped {len(chunk) - len(df)}")
+        
+        print(f"    Total books loaded: {total_books}")
+        print(f"    Total book-author links: {total_links}")
+        print(f"    Rows skipped: {total_skipped}")
+        print(f"    Publishers: {len(publisher_map)}, authors: {len(author_map)}")
+        print("  [SUCCESS] Books data loaded successfully!")
+        
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def load_books_data(bulk=False, disable_checks=False, use_cache=True, stream=False, checkpoint=None):
+    """
+    Main function to load books data
+    
+    Args:
+        bulk: Load through LOAD DATA LOCAL INFILE instead of batched INSERTs
+        disable_checks: With bulk, skip unique/foreign-key checks and revalidate afterwards
+        use_cache: Reuse the cleaned rows cached by an earlier run (see cache.py)
+        stream: Read and load the CSV in BOOKS_CHUNK_SIZE chunks (ignored with bulk)
+        checkpoint: Checkpoint recording committed chunks in stream mode
+    """
+    checkpoint = checkpoint or NoCheckpoint()
+    if stream and not bulk:
+        load_books_streaming(BOOKS_CHUNK_SIZE, checkpoint, use_cache)
+        return
+    
+    checkpoint.start('books', BOOKS_FILE)
+    df = cached_frame('books', BOOKS_FILE, {'MIN_YEAR': MIN_YEAR, 'MAX_YEAR': MAX_YEAR},
+                      read_clean_books, use_cache)
     
     print(f"  Filtered to {len(df)} valid books")
         
@@ -215,6 +347,10 @@ def load_books_data():
     print(f"  Found {len(unique_publishers)} unique publishers")
     print(f"  Found {len(unique_authors)} unique authors")
     
+    if bulk:
+        load_books_bulk(df, unique_publishers, unique_authors, disable_checks)
+        return
+    
     conn = get_connection()
     cursor = conn.cursor()
     
@@ -2,9 +2,27 @@
 Load ratings from ratings.csv with filtering
 """
 
+import os
+import importlib.util
 import pandas as pd
 import mysql.connector
-from config import DB_CONFIG, RATINGS_FILE, BATCH_SIZE
+from config import DB_CONFIG, RATINGS_FILE, BATCH_SIZE, PARALLEL_LOAD_CONFIG
+from bulk_load import (get_bulk_connection, temp_tsv, write_tsv, load_file,
+                       relaxed_checks, revalidate)
+from records import clean_ratings_chunk, normalize_ratings_chunk, to_records, rating_frame
+from parallel_ingest import ingest_ratings
+from checkpoint import NoCheckpoint
+from cache import cached_chunks
+
+# Same script and parser db/rating_stats.py uses. The loaders cannot import the
+# db package, so the dependency-free db/sql/statements.py is loaded by its path
+_spec = importlib.util.spec_from_file_location('db_sql_statements', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'sql', 'statements.py'
+))
+_statements = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_statements)
+REBUILD_SCRIPT = _statements.REBUILD_SCRIPT
+read_statements = _statements.read_statements
 
 
 def get_connection():
@@ -23,11 +41,116 @@ def get_valid_books(cursor):
     return set(row[0] for row in cursor.fetchall())
 
 
-def load_ratings_data():
-    """Main function to load ratings"""
+def rebuild_rating_stats(cursor, conn):
+    """Recompute Book_Rating_Stats and the per-user summaries from Ratings after a bulk load"""
+    for statement in read_statements(REBUILD_SCRIPT):
+        cursor.execute(statement)
+    conn.commit()
+
+    cursor.execute("SELECT COUNT(*) FROM Book_Rating_Stats")
+    books = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM User_Rating_Summary")
+    users = cursor.fetchone()[0]
+    return books, users
+
+
+def insert_chunks(cursor, conn, chunks, valid_users, valid_books, sql, bulk_path=None,
+                  checkpoint=None, first_chunk=1):
+    """
+    Clean and insert chunks one after another on one connection
+    (or append them to bulk_path for a later LOAD DATA)
+
+    Returns:
+        (loaded or staged count, skipped count)
+    """
+    checkpoint = checkpoint or NoCheckpoint()
+    replay_through = checkpoint.replay_through('ratings')
+    total_count = checkpoint.rows('ratings')
+    total_skipped = 0
+    
+    for chunk_num, chunk in enumerate(chunks, start=first_chunk):
+        print(f"  Processing chunk {chunk_num}...")
+        
+        rows_read = len(chunk)
+        chunk = clean_ratings_chunk(chunk, valid_users, valid_books)
+        skipped = rows_read - len(chunk)
+        total_skipped += skipped
+        
+        if bulk_path:
+            count = write_tsv(rating_frame(chunk), ['user_id', 'ISBN', 'rating'],
+                              bulk_path, append=True)
+            total_count += count
+            print(f"    Chunk {chunk_num}: staged {count} ratings, skipped {skipped}")
+            continue
+        
+        records = to_records(rating_frame(chunk))
+        # A chunk the last run may have partly committed is replayed without duplicate errors
+        chunk_sql = replay_sql(sql) if chunk_num <= replay_through else sql
+        checkpoint.chunk_started('ratings', chunk_num)
+        for start in range(0, len(records), BATCH_SIZE):
+            cursor.executemany(chunk_sql, records[start:start + BATCH_SIZE])
+            conn.commit()
+        
+        total_count += len(records)
+        checkpoint.chunk_committed('ratings', chunk_num, total_count)
+        print(f"    Chunk {chunk_num}: loaded {len(records)} ratings, skipped {skipped}")
+    
+    return total_count, total_skipped
+
+
+def insert_chunks_parallel(chunks, valid_users, valid_books, sql, workers,
+                           checkpoint=None, first_chunk=1):
+    """
+    Clean chunks in a process pool and insert them on several connections
+
+    Returns:
+        (loaded count, skipped count)
+    """
+    checkpoint = checkpoint or NoCheckpoint()
+    rows_before = checkpoint.rows('ratings')
     
-    conn = get_connection()
+    print(f"  Inserting with {workers} writer connections...")
+    result = ingest_ratings(
+        chunks, valid_users, valid_books, get_connection, sql, workers,
+        processes=PARALLEL_LOAD_CONFIG['processes'],
+        queue_size=PARALLEL_LOAD_CONFIG['queue_size'],
+        batch_size=BATCH_SIZE,
+        first_chunk=first_chunk,
+        replay_through=checkpoint.replay_through('ratings'),
+        replay_sql=replay_sql(sql),
+        on_chunk_started=lambda chunk_num: checkpoint.chunk_started('ratings', chunk_num),
+        on_progress=lambda chunks, rows: checkpoint.chunk_committed('ratings', chunks, rows_before + rows)
+    )
+    
+    if result['failed']:
+        print(f"  Ratings that failed to insert: {result['failed']}")
+        for chunk_num, record, message in result['errors'][:PARALLEL_LOAD_CONFIG['errors_shown']]:
+            print(f"    chunk {chunk_num}, user {record[0]}, ISBN {record[1]}: {message}")
+    return rows_before + result['loaded'], result['skipped']
+
+
+def replay_sql(sql):
+    """INSERT IGNORE form of an INSERT statement"""
+    return sql.replace("INSERT INTO", "INSERT IGNORE INTO", 1)
+
+
+def load_ratings_data(bulk=False, disable_checks=False, workers=1, checkpoint=None, use_cache=True):
+    """
+    Main function to load ratings
+    
+    Args:
+        bulk: Collect the filtered chunks in one file and LOAD DATA LOCAL INFILE it
+        disable_checks: With bulk, skip unique/foreign-key checks and revalidate afterwards
+        workers: Writer connections; above 1 the chunks are cleaned in a process
+            pool and inserted in parallel (ignored with bulk)
+        checkpoint: Checkpoint recording committed chunks; a resumed run skips them
+        use_cache: Read the parsed chunks cached by an earlier run (see cache.py)
+    """
+    checkpoint = checkpoint or NoCheckpoint()
+    
+    conn = get_bulk_connection() if bulk else get_connection()
     cursor = conn.cursor()
+    bulk_path = temp_tsv('ratings_') if bulk else None
     
     try:
         # Get valid users and books
@@ -42,72 +165,52 @@ def load_ratings_data():
         print("  Reading ratings.csv...")
         # Read in chunks to handle large file
         chunk_size = 50000
-        chunks = pd.read_csv(RATINGS_FILE, sep=';', encoding='ISO-8859-1',
-                            on_bad_lines='skip', chunksize=chunk_size)
+        
+        # The bulk path loads one file at the end, so only the stage is checkpointed
+        done_chunks = checkpoint.start('ratings', RATINGS_FILE, None if bulk else chunk_size)
+        if done_chunks:
+            print(f"  Resuming after chunk {done_chunks} ({checkpoint.rows('ratings')} ratings committed)")
+        
+        chunks = cached_chunks(
+            'ratings', RATINGS_FILE, {'chunk_size': chunk_size},
+            lambda: pd.read_csv(RATINGS_FILE, sep=';', encoding='ISO-8859-1',
+                                on_bad_lines='skip', chunksize=chunk_size),
+            normalize_ratings_chunk, skip=done_chunks, use_cache=use_cache
+        )
         
         sql = "INSERT INTO Ratings(user_id, ISBN, rating) VALUES (%s, %s, %s)"
         
-        total_count = 0
-        total_skipped = 0
-        chunk_num = 0
+        if workers > 1 and not bulk:
+            total_count, total_skipped = insert_chunks_parallel(
+                chunks, valid_users, valid_books, sql, workers,
+                checkpoint=checkpoint, first_chunk=done_chunks + 1
+            )
+        else:
+            total_count, total_skipped = insert_chunks(
+                cursor, conn, chunks, valid_users, valid_books, sql, bulk_path,
+                checkpoint=checkpoint, first_chunk=done_chunks + 1
+            )
         
-        for chunk in chunks:
-            chunk_num += 1
-            print(f"  Processing chunk {chunk_num}...")
-            
-            # Clean column names
-            chunk.columns = chunk.columns.str.strip().str.replace('"', '')
-            
-            # Clean data
-            chunk['User-ID'] = pd.to_numeric(chunk['User-ID'], errors='coerce')
-            chunk['Book-Rating'] = pd.to_numeric(chunk['Book-Rating'], errors='coerce')
-            chunk['ISBN'] = chunk['ISBN'].astype(str).str.strip()
-            
-            # Filter ratings
-            chunk = chunk[
-                chunk['User-ID'].notna() &
-                chunk['ISBN'].notna() &
-                chunk['Book-Rating'].notna() &
-                (chunk['Book-Rating'] > 0) &  # Exclude 0 ratings
-                chunk['User-ID'].isin(valid_users) &
-                chunk['ISBN'].isin(valid_books)
-            ]
-            
-            # Load batch
-            batch = []
-            count = 0
-            skipped = 0
-            
-            for _, row in chunk.iterrows():
-                try:
-                    user_id = int(row['User-ID'])
-                    isbn = row['ISBN']
-                    rating = int(row['Book-Rating'])
-                    
-                    batch.append((user_id, isbn, rating))
-                    count += 1
-                    
-                    if len(batch) >= BATCH_SIZE:
-                        cursor.executemany(sql, batch)
-                        conn.commit()
-                        batch = []
-                        
-                except Exception as e:
-                    skipped += 1
-            
-            if batch:
-                cursor.executemany(sql, batch)
+        if bulk:
+            print("  Bulk loading Ratings table...")
+            with relaxed_checks(cursor, disable_checks):
+                total_count = load_file(cursor, bulk_path, 'Ratings', ['user_id', 'ISBN', 'rating'])
                 conn.commit()
-            
-            total_count += count
-            total_skipped += skipped
-            print(f"    Chunk {chunk_num}: loaded {count} ratings, skipped {skipped}")
+            if disable_checks:
+                print("  Revalidating Ratings...")
+                revalidate(cursor, conn, {'Ratings'})
         
         print(f"  Total ratings loaded: {total_count}")
         print(f"  Total ratings skipped: {total_skipped}")
+        
+        print("  Rebuilding rating stats...")
+        books, users = rebuild_rating_stats(cursor, conn)
+        print(f"    Stats for {books} books and {users} users")
         print("  [SUCCESS] Ratings data loaded successfully!")
         
     finally:
+        if bulk_path:
+            os.remove(bulk_path)
         cursor.close()
         conn.close()
 
@@ -2,6 +2,14 @@ import pandas as pd
 import mysql.connector
 from datetime import datetime
 from config import DB_CONFIG, USERS_FILE, MIN_AGE, MAX_AGE, BATCH_SIZE
+from bulk_load import get_bulk_connection, bulk_insert, relaxed_checks, revalidate
+from records import to_records, user_frame
+from checkpoint import NoCheckpoint
+from cache import cached_frame
+
+
+# Columns the loader uses (and caches)
+USER_COLUMNS = ['User-ID', 'Location-Clean', 'Birth-Year', 'Username', 'Password']
 
 
 def get_connection():
@@ -51,9 +59,32 @@ def calculate_birth_year(age):
     return None
 
 
-def load_users_data():
-    """Main function to load users"""
+def load_users_bulk(df, disable_checks=False):
+    """Load the cleaned users with LOAD DATA LOCAL INFILE"""
+    conn = get_bulk_connection()
+    cursor = conn.cursor()
     
+    try:
+        users = user_frame(df)
+        
+        print("  Bulk loading Users table...")
+        with relaxed_checks(cursor, disable_checks):
+            count = bulk_insert(cursor, conn, users, 'Users', list(users.columns))
+        print(f"    Total users loaded: {count}")
+        
+        if disable_checks:
+            print("  Revalidating Users...")
+            revalidate(cursor, conn, {'Users'})
+        
+        print("  ✓ Users data loaded successfully!")
+        
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def read_clean_users():
+    """Parse users.csv and return the cleaned, filtered rows"""
     print("  Reading users.csv...")
     df = pd.read_csv(USERS_FILE, sep=';', encoding='ISO-8859-1', 
                      on_bad_lines='skip')
@@ -66,7 +97,7 @@ def load_users_data():
     # Clean and transform data
     df['User-ID'] = pd.to_numeric(df['User-ID'], errors='coerce')
     df['Location-Clean'] = df['Location'].apply(clean_location)
-    df['Birth-Year'] = df['Age'].apply(calculate_birth_year)
+    df['Birth-Year'] = pd.to_numeric(df['Age'].apply(calculate_birth_year))
     
     print("  Filtering data...")
     # Filter users
@@ -77,11 +108,38 @@ def load_users_data():
         df['Birth-Year'].notna()
     ]
     
-    print(f"  Filtered to {len(df)} valid users")
-        
     # Create usernames and passwords
-    df['Username'] = 'user' + df['User-ID'].astype(int).astype(str)
-    df['Password'] = 'password123'
+    df = df.assign(
+        Username='user' + df['User-ID'].astype(int).astype(str),
+        Password='password123'
+    )
+    return df[USER_COLUMNS].reset_index(drop=True)
+
+
+def load_users_data(bulk=False, disable_checks=False, checkpoint=None, use_cache=True):
+    """
+    Main function to load users
+    
+    Args:
+        bulk: Load through LOAD DATA LOCAL INFILE instead of batched INSERTs
+        disable_checks: With bulk, skip unique checks and revalidate afterwards
+        checkpoint: Checkpoint recording committed batches; a resumed run skips them
+        use_cache: Reuse the cleaned rows cached by an earlier run (see cache.py)
+    """
+    checkpoint = checkpoint or NoCheckpoint()
+    
+    # Birth years are computed from ages, so the cached rows are only valid this year
+    settings = {'MIN_AGE': MIN_AGE, 'MAX_AGE': MAX_AGE, 'year': datetime.now().year}
+    df = cached_frame('users', USERS_FILE, settings, read_clean_users, use_cache)
+    
+    print(f"  Filtered to {len(df)} valid users")
+    
+    # Batches of the filtered rows are the checkpointed chunks (bulk loads are all or nothing)
+    done_batches = checkpoint.start('users', USERS_FILE, None if bulk else BATCH_SIZE)
+    
+    if bulk:
+        load_users_bulk(df, disable_checks)
+        return
     
     conn = get_connection()
     cursor = conn.cursor()
@@ -91,35 +149,22 @@ def load_users_data():
         sql = """INSERT INTO Users(user_id, username, password, location, birth_year) 
                  VALUES (%s, %s, %s, %s, %s)"""
         
-        batch = []
-        count = 0
-        skipped = 0
-        
-        for _, row in df.iterrows():
-            try:
-                user_id = int(row['User-ID'])
-                username = row['Username']
-                password = row['Password']
-                location = row['Location-Clean']
-                birth_year = int(row['Birth-Year']) if pd.notna(row['Birth-Year']) and pd.notnull(row['Birth-Year']) else None
-                
-                batch.append((user_id, username, password, location, birth_year))
-                count += 1
-                
-                if len(batch) >= BATCH_SIZE:
-                    cursor.executemany(sql, batch)
-                    conn.commit()
-                    batch = []
-                    
-            except Exception as e:
-                skipped += 1
+        records = to_records(user_frame(df))
+        replay_through = checkpoint.replay_through('users')
+        if done_batches:
+            print(f"    Resuming after {done_batches * BATCH_SIZE} users")
         
-        if batch:
-            cursor.executemany(sql, batch)
+        for batch_num in range(done_batches + 1, (len(records) + BATCH_SIZE - 1) // BATCH_SIZE + 1):
+            start = (batch_num - 1) * BATCH_SIZE
+            batch = records[start:start + BATCH_SIZE]
+            # A batch the last run may have committed is replayed without duplicate errors
+            batch_sql = sql.replace("INSERT INTO", "INSERT IGNORE INTO", 1) if batch_num <= replay_through else sql
+            checkpoint.chunk_started('users', batch_num)
+            cursor.executemany(batch_sql, batch)
             conn.commit()
+            checkpoint.chunk_committed('users', batch_num, start + len(batch))
         
-        print(f"    Total users loaded: {count}")
-        print(f"    Users skipped: {skipped}")
+        print(f"    Total users loaded: {len(records)}")
         print("  ✓ Users data loaded successfully!")
         
     finally:
@@ -0,0 +1,269 @@
+"""
+Parallel ratings ingest
+CSV chunks are cleaned in a process pool and inserted by N writer threads, each on its own connection
+
+    reader (main thread) -> process pool (clean, filter, build records)
+                         -> one bounded queue per writer -> writer connection
+
+Rows are routed to writers by user_id, so every user's ratings go through one
+writer in file order. A failing batch is rolled back and retried row by row,
+and the rows that still fail are reported sorted by chunk and key - the
+counts and the error list do not depend on thread scheduling. A writer that
+loses its connection stops writing but keeps emptying its queue, and the
+load is aborted with the checkpoint left before the batches it dropped.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from mysql.connector import Error
+from records import clean_ratings_chunk, to_records, rating_frame
+
+# Set in each pool process by _init_process
+_valid_users = None
+_valid_books = None
+
+
+def _init_process(valid_users, valid_books):
+    global _valid_users, _valid_books
+    _valid_users = valid_users
+    _valid_books = valid_books
+
+
+def prepare_chunk(chunk, writers):
+    """
+    Clean a raw chunk and split its records by writer (runs in a pool process)
+
+    Returns:
+        (rows_read, rows_kept, [records for writer 0, writer 1, ...])
+    """
+    rows_read = len(chunk)
+    frame = rating_frame(clean_ratings_chunk(chunk, _valid_users, _valid_books))
+    partition = frame['user_id'] % writers
+    parts = [to_records(frame[partition == index]) for index in range(writers)]
+    return rows_read, len(frame), parts
+
+
+class ChunkTracker:
+    """
+    Reports the longest prefix of chunks whose batches are all committed
+
+    Args:
+        first_chunk: Number of the first chunk of this run
+        on_progress: Callback(chunks, rows) when the prefix grows
+    """
+
+    def __init__(self, first_chunk=1, on_progress=None):
+        self.committed = first_chunk - 1
+        self.rows = 0
+        self.on_progress = on_progress
+        self._outstanding = {}
+        self._lock = threading.Lock()
+
+    def expect(self, chunk_num, batches):
+        """Register a chunk before its batches are queued"""
+        with self._lock:
+            self._outstanding[chunk_num] = batches
+            self._advance()
+
+    def batch_done(self, chunk_num, rows):
+        with self._lock:
+            self._outstanding[chunk_num] -= 1
+            self.rows += rows
+            self._advance()
+
+    def _advance(self):
+        moved = False
+        while self._outstanding.get(self.committed + 1) == 0:
+            del self._outstanding[self.committed + 1]
+            self.committed += 1
+            moved = True
+        if moved and self.on_progress:
+            self.on_progress(self.committed, self.rows)
+
+
+class RatingsWriter(threading.Thread):
+    """
+    Insert the batches of one queue on a dedicated connection
+
+    Args:
+        index: Writer number (used in the thread name)
+        connect: Function returning a new connection
+        sql: INSERT statement for one record
+        batches: Queue of (chunk_num, records, replay) items, None to stop
+        tracker: ChunkTracker told about every finished batch
+        replay_sql: Statement used for replayed batches (INSERT IGNORE)
+    """
+
+    def __init__(self, index, connect, sql, batches, tracker, replay_sql=None):
+        super().__init__(name=f"ratings-writer-{index}", daemon=True)
+        self.connect = connect
+        self.sql = sql
+        self.replay_sql = replay_sql or sql
+        self.batches = batches
+        self.tracker = tracker
+        self.loaded = 0
+        self.failed = []
+        self.fatal = None   # exception that stopped the writer
+
+    def run(self):
+        conn = cursor = None
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+        except Exception as e:
+            self.fatal = e
+
+        while True:
+            item = self.batches.get()
+            if item is None:
+                break
+            if self.fatal is not None:
+                # Keep draining so the reader never blocks on a dead writer. The
+                # batch is not reported done, so the checkpoint stays before it
+                continue
+            chunk_num, records, replay = item
+            loaded = self.loaded
+            try:
+                self._write(conn, cursor, chunk_num, records, self.replay_sql if replay else self.sql)
+            except Exception as e:
+                self.fatal = e
+                continue
+            self.tracker.batch_done(chunk_num, self.loaded - loaded)
+
+        if conn is not None:
+            try:
+                cursor.close()
+                conn.close()
+            except Error:
+                pass
+
+    def _write(self, conn, cursor, chunk_num, records, sql):
+        """
+        Insert one batch, falling back to row by row if it fails
+
+        Rows are counted by cursor.rowcount, so rows an INSERT IGNORE replay
+        skips are not counted again. A rollback that fails means the
+        connection is gone; that error is raised and stops the writer.
+        """
+        try:
+            cursor.executemany(sql, records)
+            conn.commit()
+            self.loaded += max(cursor.rowcount, 0)
+            return
+        except Error:
+            conn.rollback()
+
+        # Isolate the bad rows; the good ones of the batch still go in
+        for record in records:
+            try:
+                cursor.execute(sql, record)
+                conn.commit()
+                self.loaded += max(cursor.rowcount, 0)
+            except Error as e:
+                conn.rollback()
+                self.failed.append((chunk_num, record, str(e)))
+
+
+def check_writers(writers):
+    """Raise if a writer has stopped (its batches are being dropped)"""
+    for writer in writers:
+        if writer.fatal is not None:
+            raise RuntimeError(f"{writer.name} stopped: {writer.fatal}") from writer.fatal
+
+
+def ingest_ratings(chunks, valid_users, valid_books, connect, sql,
+                   workers, processes=None, queue_size=8, batch_size=1000,
+                   first_chunk=1, replay_through=0, replay_sql=None,
+                   on_chunk_started=None, on_progress=None):
+    """
+    Load ratings chunks with a process pool and several writer connections
+
+    Args:
+        chunks: Iterable of raw ratings.csv DataFrame chunks
+        valid_users: Set of existing user ids
+        valid_books: Set of existing ISBNs
+        connect: Function returning a new database connection
+        sql: INSERT statement taking (user_id, ISBN, rating)
+        workers: Number of writer connections
+        processes: Size of the cleaning pool (None = one per CPU)
+        queue_size: Batches buffered per writer before the reader waits
+        batch_size: Records per executemany
+        first_chunk: Number of the first chunk in chunks (after a resume)
+        replay_through: Chunks up to this number are written with replay_sql
+        replay_sql: INSERT IGNORE variant of sql for replayed chunks
+        on_chunk_started: Callback(chunk_num) before a chunk's batches are queued
+        on_progress: Callback(chunks, rows) as the committed chunk prefix grows
+
+    Returns:
+        Dict with 'read', 'skipped', 'loaded' and 'failed' counts and the
+        sorted 'errors' list of (chunk_num, record, message)
+
+    Raises:
+        RuntimeError if a writer stopped (e.g. lost its connection); the
+        chunks committed so far have been reported through on_progress
+    """
+    tracker = ChunkTracker(first_chunk, on_progress)
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+    writers = [RatingsWriter(index, connect, sql, queues[index], tracker, replay_sql)
+               for index in range(workers)]
+    for writer in writers:
+        writer.start()
+
+    processes = processes or os.cpu_count() or 1
+    read = kept = 0
+    try:
+        # spawn, not fork: the writer threads are already running
+        with ProcessPoolExecutor(max_workers=processes,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_process,
+                                 initargs=(valid_users, valid_books)) as pool:
+            pending = deque()
+            read_ahead = processes * 2
+
+            def drain_one():
+                nonlocal read, kept
+                chunk_num, future = pending.popleft()
+                rows_read, rows_kept, parts = future.result()
+                check_writers(writers)
+                read += rows_read
+                kept += rows_kept
+                replay = chunk_num <= replay_through
+                if on_chunk_started:
+                    on_chunk_started(chunk_num)
+                tracker.expect(chunk_num, sum(
+                    (len(records) + batch_size - 1) // batch_size for records in parts
+                ))
+                for index, records in enumerate(parts):
+                    for start in range(0, len(records), batch_size):
+                        queues[index].put((chunk_num, records[start:start + batch_size], replay))
+                print(f"    Chunk {chunk_num}: queued {rows_kept} ratings, skipped {rows_read - rows_kept}")
+
+            for chunk_num, chunk in enumerate(chunks, start=first_chunk):
+                pending.append((chunk_num, pool.submit(prepare_chunk, chunk, workers)))
+                if len(pending) >= read_ahead:
+                    drain_one()
+            while pending:
+                drain_one()
+    finally:
+        for batches in queues:
+            batches.put(None)
+        for writer in writers:
+            writer.join()
+    check_writers(writers)
+
+    errors = sorted(
+        (error for writer in writers for error in writer.failed),
+        key=lambda error: (error[0], error[1][0], error[1][1])
+    )
+    return {
+        'read': read,
+        'skipped': read - kept,
+        'loaded': sum(writer.loaded for writer in writers),
+        'failed': len(errors),
+        'errors': errors,
+    }
@@ -0,0 +1,97 @@
+"""
+Record building for the loaders
+Column-wise cleaning of CSV chunks and conversion into table-shaped frames and insert tuples
+"""
+
+import pandas as pd
+
+
+def to_records(frame):
+    """
+    Insert tuples for every row of frame (NaN/NA become None, numbers become Python types)
+    """
+    values = frame.astype(object)
+    values = values.where(frame.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def to_int(series):
+    """Whole-number column that keeps missing values (nullable Int64)"""
+    return pd.to_numeric(series, errors='coerce').astype('Int64')
+
+
+def book_frame(df, publisher_map):
+    """Rows for Books(ISBN, title, year_of_publication, publisher_id, image_url)"""
+    return pd.DataFrame({
+        'ISBN': df['ISBN'],
+        'title': df['Book-Title'],
+        'year_of_publication': to_int(df['Year-Of-Publication']),
+        'publisher_id': to_int(df['Publisher'].map(publisher_map)),
+        # Medium image URL is the single image_url
+        'image_url': df['Image-URL-M'],
+    })
+
+
+def book_author_frame(df, author_map):
+    """
+    Rows for Book_Authors(ISBN, author_id)
+
+    Returns:
+        (frame, skipped) - books whose author has no id are skipped
+    """
+    author_ids = to_int(df['Book-Author'].map(author_map))
+    known = author_ids.notna()
+    frame = pd.DataFrame({'ISBN': df['ISBN'][known], 'author_id': author_ids[known]})
+    return frame, int((~known).sum())
+
+
+def user_frame(df):
+    """Rows for Users(user_id, username, password, location, birth_year)"""
+    return pd.DataFrame({
+        'user_id': to_int(df['User-ID']),
+        'username': df['Username'],
+        'password': df['Password'],
+        'location': df['Location-Clean'],
+        'birth_year': to_int(df['Birth-Year']),
+    })
+
+
+def normalize_ratings_chunk(chunk):
+    """
+    Clean the columns of one ratings.csv chunk without dropping rows
+
+    Numeric columns are always float64 so every chunk has the same dtypes
+    (needed by the cleaned-input cache). Safe to apply twice.
+    """
+    # Clean column names
+    chunk.columns = chunk.columns.str.strip().str.replace('"', '')
+    
+    # Clean data
+    chunk['User-ID'] = pd.to_numeric(chunk['User-ID'], errors='coerce').astype('float64')
+    chunk['Book-Rating'] = pd.to_numeric(chunk['Book-Rating'], errors='coerce').astype('float64')
+    chunk['ISBN'] = chunk['ISBN'].astype(str).str.strip()
+    return chunk
+
+
+def clean_ratings_chunk(chunk, valid_users, valid_books):
+    """Clean one ratings.csv chunk and keep the rows that can be inserted"""
+    chunk = normalize_ratings_chunk(chunk)
+    
+    # Filter ratings
+    return chunk[
+        chunk['User-ID'].notna() &
+        chunk['ISBN'].notna() &
+        chunk['Book-Rating'].notna() &
+        (chunk['Book-Rating'] > 0) &  # Exclude 0 ratings
+        chunk['User-ID'].isin(valid_users) &
+        chunk['ISBN'].isin(valid_books)
+    ]
+
+
+def rating_frame(chunk):
+    """Rows for Ratings(user_id, ISBN, rating)"""
+    return pd.DataFrame({
+        'user_id': to_int(chunk['User-ID']),
+        'ISBN': chunk['ISBN'],
+        'rating': to_int(chunk['Book-Rating']),
+    })
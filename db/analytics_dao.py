@@ -4,6 +4,7 @@ Contains 3 complex analytical queries
 """
 
 from db.connection import db
+from db.row_source import QueryRowSource
 
 
 def get_top_publishers_by_rating(min_books=5, min_ratings=50):
@@ -34,7 +35,7 @@ def get_top_publishers_by_rating(min_books=5, min_ratings=50):
         ORDER BY avg_rating DESC, total_ratings DESC
         LIMIT 20
     """
-    return db.execute_query(query, (min_books, min_ratings))
+    return db.execute_query(query, (min_books, min_ratings), row_format='record')
 
 
 def get_top_rated_books_by_age_group(min_ratings=10, book_search=None):
@@ -54,6 +55,40 @@ def get_top_rated_books_by_age_group(min_ratings=10, book_search=None):
           GROUP BY on computed column, aggregations (COUNT, AVG), HAVING,
           optional WHERE clause for book filtering
     """
+    query, params = build_top_rated_books_by_age_group_query(min_ratings, book_search)
+    return db.execute_query(query, params, row_format='record')
+
+
+def iter_top_rated_books_by_age_group(min_ratings=10, book_search=None, batch_size=1000):
+    """
+    Stream COMPLEX QUERY 2 row by row
+    
+    Without a book search the result can run to tens of thousands of rows;
+    this yields them lazily instead of building the whole list.
+    """
+    query, params = build_top_rated_books_by_age_group_query(min_ratings, book_search)
+    return db.iter_query(query, params, batch_size=batch_size, row_format='record')
+
+
+def top_rated_books_by_age_group_source(min_ratings=10, book_search=None):
+    """
+    COMPLEX QUERY 2 as a row source for a virtual table view
+    
+    Rows are read as the view scrolls, and sorting by a column re-runs the
+    query with that ORDER BY on the server.
+    """
+    query, params = build_top_rated_books_by_age_group_query(min_ratings, book_search)
+    return QueryRowSource(query, params, sort_columns={
+        "Age Group": 'age_group',
+        "ISBN": 'ISBN',
+        "Title": 'title',
+        "Num Ratings": 'num_ratings',
+        "Avg Rating": 'avg_rating',
+    })
+
+
+def build_top_rated_books_by_age_group_query(min_ratings=10, book_search=None):
+    """Build the SQL and parameters for COMPLEX QUERY 2"""
     query = """
         SELECT 
             CASE 
@@ -87,7 +122,7 @@ def get_top_rated_books_by_age_group(min_ratings=10, book_search=None):
     
     params.append(min_ratings)
     
-    return db.execute_query(query, tuple(params))
+    return query, tuple(params)
 
 def get_most_active_book_clubs(min_members=3):
     """
@@ -123,4 +158,4 @@ def get_most_active_book_clubs(min_members=3):
         ORDER BY discussions_per_member DESC, total_discussions DESC
         LIMIT 20
     """
-    return db.execute_query(query, (min_members,))
\ No newline at end of file
+    return db.execute_query(query, (min_members,), row_format='record')
\ No newline at end of file
@@ -3,7 +3,13 @@ Authors data access object
 Handles author-related database operations
 """
 
+from config import NAME_CACHE_SIZE
+from db.cache import LRUCache
 from db.connection import db
+from db.names import resolve_name_ids
+
+# name -> author_id; only this process's writes invalidate it
+_author_ids = LRUCache(NAME_CACHE_SIZE)
 
 
 def get_all_authors(limit=None):
@@ -17,13 +23,13 @@ def get_all_authors(limit=None):
 def get_author_by_id(author_id):
     """Get author by ID"""
     query = "SELECT author_id, name FROM Authors WHERE author_id = %s"
-    return db.execute_query(query, (author_id,), fetch_one=True)
+    return db.execute_query(query, (author_id,), fetch_one=True, prepared=True)
 
 
 def get_author_by_name(name):
     """Get author by exact name"""
     query = "SELECT author_id, name FROM Authors WHERE name = %s"
-    return db.execute_query(query, (name,), fetch_one=True)
+    return db.execute_query(query, (name,), fetch_one=True, prepared=True)
 
 
 def search_authors(name_pattern):
@@ -42,24 +48,75 @@ def add_author(name):
     """Add new author"""
     query = "INSERT INTO Authors(name) VALUES (%s)"
     author_id = db.execute_update(query, (name,), return_lastrowid=True)
+    if author_id:
+        _author_ids.put(name, author_id)
     return author_id
 
 
 def get_or_create_author(name):
-    """Get existing author or create new one"""
-    # Try to find existing
+    """
+    Get existing author ID or create the author
+    
+    Names resolved before are answered from an in-process LRU cache. On a
+    miss the author is looked up, and only if absent inserted with
+    ON DUPLICATE KEY so a concurrent insert of the same name returns the
+    existing row's ID instead of failing.
+    """
+    author_id = _author_ids.get(name)
+    if author_id is not None:
+        return author_id
+    
+    # Look up first so existing names do not burn AUTO_INCREMENT values
     author = get_author_by_name(name)
     if author:
-        return author['author_id']
+        author_id = author['author_id']
+    else:
+        query = """
+            INSERT INTO Authors(name) VALUES (%s)
+            ON DUPLICATE KEY UPDATE author_id = LAST_INSERT_ID(author_id)
+        """
+        author_id = db.execute_update(query, (name,), return_lastrowid=True, prepared=True)
+    
+    if author_id:
+        _author_ids.put(name, author_id)
+    return author_id
+
+
+def resolve_author_ids(cursor, names):
+    """
+    Get or create IDs for many author names inside an open db.transaction()
+    
+    Cached names cost nothing; the rest are resolved in a constant number
+    of statements. Pass the result to remember_author_ids() once the
+    transaction has committed.
     
-    # Create new
-    return add_author(name)
+    Returns:
+        Dict of name -> author_id
+    """
+    ids = {}
+    missing = []
+    for name in dict.fromkeys(names):
+        author_id = _author_ids.get(name)
+        if author_id is None:
+            missing.append(name)
+        else:
+            ids[name] = author_id
+    ids.update(resolve_name_ids(cursor, 'Authors', 'author_id', missing))
+    return ids
+
+
+def remember_author_ids(ids):
+    """Cache name -> ID pairs resolved in a committed transaction"""
+    for name, author_id in ids.items():
+        _author_ids.put(name, author_id)
 
 
 def update_author(author_id, name):
     """Update author name"""
     query = "UPDATE Authors SET name = %s WHERE author_id = %s"
     rows = db.execute_update(query, (name, author_id))
+    if rows:
+        _author_ids.pop_value(author_id)
     return rows is not None and rows > 0
 
 
@@ -67,6 +124,8 @@ def delete_author(author_id):
     """Delete author (will fail if books exist due to FK)"""
     query = "DELETE FROM Authors WHERE author_id = %s"
     rows = db.execute_update(query, (author_id,))
+    if rows:
+        _author_ids.pop_value(author_id)
     return rows is not None and rows > 0
 
 
@@ -78,4 +137,14 @@ def get_author_book_count(author_id):
         WHERE author_id = %s
     """
     result = db.execute_query(query, (author_id,), fetch_one=True)
-    return result['book_count'] if result else 0
\ No newline at end of file
+    return result['book_count'] if result else 0
+
+
+def get_author_cache_stats():
+    """Get name -> ID cache counters (size, hits, misses, hit rate)"""
+    return _author_ids.stats()
+
+
+def clear_author_cache():
+    """Forget cached name -> ID lookups (e.g. after bulk loads by other processes)"""
+    _author_ids.clear()
@@ -3,63 +3,151 @@ Books data access object
 Handles book-related database operations
 """
 
+from itertools import islice
+from mysql.connector import Error, IntegrityError
 from db.connection import db
-from db.authors_dao import get_or_create_author
-from db.publishers_dao import get_or_create_publisher
+from db.authors_dao import get_or_create_author, resolve_author_ids, remember_author_ids
+from db.publishers_dao import get_or_create_publisher, resolve_publisher_ids, remember_publisher_ids
+from db.rating_stats import remove_book_ratings, apply_author_link
+from db.search import isbn_condition, text_condition, relevance_subquery
 
+BOOK_INSERT = """
+    INSERT INTO Books(ISBN, title, year_of_publication, publisher_id, image_url)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+BOOK_AUTHOR_INSERT = "INSERT INTO Book_Authors(ISBN, author_id) VALUES (%s, %s)"
+
+# Times a bulk chunk is retried after another writer inserted one of its ISBNs
+DUPLICATE_RETRIES = 3
+
+
+class BulkInsertError(Exception):
+    """add_books_bulk stopped part way; inserted counts the books committed before the failure"""
+
+    def __init__(self, inserted, error):
+        super().__init__(f"{error} (after {inserted} books were inserted)")
+        self.inserted = inserted
+        self.error = error
 
-def search_books(title=None, author=None, isbn=None, publisher=None, year=None, limit=100):
+
+def search_books(title=None, author=None, isbn=None, publisher=None, year=None,
+                 keywords=None, limit=100, after=None, before=None, at=None):
     """
     Search books with multiple filters
     
+    Title, author and publisher filters match words by prefix through
+    FULLTEXT indexes: 'hob' finds "The Hobbit", but a substring from the
+    middle of a word ('obbit') does not. Stopwords such as 'the' are left
+    out of the match; input with only short or stop words falls back to a
+    prefix match of the whole value on the B-tree index. A complete ISBN is
+    an exact primary key lookup; a partial one matches ISBNs starting with it.
+    
+    keywords runs a relevance-ranked search across title, author and
+    publisher; results are then ordered by relevance instead of title.
+    
+    Results are ordered by (title, ISBN) and paged by keyset: pass the
+    (title, ISBN) of the last row shown as after for the next page, or of
+    the first row shown as before for the previous one; at starts the page
+    at that row, to reload the page shown. Every page costs the same index
+    range scan, however deep it is.
+    
     Returns list of books with author and publisher info
     """
-    query = """
-        SELECT 
-            b.ISBN,
-            b.title,
-            b.year_of_publication,
-            b.image_url,
-            p.name as publisher_name,
-            p.publisher_id,
-            GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
-            ROUND(AVG(r.rating), 2) as avg_rating,
-            COUNT(r.rating_id) as rating_count
-        FROM Books b
-        LEFT JOIN Publishers p ON b.publisher_id = p.publisher_id
-        LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
-        LEFT JOIN Authors a ON ba.author_id = a.author_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
-        WHERE 1=1
-    """
+    if keywords and (after or before or at):
+        raise ValueError("Keyword searches are ordered by relevance and cannot be paged")
     
+    conditions = []
     params = []
     
+    if isbn:
+        sql, values = isbn_condition("b.ISBN", isbn)
+        conditions.append(sql)
+        params.extend(values)
+    
     if title:
-        query += " AND b.title LIKE %s"
-        params.append(f"%{title}%")
+        sql, values = text_condition("b.title", title)
+        conditions.append(sql)
+        params.extend(values)
     
     if author:
-        query += " AND a.name LIKE %s"
-        params.append(f"%{author}%")
-    
-    if isbn:
-        query += " AND b.ISBN LIKE %s"
-        params.append(f"%{isbn}%")
+        sql, values = text_condition("a.name", author)
+        conditions.append(f"""b.ISBN IN (
+            SELECT ba.ISBN FROM Book_Authors ba
+            JOIN Authors a ON ba.author_id = a.author_id
+            WHERE {sql})""")
+        params.extend(values)
     
     if publisher:
-        query += " AND p.name LIKE %s"
-        params.append(f"%{publisher}%")
+        sql, values = text_condition("p.name", publisher)
+        conditions.append(f"b.publisher_id IN (SELECT p.publisher_id FROM Publishers p WHERE {sql})")
+        params.extend(values)
     
     if year:
-        query += " AND b.year_of_publication = %s"
+        conditions.append("b.year_of_publication = %s")
         params.append(year)
     
-    query += " GROUP BY b.ISBN, b.title, b.year_of_publication, b.image_url, p.name, p.publisher_id"
-    query += " ORDER BY b.title"
-    query += f" LIMIT {limit}"
+    if after:
+        conditions.append("(b.title > %s OR (b.title = %s AND b.ISBN > %s))")
+        params.extend([after[0], after[0], after[1]])
+    
+    if before:
+        conditions.append("(b.title < %s OR (b.title = %s AND b.ISBN < %s))")
+        params.extend([before[0], before[0], before[1]])
+    
+    if at:
+        conditions.append("(b.title > %s OR (b.title = %s AND b.ISBN >= %s))")
+        params.extend([at[0], at[0], at[1]])
+    
+    relevance_sql, relevance_params = relevance_subquery(keywords) if keywords else (None, [])
+    if keywords and not relevance_sql:
+        # Every keyword is too short to be indexed
+        return []
+    
+    # Pick the page of ISBNs first so authors are only aggregated for the
+    # rows that are returned
+    if relevance_sql:
+        page = f"""
+            SELECT b.ISBN, hits.relevance
+            FROM Books b
+            JOIN ({relevance_sql}) hits ON hits.ISBN = b.ISBN
+        """
+        order = "page.relevance DESC, b.title, b.ISBN"
+        page_order = "hits.relevance DESC, b.title, b.ISBN"
+        params = relevance_params + params
+    else:
+        page = "SELECT b.ISBN FROM Books b"
+        order = "b.title, b.ISBN"
+        # Walk the index backwards from the cursor; the outer ORDER BY restores title order
+        page_order = "b.title DESC, b.ISBN DESC" if before else order
+    
+    if conditions:
+        page += " WHERE " + " AND ".join(conditions)
+    page += f" ORDER BY {page_order} LIMIT {int(limit)}"
+    
+    query = f"""
+        SELECT 
+            b.ISBN,
+            b.title,
+            b.year_of_publication,
+            b.image_url,
+            p.name as publisher_name,
+            p.publisher_id,
+            GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
+            ROUND(s.avg_rating, 2) as avg_rating,
+            COALESCE(s.rating_count, 0) as rating_count{", page.relevance" if relevance_sql else ""}
+        FROM ({page}) page
+        JOIN Books b ON b.ISBN = page.ISBN
+        LEFT JOIN Publishers p ON b.publisher_id = p.publisher_id
+        LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
+        LEFT JOIN Authors a ON ba.author_id = a.author_id
+        LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
+        GROUP BY b.ISBN, b.title, b.year_of_publication, b.image_url, p.name, p.publisher_id,
+                 s.avg_rating, s.rating_count{", page.relevance" if relevance_sql else ""}
+        ORDER BY {order}
+    """
     
-    return db.execute_query(query, tuple(params))
+    return db.execute_query(query, tuple(params), row_format='record')
+
 
 def get_book_by_isbn(isbn):
     """Get detailed book information by ISBN"""
@@ -73,23 +161,34 @@ def get_book_by_isbn(isbn):
             p.publisher_id,
             GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
             GROUP_CONCAT(DISTINCT a.author_id SEPARATOR ',') as author_ids,
-            AVG(r.rating) as avg_rating,
-            COUNT(DISTINCT r.rating_id) as rating_count
+            s.avg_rating,
+            COALESCE(s.rating_count, 0) as rating_count
         FROM Books b
         LEFT JOIN Publishers p ON b.publisher_id = p.publisher_id
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
+        LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
         WHERE b.ISBN = %s
-        GROUP BY b.ISBN, b.title, b.year_of_publication, b.image_url, p.name, p.publisher_id
+        GROUP BY b.ISBN, b.title, b.year_of_publication, b.image_url, p.name, p.publisher_id,
+                 s.avg_rating, s.rating_count
     """
-    return db.execute_query(query, (isbn,), fetch_one=True)
+    return db.execute_query(query, (isbn,), fetch_one=True, prepared=True)
+
+
+def _clean_author_names(author_names):
+    """Accept a single name or a list; drop blanks and surrounding whitespace"""
+    if isinstance(author_names, str):
+        author_names = [author_names]
+    return [name.strip() for name in author_names or [] if name and name.strip()]
 
 
 def add_book(isbn, title, author_names, publisher_name=None, year=None, image_url=None):
     """
     Add a new book with authors and publisher
     
+    Publisher and authors are resolved in bulk and the book and its author
+    links are inserted on one connection in a single transaction.
+    
     Args:
         isbn: Book ISBN
         title: Book title
@@ -101,44 +200,120 @@ def add_book(isbn, title, author_names, publisher_name=None, year=None, image_ur
     Returns:
         True on success, False on error
     """
-    # Ensure author_names is a list
-    if isinstance(author_names, str):
-        author_names = [author_names]
+    author_names = _clean_author_names(author_names)
+    if not author_names:
+        print("Error: No valid authors provided")
+        return False
     
-    # Get or create publisher
-    publisher_id = None
-    if publisher_name:
-        publisher_id = get_or_create_publisher(publisher_name)
+    try:
+        with db.transaction() as cursor:
+            publisher_ids = resolve_publisher_ids(cursor, [publisher_name] if publisher_name else [])
+            author_ids = resolve_author_ids(cursor, author_names)
+            
+            cursor.execute(BOOK_INSERT, (isbn, title, year, publisher_ids.get(publisher_name), image_url))
+            
+            # Two spellings may resolve to the same author under the column collation
+            links = list(dict.fromkeys((isbn, author_ids[name]) for name in author_names))
+            # executemany sends INSERT ... VALUES as one multi-row statement
+            cursor.executemany(BOOK_AUTHOR_INSERT, links)
+    except Error:
+        return False
     
-    # Get or create authors
-    author_ids = []
-    for author_name in author_names:
-        if author_name:
-            author_id = get_or_create_author(author_name.strip())
-            if author_id:
-                author_ids.append(author_id)
+    # Only cache IDs once the rows they point to are committed
+    remember_publisher_ids(publisher_ids)
+    remember_author_ids(author_ids)
+    return True
+
+
+def add_books_bulk(records, chunk_size=1000):
+    """
+    Add many books at once
     
-    if not author_ids:
-        print("Error: No valid authors provided")
-        return False
+    Records are processed chunk_size at a time. Each chunk resolves all of
+    its publishers and authors in bulk, inserts books and author links with
+    multi-row INSERTs, and commits as one transaction. Books whose ISBN
+    already exists (or repeats within the input) are skipped, as are
+    records without authors. A chunk that collides with a book another
+    writer inserted meanwhile is rolled back and retried, which skips it.
+    
+    Args:
+        records: Iterable of dicts with the add_book arguments as keys
+                 (isbn, title, author_names, publisher_name, year, image_url)
+        chunk_size: Books per transaction
     
-    # Prepare operations for transaction
-    operations = []
+    Returns:
+        Number of books inserted
     
-    # Insert book
-    book_query = """
-        INSERT INTO Books(ISBN, title, year_of_publication, publisher_id, image_url)
-        VALUES (%s, %s, %s, %s, %s)
+    Raises:
+        BulkInsertError on a database error; its inserted count covers the
+        chunks committed before the failing one, which are kept
     """
-    operations.append((book_query, (isbn, title, year, publisher_id, image_url)))
+    records = iter(records)
+    seen = set()
+    inserted = 0
     
-    # Insert book-author relationships
-    for author_id in author_ids:
-        ba_query = "INSERT INTO Book_Authors(ISBN, author_id) VALUES (%s, %s)"
-        operations.append((ba_query, (isbn, author_id)))
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return inserted
+        
+        books = []
+        for record in chunk:
+            isbn = record.get('isbn')
+            author_names = _clean_author_names(record.get('author_names'))
+            if not isbn or isbn in seen or not author_names:
+                continue
+            seen.add(isbn)
+            books.append((record, author_names))
+        
+        for attempt in range(DUPLICATE_RETRIES + 1):
+            try:
+                added = _insert_books_chunk(books)
+                break
+            except IntegrityError as e:
+                # The existence check takes no locks, so a concurrent insert
+                # of the same ISBN can get in first; the retry sees it
+                if attempt == DUPLICATE_RETRIES:
+                    raise BulkInsertError(inserted, e) from e
+            except Error as e:
+                raise BulkInsertError(inserted, e) from e
+        inserted += added
+
+
+def _insert_books_chunk(books):
+    """Insert one chunk of add_books_bulk in a transaction, skipping existing ISBNs (returns the count)"""
+    if not books:
+        return 0
+    with db.transaction() as cursor:
+        isbns = [record['isbn'] for record, _ in books]
+        cursor.execute(
+            f"SELECT ISBN FROM Books WHERE ISBN IN ({', '.join(['%s'] * len(isbns))})",
+            tuple(isbns)
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        books = [book for book in books if book[0]['isbn'] not in existing]
+        if not books:
+            return 0
+        
+        publisher_ids = resolve_publisher_ids(
+            cursor, [record.get('publisher_name') for record, _ in books if record.get('publisher_name')]
+        )
+        author_ids = resolve_author_ids(
+            cursor, [name for _, names in books for name in names]
+        )
+        
+        cursor.executemany(BOOK_INSERT, [
+            (record['isbn'], record.get('title'), record.get('year'),
+             publisher_ids.get(record.get('publisher_name')), record.get('image_url'))
+            for record, _ in books
+        ])
+        cursor.executemany(BOOK_AUTHOR_INSERT, list(dict.fromkeys(
+            (record['isbn'], author_ids[name]) for record, names in books for name in names
+        )))
     
-    # Execute transaction
-    return db.execute_transaction(operations)
+    remember_publisher_ids(publisher_ids)
+    remember_author_ids(author_ids)
+    return len(books)
 
 
 def update_book(isbn, title=None, year=None, publisher_name=None, image_url=None):
@@ -178,9 +353,15 @@ def update_book(isbn, title=None, year=None, publisher_name=None, image_url=None
 
 def delete_book(isbn):
     """Delete book (cascades to Book_Authors and Ratings)"""
-    query = "DELETE FROM Books WHERE ISBN = %s"
-    rows = db.execute_update(query, (isbn,))
-    return rows is not None and rows > 0
+    try:
+        with db.transaction() as cursor:
+            # The cascade skips the raters' summaries, so take the ratings out first
+            remove_book_ratings(cursor, isbn)
+            cursor.execute("DELETE FROM Books WHERE ISBN = %s", (isbn,))
+            rows = cursor.rowcount
+    except Error:
+        return False
+    return rows > 0
 
 
 def get_book_authors(isbn):
@@ -196,18 +377,33 @@ def get_book_authors(isbn):
 
 
 def add_book_author(isbn, author_name):
-    """Add an author to a book"""
+    """Add an author to a book (counted for the users who rated it)"""
     author_id = get_or_create_author(author_name)
-    query = "INSERT IGNORE INTO Book_Authors(ISBN, author_id) VALUES (%s, %s)"
-    rows = db.execute_update(query, (isbn, author_id))
-    return rows is not None
+    if not author_id:
+        return False
+    try:
+        with db.transaction() as cursor:
+            cursor.execute("INSERT IGNORE INTO Book_Authors(ISBN, author_id) VALUES (%s, %s)",
+                           (isbn, author_id))
+            if cursor.rowcount > 0:
+                apply_author_link(cursor, isbn, author_id, linked=True)
+    except Error:
+        return False
+    return True
 
 
 def remove_book_author(isbn, author_id):
-    """Remove an author from a book"""
-    query = "DELETE FROM Book_Authors WHERE ISBN = %s AND author_id = %s"
-    rows = db.execute_update(query, (isbn, author_id))
-    return rows is not None and rows > 0
+    """Remove an author from a book (and from the counts of the users who rated it)"""
+    try:
+        with db.transaction() as cursor:
+            cursor.execute("DELETE FROM Book_Authors WHERE ISBN = %s AND author_id = %s",
+                           (isbn, author_id))
+            rows = cursor.rowcount
+            if rows > 0:
+                apply_author_link(cursor, isbn, author_id, linked=False)
+    except Error:
+        return False
+    return rows > 0
 
 
 def get_books_by_publisher(publisher_id, limit=100):
@@ -218,13 +414,13 @@ def get_books_by_publisher(publisher_id, limit=100):
             b.title,
             b.year_of_publication,
             GROUP_CONCAT(a.name SEPARATOR ', ') as authors,
-            AVG(r.rating) as avg_rating
+            s.avg_rating
         FROM Books b
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
+        LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
         WHERE b.publisher_id = %s
-        GROUP BY b.ISBN, b.title, b.year_of_publication
+        GROUP BY b.ISBN, b.title, b.year_of_publication, s.avg_rating
         ORDER BY b.title
         LIMIT %s
     """
@@ -0,0 +1,95 @@
+"""
+In-process caches
+Small bounded LRU mapping shared by the connection and DAO layers
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping that evicts the least recently used key
+
+    Args:
+        capacity: Maximum number of entries kept
+        on_evict: Optional callback(key, value) run when an entry is pushed out
+    """
+
+    def __init__(self, capacity, on_evict=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value (marking it recently used) or default"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Insert or replace a value, evicting the oldest entry if full"""
+        evicted = None
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.capacity:
+                evicted = self._data.popitem(last=False)
+                self.evictions += 1
+
+        if evicted and self.on_evict:
+            self.on_evict(*evicted)
+
+    def pop(self, key, default=None):
+        """Remove a key without running on_evict"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def pop_value(self, value):
+        """Remove every key mapped to value (without on_evict); return how many"""
+        with self._lock:
+            keys = [key for key, cached in self._data.items() if cached == value]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        """Drop every entry without running on_evict"""
+        with self._lock:
+            self._data.clear()
+
+    def values(self):
+        """Snapshot of cached values"""
+        with self._lock:
+            return list(self._data.values())
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        """Return hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -5,6 +5,124 @@ Handles book club-related database operations
 
 from db.connection import db
 
+CLUB_DETAILS_QUERY = """
+    SELECT 
+        bc.club_id,
+        bc.name,
+        bc.description,
+        bc.is_public,
+        bc.created_by,
+        bc.max_members,
+        u.username as creator_username,
+        COUNT(DISTINCT cm.user_id) as member_count
+    FROM Book_Clubs bc
+    JOIN Users u ON bc.created_by = u.user_id
+    LEFT JOIN Club_Members cm ON bc.club_id = cm.club_id
+    WHERE bc.club_id = %s
+    GROUP BY bc.club_id, bc.name, bc.description, bc.is_public, bc.created_by, bc.max_members, u.username
+"""
+
+CLUB_MEMBERS_QUERY = """
+    SELECT 
+        cm.user_id,
+        cm.role,
+        u.username,
+        u.location,
+        u.birth_year
+    FROM Club_Members cm
+    JOIN Users u ON cm.user_id = u.user_id
+    WHERE cm.club_id = %s
+    ORDER BY 
+        CASE cm.role
+            WHEN 'admin' THEN 1
+            WHEN 'moderator' THEN 2
+            WHEN 'member' THEN 3
+        END,
+        u.username
+"""
+
+READING_QUEUE_QUERY = """
+    SELECT 
+        rq.queue_id,
+        rq.queue_position,
+        rq.ISBN,
+        b.title,
+        GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
+        u.username as added_by_username,
+        s.avg_rating,
+        COALESCE(s.rating_count, 0) as rating_count
+    FROM Reading_Queue rq
+    JOIN Books b ON rq.ISBN = b.ISBN
+    LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
+    LEFT JOIN Authors a ON ba.author_id = a.author_id
+    LEFT JOIN Users u ON rq.added_by = u.user_id
+    LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
+    WHERE rq.club_id = %s
+    GROUP BY rq.queue_id, rq.queue_position, rq.ISBN, b.title, u.username,
+             s.avg_rating, s.rating_count
+    ORDER BY rq.queue_position
+"""
+
+READING_HISTORY_QUERY = """
+    SELECT 
+        rh.history_id,
+        rh.ISBN,
+        b.title,
+        GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
+        rh.start_date,
+        rh.end_date,
+        s.avg_rating,
+        COALESCE(s.rating_count, 0) as rating_count,
+        CASE WHEN rh.end_date IS NULL THEN 'Current' ELSE 'Completed' END as status
+    FROM Reading_History rh
+    JOIN Books b ON rh.ISBN = b.ISBN
+    LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
+    LEFT JOIN Authors a ON ba.author_id = a.author_id
+    LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
+    WHERE rh.club_id = %s
+    GROUP BY rh.history_id, rh.ISBN, b.title, rh.start_date, rh.end_date,
+             s.avg_rating, s.rating_count
+    ORDER BY rh.start_date DESC
+"""
+
+RECENT_DISCUSSIONS_QUERY = """
+    (
+        SELECT 
+            gd.discussion_id,
+            'general' as discussion_type,
+            gd.title,
+            gd.content,
+            NULL as ISBN,
+            NULL as chapter_number,
+            u.username,
+            gd.created_date
+        FROM General_Discussions gd
+        JOIN Users u ON gd.user_id = u.user_id
+        WHERE gd.club_id = %s
+        ORDER BY gd.created_date DESC
+        LIMIT %s
+    )
+    UNION ALL
+    (
+        SELECT 
+            cd.discussion_id,
+            'chapter' as discussion_type,
+            cd.title,
+            cd.content,
+            cd.ISBN,
+            cd.chapter_number,
+            u.username,
+            cd.created_date
+        FROM Chapter_Discussions cd
+        JOIN Users u ON cd.user_id = u.user_id
+        WHERE cd.club_id = %s
+        ORDER BY cd.created_date DESC
+        LIMIT %s
+    )
+    ORDER BY created_date DESC
+    LIMIT %s
+"""
+
 
 def get_all_clubs(public_only=False, limit=100):
     """Get all clubs with basic info"""
@@ -42,23 +160,40 @@ def get_all_clubs(public_only=False, limit=100):
 
 def get_club_by_id(club_id):
     """Get detailed club information"""
-    query = """
-        SELECT 
-            bc.club_id,
-            bc.name,
-            bc.description,
-            bc.is_public,
-            bc.created_by,
-            bc.max_members,
-            u.username as creator_username,
-            COUNT(DISTINCT cm.user_id) as member_count
-        FROM Book_Clubs bc
-        JOIN Users u ON bc.created_by = u.user_id
-        LEFT JOIN Club_Members cm ON bc.club_id = cm.club_id
-        WHERE bc.club_id = %s
-        GROUP BY bc.club_id, bc.name, bc.description, bc.is_public, bc.created_by, bc.max_members, u.username
+    return db.execute_query(CLUB_DETAILS_QUERY, (club_id,), fetch_one=True, prepared=True)
+
+
+def get_club_snapshot(club_id, discussion_limit=50):
+    """
+    Everything the club dashboard shows, read in one go
+    
+    Details, members, queue, history and recent discussions are read by five
+    queries on one connection and one consistent snapshot (see
+    DBConnection.execute_queries); the current book is taken from the history.
+    
+    Returns:
+        Dict with 'club', 'members', 'queue', 'history', 'current_book' and
+        'discussions', or None on error
     """
-    return db.execute_query(query, (club_id,), fetch_one=True)
+    results = db.execute_queries([
+        (CLUB_DETAILS_QUERY, (club_id,)),
+        (CLUB_MEMBERS_QUERY, (club_id,)),
+        (READING_QUEUE_QUERY, (club_id,)),
+        (READING_HISTORY_QUERY, (club_id,)),
+        (RECENT_DISCUSSIONS_QUERY, (club_id, discussion_limit, club_id, discussion_limit, discussion_limit)),
+    ])
+    if results is None:
+        return None
+    
+    club, members, queue, history, discussions = results
+    return {
+        'club': club[0] if club else None,
+        'members': members,
+        'queue': queue,
+        'history': history,
+        'current_book': next((row for row in history if row['end_date'] is None), None),
+        'discussions': discussions,
+    }
 
 
 def create_club(name, description, is_public, created_by, max_members=50):
@@ -126,38 +261,20 @@ def delete_club(club_id):
 
 def get_club_members(club_id):
     """Get all members of a club with their roles"""
-    query = """
-        SELECT 
-            cm.user_id,
-            cm.role,
-            u.username,
-            u.location,
-            u.birth_year
-        FROM Club_Members cm
-        JOIN Users u ON cm.user_id = u.user_id
-        WHERE cm.club_id = %s
-        ORDER BY 
-            CASE cm.role
-                WHEN 'admin' THEN 1
-                WHEN 'moderator' THEN 2
-                WHEN 'member' THEN 3
-            END,
-            u.username
-    """
-    return db.execute_query(query, (club_id,))
+    return db.execute_query(CLUB_MEMBERS_QUERY, (club_id,))
 
 
 def is_user_in_club(club_id, user_id):
     """Check if user is a member of club"""
     query = "SELECT role FROM Club_Members WHERE club_id = %s AND user_id = %s"
-    result = db.execute_query(query, (club_id, user_id), fetch_one=True)
+    result = db.execute_query(query, (club_id, user_id), fetch_one=True, prepared=True)
     return result is not None
 
 
 def get_user_role_in_club(club_id, user_id):
     """Get user's role in club"""
     query = "SELECT role FROM Club_Members WHERE club_id = %s AND user_id = %s"
-    result = db.execute_query(query, (club_id, user_id), fetch_one=True)
+    result = db.execute_query(query, (club_id, user_id), fetch_one=True, prepared=True)
     return result['role'] if result else None
 
 
@@ -189,27 +306,7 @@ def get_club_reading_queue(club_id):
     Get club's reading queue
     Books ordered by queue position
     """
-    query = """
-        SELECT 
-            rq.queue_id,
-            rq.queue_position,
-            rq.ISBN,
-            b.title,
-            GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
-            u.username as added_by_username,
-            AVG(r.rating) as avg_rating,
-            COUNT(DISTINCT r.rating_id) as rating_count
-        FROM Reading_Queue rq
-        JOIN Books b ON rq.ISBN = b.ISBN
-        LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
-        LEFT JOIN Authors a ON ba.author_id = a.author_id
-        LEFT JOIN Users u ON rq.added_by = u.user_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
-        WHERE rq.club_id = %s
-        GROUP BY rq.queue_id, rq.queue_position, rq.ISBN, b.title, u.username
-        ORDER BY rq.queue_position
-    """
-    return db.execute_query(query, (club_id,))
+    return db.execute_query(READING_QUEUE_QUERY, (club_id,))
 
 
 def add_to_reading_queue(club_id, isbn, added_by):
@@ -250,27 +347,7 @@ def get_club_reading_history(club_id):
     Get club's reading history
     Shows completed books and current book
     """
-    query = """
-        SELECT 
-            rh.history_id,
-            rh.ISBN,
-            b.title,
-            GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
-            rh.start_date,
-            rh.end_date,
-            AVG(r.rating) as avg_rating,
-            COUNT(DISTINCT r.rating_id) as rating_count,
-            CASE WHEN rh.end_date IS NULL THEN 'Current' ELSE 'Completed' END as status
-        FROM Reading_History rh
-        JOIN Books b ON rh.ISBN = b.ISBN
-        LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
-        LEFT JOIN Authors a ON ba.author_id = a.author_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
-        WHERE rh.club_id = %s
-        GROUP BY rh.history_id, rh.ISBN, b.title, rh.start_date, rh.end_date
-        ORDER BY rh.start_date DESC
-    """
-    return db.execute_query(query, (club_id,))
+    return db.execute_query(READING_HISTORY_QUERY, (club_id,))
 
 
 def get_club_current_book(club_id):
@@ -289,7 +366,7 @@ def get_club_current_book(club_id):
         WHERE rh.club_id = %s AND rh.end_date IS NULL
         GROUP BY rh.history_id, rh.ISBN, b.title, rh.start_date
     """
-    return db.execute_query(query, (club_id,), fetch_one=True)
+    return db.execute_query(query, (club_id,), fetch_one=True, prepared=True)
 
 
 def set_current_book(club_id, isbn, start_date=None):
@@ -338,42 +415,10 @@ def complete_current_book(club_id, end_date=None):
 def get_club_recent_discussions(club_id, limit=20):
     """
     Get recent discussions from club
-    Combines general and chapter discussions
-    """
-    query = """
-        (
-            SELECT 
-                gd.discussion_id,
-                'general' as discussion_type,
-                gd.title,
-                gd.content,
-                NULL as ISBN,
-                NULL as chapter_number,
-                u.username,
-                gd.created_date
-            FROM General_Discussions gd
-            JOIN Users u ON gd.user_id = u.user_id
-            WHERE gd.club_id = %s
-        )
-        UNION ALL
-        (
-            SELECT 
-                cd.discussion_id,
-                'chapter' as discussion_type,
-                cd.title,
-                cd.content,
-                cd.ISBN,
-                cd.chapter_number,
-                u.username,
-                cd.created_date
-            FROM Chapter_Discussions cd
-            JOIN Users u ON cd.user_id = u.user_id
-            WHERE cd.club_id = %s
-        )
-        ORDER BY created_date DESC
-        LIMIT %s
+    Combines general and chapter discussions (each side reads only its
+    newest `limit` rows through idx_club_date)
     """
-    return db.execute_query(query, (club_id, club_id, limit))
+    return db.execute_query(RECENT_DISCUSSIONS_QUERY, (club_id, limit, club_id, limit, limit))
 
 
 def add_general_discussion(club_id, user_id, title, content):
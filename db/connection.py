@@ -1,10 +1,46 @@
-import mysql.connector
+import threading
+import time
+from contextlib import contextmanager
 from mysql.connector import Error
-from config import DB_CONFIG
+from config import DB_CONFIG, POOL_CONFIG, STATEMENT_CACHE_SIZE, METRICS_CONFIG, PLAN_CAPTURE_CONFIG
+from db.cache import LRUCache
+from db.explain import PlanCapture
+from db.metrics import MetricsRegistry
+from db.pool import ConnectionPool
+from db.rows import make_records, record_type
+
+ROW_FORMATS = ('dict', 'record')
+
+
+class _RecordingCursor:
+    """Cursor wrapper that notes the SQL run inside db.transaction() for the metrics"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.statements = []
+    
+    def execute(self, query, *args, **kwargs):
+        self._note(query)
+        return self._cursor.execute(query, *args, **kwargs)
+    
+    def executemany(self, query, *args, **kwargs):
+        self._note(query)
+        return self._cursor.executemany(query, *args, **kwargs)
+    
+    def _note(self, query):
+        # A statement repeated in a loop is listed once
+        if query not in self.statements:
+            self.statements.append(query)
+    
+    def __iter__(self):
+        return iter(self._cursor)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
 
 
 class DBConnection:
-    """Singleton database connection manager"""
+    """Singleton database connection manager backed by a connection pool"""
     
     _instance = None
     
@@ -14,56 +50,321 @@ class DBConnection:
         return cls._instance
     
     def __init__(self):
+        # __init__ runs on every DBConnection() call - only build the pool once
+        if getattr(self, '_initialized', False):
+            return
         self.config = DB_CONFIG
+        self.pool = ConnectionPool(self.config, **POOL_CONFIG)
+        self._stmt_lock = threading.Lock()
+        self._stmt_hits = 0
+        self._stmt_misses = 0
+        self._stmt_evictions = 0
+        self.metrics = MetricsRegistry(**METRICS_CONFIG)
+        self.plans = PlanCapture(self.pool, **PLAN_CAPTURE_CONFIG)
+        self.metrics.add_slow_listener(self.plans.on_slow_query)
+        self._initialized = True
     
     def get_connection(self):
-        """Create and return a new database connection"""
+        """Check out a pooled connection (return it with release_connection)"""
         try:
-            connection = mysql.connector.connect(**self.config)
-            return connection
+            return self.pool.acquire()
         except Error as e:
             print(f"Error connecting to database: {e}")
             raise
     
-    def execute_query(self, query, params=None, fetch_one=False):
+    def release_connection(self, connection, discard=False):
+        """Return a connection to the pool, or close it if discard is True"""
+        self.pool.release(connection, discard=discard)
+    
+    def get_pool_stats(self):
+        """Get connection pool statistics (wait time, in-use, created, recycled)"""
+        return self.pool.stats()
+    
+    def get_statement_cache_stats(self):
+        """Get prepared statement cache counters (summed over all pooled connections)"""
+        with self._stmt_lock:
+            lookups = self._stmt_hits + self._stmt_misses
+            return {
+                'hits': self._stmt_hits,
+                'misses': self._stmt_misses,
+                'evictions': self._stmt_evictions,
+                'hit_rate': self._stmt_hits / lookups if lookups else 0.0,
+                'capacity_per_connection': STATEMENT_CACHE_SIZE,
+            }
+    
+    def get_query_metrics(self):
+        """Get per-caller query timings (count, p50/p95/p99, max, rows, acquire time)"""
+        return self.metrics.snapshot()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close_all()
+    
+    def _prepared_cursor(self, connection, query):
+        """
+        Get the prepared cursor for query on this pooled connection
+        
+        Cursors are cached per connection keyed by SQL text, so repeated
+        calls re-execute the server-side statement instead of re-parsing it.
+        """
+        state = self.pool.connection_state(connection)
+        statements = state.get('statements')
+        if statements is None:
+            statements = LRUCache(STATEMENT_CACHE_SIZE, on_evict=self._close_statement)
+            state['statements'] = statements
+        
+        cursor = statements.get(query)
+        with self._stmt_lock:
+            if cursor is None:
+                self._stmt_misses += 1
+            else:
+                self._stmt_hits += 1
+        
+        if cursor is None:
+            cursor = connection.cursor(prepared=True)
+            statements.put(query, cursor)
+        return cursor
+    
+    def _forget_prepared(self, connection, query):
+        """Drop a cached prepared cursor after it failed"""
+        try:
+            statements = self.pool.connection_state(connection).get('statements')
+        except KeyError:
+            return
+        if statements is not None:
+            cursor = statements.pop(query)
+            if cursor is not None:
+                self._close_statement(query, cursor, evicted=False)
+    
+    def _close_statement(self, query, cursor, evicted=True):
+        """Deallocate a prepared statement pushed out of the cache"""
+        if evicted:
+            with self._stmt_lock:
+                self._stmt_evictions += 1
+        try:
+            cursor.close()
+        except Error:
+            pass
+    
+    def _cleanup(self, connection, cursor):
+        """Close the cursor and hand the connection back to the pool"""
+        discard = False
+        if cursor:
+            try:
+                cursor.close()
+            except Error:
+                # A cursor that cannot be closed leaves the connection unusable
+                discard = True
+        if connection:
+            self.release_connection(connection, discard=discard)
+    
+    def execute_query(self, query, params=None, fetch_one=False, prepared=False, row_format='dict'):
         """
         Execute a SELECT query and return results
         
         Args:
             query: SQL query string
-            params: Query parameters (tuple or dict)
+            params: Query parameters (tuple or dict; tuple only when prepared)
             fetch_one: If True, return single row; else return all rows
+            prepared: If True, run through the per-connection prepared statement cache
+            row_format: 'dict' for one dict per row, or 'record' for compact
+                        tuple rows sharing one column index (see db.rows)
             
         Returns:
-            List of tuples (or single tuple if fetch_one=True), or None on error
+            List of rows (or single row if fetch_one=True), or None on error
         """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Unknown row_format: {row_format}")
+        
+        timer = self.metrics.timer(query, params)
         connection = None
         cursor = None
         try:
             connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
+            timer.acquired()
+            
+            if prepared:
+                statement = self._prepared_cursor(connection, query)
+                statement.execute(query, params or ())
+                # Always drain the result so the cached statement can be re-executed
+                result = self._shape_rows(statement.column_names, statement.fetchall(), row_format)
+                timer.rows = len(result)
+                if fetch_one:
+                    result = result[0] if result else None
+                return result
+            
+            # Buffered so a partially read result never leaves the pooled
+            # connection with unread rows
+            if row_format == 'dict':
+                cursor = connection.cursor(dictionary=True, buffered=True)
+            else:
+                cursor = connection.cursor(buffered=True)
             cursor.execute(query, params or ())
             
             if fetch_one:
-                result = cursor.fetchone()
-            else:
-                result = cursor.fetchall()
+                row = cursor.fetchone()
+                timer.rows = 0 if row is None else 1
+                if row is None or row_format == 'dict':
+                    return row
+                return record_type(tuple(cursor.column_names))(row)
             
-            return result
+            rows = cursor.fetchall()
+            timer.rows = len(rows)
+            if row_format == 'dict':
+                return rows
+            return self._shape_rows(cursor.column_names, rows, row_format)
             
         except Error as e:
+            timer.error = e
+            if prepared and connection:
+                self._forget_prepared(connection, query)
             print(f"Error executing query: {e}")
             print(f"Query: {query}")
             print(f"Params: {params}")
             return None
             
         finally:
-            if cursor:
-                cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
+            self._cleanup(connection, cursor)
+            timer.finish()
     
-    def execute_update(self, query, params=None, return_lastrowid=False):
+    def execute_queries(self, queries, row_format='dict'):
+        """
+        Run several SELECT queries on one pooled connection
+
+        The queries share one read-only transaction with a consistent
+        snapshot, so their results agree with each other even while other
+        connections write, and only one connection is checked out.
+
+        Args:
+            queries: List of (query, params) tuples
+            row_format: 'dict' or 'record', as for execute_query
+
+        Returns:
+            List with the rows of each query, in order, or None on error
+        """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Unknown row_format: {row_format}")
+
+        # Timed as one unit, like execute_transaction
+        timer = self.metrics.timer(';\n'.join(query for query, _ in queries))
+        connection = None
+        cursor = None
+        try:
+            connection = self.get_connection()
+            timer.acquired()
+            connection.start_transaction(consistent_snapshot=True, readonly=True)
+            cursor = connection.cursor(buffered=True)
+
+            results = []
+            for query, params in queries:
+                cursor.execute(query, params or ())
+                results.append(self._shape_rows(cursor.column_names, cursor.fetchall(), row_format))
+            connection.commit()
+            timer.rows = sum(len(rows) for rows in results)
+            return results
+
+        except Error as e:
+            timer.error = e
+            if connection:
+                connection.rollback()
+            print(f"Error executing queries: {e}")
+            return None
+
+        finally:
+            self._cleanup(connection, cursor)
+            timer.finish()
+
+    @staticmethod
+    def _shape_rows(columns, rows, row_format):
+        """Turn raw cursor tuples into dicts or records"""
+        if row_format == 'record':
+            return make_records(columns, rows)
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def iter_query(self, query, params=None, batch_size=1000, batches=False, row_format='dict'):
+        """
+        Stream a SELECT query without materialising the whole result
+        
+        Rows are read from an unbuffered cursor batch_size at a time, so
+        memory stays flat however large the result is. The pooled connection
+        is held only while iterating: it is returned once the result is
+        exhausted, and closed instead if the caller stops early (dropping the
+        socket is cheaper than draining the unread rows).
+        
+        Args:
+            query: SQL query string
+            params: Query parameters (tuple or dict)
+            batch_size: Rows fetched from the server per round trip
+            batches: If True, yield lists of up to batch_size rows instead of single rows
+            row_format: 'dict' or 'record' (see execute_query)
+            
+        Yields:
+            Rows (or lists of rows if batches=True)
+            
+        Raises:
+            mysql.connector.Error: errors are printed and re-raised so a
+            failed export is never mistaken for a short one
+        
+        The recorded time covers only the server round trips (the execute
+        and each fetchmany), not the time the caller spends between rows, so
+        a stream left open by a view does not look like a slow query.
+        """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Unknown row_format: {row_format}")
+        
+        # Start the timer here rather than in the generator body so the
+        # calling DAO function is still on the stack
+        timer = self.metrics.timer(query, params)
+        return self._iter_rows(timer, query, params, batch_size, batches, row_format)
+    
+    def _iter_rows(self, timer, query, params, batch_size, batches, row_format):
+        """Generator behind iter_query"""
+        connection = self.get_connection()
+        timer.acquired()
+        timer.rows = 0
+        cursor = None
+        finished = False
+        server_time = 0.0
+        try:
+            cursor = connection.cursor(dictionary=(row_format == 'dict'))
+            started = time.perf_counter()
+            cursor.execute(query, params or ())
+            server_time += time.perf_counter() - started
+            make_row = None
+            if row_format == 'record':
+                make_row = record_type(tuple(cursor.column_names))
+            
+            while True:
+                started = time.perf_counter()
+                rows = cursor.fetchmany(batch_size)
+                server_time += time.perf_counter() - started
+                if not rows:
+                    break
+                timer.rows += len(rows)
+                if make_row:
+                    rows = list(map(make_row, rows))
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+            
+            finished = True
+            
+        except Error as e:
+            timer.error = e
+            print(f"Error streaming query: {e}")
+            print(f"Query: {query}")
+            print(f"Params: {params}")
+            raise
+            
+        finally:
+            if finished:
+                self._cleanup(connection, cursor)
+            else:
+                self.release_connection(connection, discard=True)
+            timer.finish(statement_time=server_time)
+    
+    def execute_update(self, query, params=None, return_lastrowid=False, prepared=False):
         """
         Execute INSERT, UPDATE, or DELETE query
         
@@ -71,36 +372,44 @@ class DBConnection:
             query: SQL query string
             params: Query parameters
             return_lastrowid: If True, return last inserted ID
+            prepared: If True, run through the per-connection prepared statement cache
             
         Returns:
             Number of affected rows (or last inserted ID), or None on error
         """
+        timer = self.metrics.timer(query, params)
         connection = None
         cursor = None
         try:
             connection = self.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(query, params or ())
+            timer.acquired()
+            if prepared:
+                statement = self._prepared_cursor(connection, query)
+            else:
+                statement = cursor = connection.cursor()
+            statement.execute(query, params or ())
             connection.commit()
+            timer.rows = statement.rowcount
             
             if return_lastrowid:
-                return cursor.lastrowid
+                return statement.lastrowid
             else:
-                return cursor.rowcount
+                return statement.rowcount
                 
         except Error as e:
+            timer.error = e
             if connection:
                 connection.rollback()
+                if prepared:
+                    self._forget_prepared(connection, query)
             print(f"Error executing update: {e}")
             print(f"Query: {query}")
             print(f"Params: {params}")
             return None
             
         finally:
-            if cursor:
-                cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
+            self._cleanup(connection, cursor)
+            timer.finish()
     
     def execute_many(self, query, params_list):
         """
@@ -113,26 +422,76 @@ class DBConnection:
         Returns:
             Total affected rows, or None on error
         """
+        # The first parameter set lets a slow batch be explained
+        timer = self.metrics.timer(query, params_list[0] if params_list else None)
         connection = None
         cursor = None
         try:
             connection = self.get_connection()
+            timer.acquired()
             cursor = connection.cursor()
             cursor.executemany(query, params_list)
             connection.commit()
+            timer.rows = cursor.rowcount
             return cursor.rowcount
             
         except Error as e:
+            timer.error = e
             if connection:
                 connection.rollback()
             print(f"Error executing batch: {e}")
             return None
             
         finally:
-            if cursor:
-                cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
+            self._cleanup(connection, cursor)
+            timer.finish()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run several statements on one pooled connection in one transaction
+        
+        Yields a buffered cursor; the transaction commits when the block
+        exits and rolls back if it raises. Database errors are printed and
+        re-raised so the caller can turn them into its own return value.
+        
+        Example:
+            with db.transaction() as cursor:
+                cursor.execute(...)
+                cursor.executemany(...)
+        """
+        # Attributed to the DAO function using the block (contextlib frames are skipped)
+        timer = self.metrics.timer("TRANSACTION")
+        connection = None
+        cursor = None
+        recorder = None
+        try:
+            connection = self.get_connection()
+            timer.acquired()
+            cursor = connection.cursor(buffered=True)
+            recorder = _RecordingCursor(cursor)
+            connection.start_transaction()
+            yield recorder
+            connection.commit()
+            
+        except Error as e:
+            timer.error = e
+            if connection:
+                connection.rollback()
+            print(f"Transaction error: {e}")
+            raise
+            
+        except BaseException:
+            if connection:
+                connection.rollback()
+            raise
+            
+        finally:
+            self._cleanup(connection, cursor)
+            if recorder is not None and recorder.statements:
+                # Logged joined with ';' like execute_transaction (never explained as one)
+                timer.query = ';\n'.join(recorder.statements)
+            timer.finish()
     
     def execute_transaction(self, operations):
         """
@@ -144,10 +503,13 @@ class DBConnection:
         Returns:
             True on success, False on error
         """
+        # Timed as one unit; the slow-query log shows the statements joined
+        timer = self.metrics.timer(';\n'.join(query for query, _ in operations))
         connection = None
         cursor = None
         try:
             connection = self.get_connection()
+            timer.acquired()
             cursor = connection.cursor()
             
             # Start transaction
@@ -162,16 +524,15 @@ class DBConnection:
             return True
             
         except Error as e:
+            timer.error = e
             if connection:
                 connection.rollback()
             print(f"Transaction error: {e}")
             return False
             
         finally:
-            if cursor:
-                cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
+            self._cleanup(connection, cursor)
+            timer.finish()
 
 
 # Create singleton instance
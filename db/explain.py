@@ -0,0 +1,283 @@
+"""
+Query plan capture
+Stores EXPLAIN FORMAT=JSON for slow statements and reports plan risks per DAO function
+
+Report usage (from the project root):
+
+    python -m db.explain                  # latest plan per query, flagged risks
+    python -m db.explain --caller books_dao.search_books
+    python -m db.explain --regressions    # only plans that got worse since first seen
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+from mysql.connector import Error
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statements EXPLAIN accepts without running them
+_EXPLAINABLE = ('select', 'with', 'update', 'delete', 'insert', 'replace')
+
+FLAG_FULL_SCAN = 'full table scan'
+FLAG_INDEX_SCAN = 'full index scan'
+FLAG_FILESORT = 'filesort'
+FLAG_TEMPORARY = 'temporary table'
+
+
+def normalize_query(query):
+    """Collapse a statement to its shape: literals and placeholders become ?, IN lists shrink"""
+    text = _STRING_LITERAL.sub('?', query)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _VALUE_LIST.sub('(?+)', text)
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+def fingerprint(query):
+    """Stable short hash identifying statements of the same shape"""
+    return hashlib.sha1(normalize_query(query).encode('utf-8')).hexdigest()[:16]
+
+
+def analyze_plan(plan):
+    """
+    Walk an EXPLAIN FORMAT=JSON document and list its risky operations
+
+    Returns:
+        List of (flag, table) tuples, e.g. ('full table scan', 'Books');
+        table is None for filesorts and temporary tables not tied to one table
+    """
+    findings = []
+
+    def walk(node, table=None):
+        if isinstance(node, dict):
+            table = node.get('table_name', table)
+            access = node.get('access_type')
+            if access == 'ALL':
+                findings.append((FLAG_FULL_SCAN, table))
+            elif access == 'index':
+                findings.append((FLAG_INDEX_SCAN, table))
+            elif access == 'table' and not node.get('index_name'):
+                # EXPLAIN format version 2 (MySQL 8.3+)
+                findings.append((FLAG_FULL_SCAN, table))
+            if node.get('using_filesort'):
+                findings.append((FLAG_FILESORT, table))
+            if node.get('using_temporary_table') or node.get('using_temporary'):
+                findings.append((FLAG_TEMPORARY, table))
+            operation = node.get('operation', '')
+            if isinstance(operation, str):
+                if operation.startswith('Sort'):
+                    findings.append((FLAG_FILESORT, table))
+                elif operation.startswith('Temporary table'):
+                    findings.append((FLAG_TEMPORARY, table))
+            for value in node.values():
+                walk(value, table)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, table)
+
+    walk(plan)
+    # Keep first-seen order, drop duplicates
+    return list(dict.fromkeys(findings))
+
+
+class PlanCapture:
+    """
+    Runs EXPLAIN FORMAT=JSON for slow statements, once per fingerprint per process
+
+    Registered as a MetricsRegistry slow-query listener by DBConnection.
+    Plans are appended as JSON lines to store, so the file keeps a history
+    of each statement's plan across runs and the report can compare them.
+
+    Args:
+        pool: ConnectionPool used to run the EXPLAIN outside the metrics
+        enabled: If False, slow statements are not explained
+        store: Path of the JSON-lines plan store
+    """
+
+    def __init__(self, pool, enabled=True, store=None):
+        self.pool = pool
+        self.enabled = enabled and bool(store)
+        self.store = store
+        self._lock = threading.Lock()
+        self._seen = set()
+
+    def on_slow_query(self, entry, timer):
+        """Slow-query listener: explain the statement if its shape is new this run"""
+        if not self.enabled or timer.error is not None:
+            return
+        query = timer.query
+        if not query.lstrip().lower().startswith(_EXPLAINABLE) or ';' in query:
+            # Transactions are logged joined with ';' and cannot be explained as one
+            return
+        if timer.params is None and _PLACEHOLDER.search(query):
+            # EXPLAIN needs the values; without them it can only fail
+            return
+
+        key = fingerprint(query)
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen.add(key)
+
+        plan = self.explain(query, timer.params)
+        if plan is None:
+            return
+        self._append({
+            'time': entry['time'],
+            'fingerprint': key,
+            'caller': entry['caller'],
+            'ms': entry['ms'],
+            'rows': entry['rows'],
+            'query': normalize_query(query),
+            'flags': [list(finding) for finding in analyze_plan(plan)],
+            'plan': plan,
+        })
+
+    def explain(self, query, params=None):
+        """Return the parsed EXPLAIN FORMAT=JSON plan, or None on error"""
+        connection = None
+        cursor = None
+        discard = False
+        try:
+            connection = self.pool.acquire()
+            cursor = connection.cursor(buffered=True)
+            cursor.execute("EXPLAIN FORMAT=JSON " + query, params or ())
+            row = cursor.fetchone()
+            return json.loads(row[0]) if row else None
+        except (Error, ValueError) as e:
+            discard = isinstance(e, Error)
+            print(f"Error capturing query plan: {e}")
+            return None
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Error:
+                    discard = True
+            if connection:
+                self.pool.release(connection, discard=discard)
+
+    def _append(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.store)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.store, 'a', encoding='utf-8') as store:
+                    store.write(line)
+            except OSError as e:
+                print(f"Error writing query plan store: {e}")
+
+
+# ============= REPORT =============
+
+def load_plans(store):
+    """Read the plan store, skipping lines that are not valid JSON"""
+    plans = []
+    with open(store, encoding='utf-8') as lines:
+        for line in lines:
+            try:
+                plans.append(json.loads(line))
+            except ValueError:
+                continue
+    return plans
+
+
+def build_report(plans):
+    """
+    Group captured plans by DAO function and fingerprint
+
+    Returns:
+        Dict of caller -> list of dicts with fingerprint, query, captures,
+        first_seen, last_seen, max_ms, flags (latest plan) and new_flags
+        (in the latest plan but not in the first one captured)
+    """
+    by_key = {}
+    for record in plans:
+        by_key.setdefault((record['caller'], record['fingerprint']), []).append(record)
+
+    report = {}
+    for (caller, key), history in by_key.items():
+        history.sort(key=lambda record: record['time'])
+        first, latest = history[0], history[-1]
+        first_flags = {tuple(flag) for flag in first['flags']}
+        latest_flags = [tuple(flag) for flag in latest['flags']]
+        report.setdefault(caller, []).append({
+            'fingerprint': key,
+            'query': latest['query'],
+            'captures': len(history),
+            'first_seen': first['time'],
+            'last_seen': latest['time'],
+            'max_ms': max(record['ms'] for record in history),
+            'flags': latest_flags,
+            'new_flags': [flag for flag in latest_flags if flag not in first_flags],
+        })
+
+    for entries in report.values():
+        entries.sort(key=lambda entry: entry['max_ms'], reverse=True)
+    return report
+
+
+def _describe(flag):
+    name, table = flag
+    return f"{name} ({table})" if table else name
+
+
+def format_report(report, regressions_only=False):
+    """Render build_report() output as text"""
+    lines = []
+    for caller in sorted(report):
+        entries = report[caller]
+        if regressions_only:
+            entries = [entry for entry in entries if entry['new_flags']]
+        if not entries:
+            continue
+        lines.append(caller)
+        for entry in entries:
+            lines.append(f"  [{entry['fingerprint']}] max {entry['max_ms']:.1f} ms, "
+                         f"{entry['captures']} capture(s), last {entry['last_seen']}")
+            query = entry['query']
+            lines.append(f"    {query[:117] + '...' if len(query) > 120 else query}")
+            if not entry['flags']:
+                lines.append("    no risky operations")
+            for flag in entry['flags']:
+                marker = 'NEW ' if flag in entry['new_flags'] else ''
+                lines.append(f"    ! {marker}{_describe(flag)}")
+        lines.append('')
+    return '\n'.join(lines) if lines else "No captured plans match."
+
+
+def main(argv=None):
+    from config import PLAN_CAPTURE_CONFIG
+
+    parser = argparse.ArgumentParser(description="Report risky query plans captured for slow statements")
+    parser.add_argument('--store', default=PLAN_CAPTURE_CONFIG['store'], help="plan store to read")
+    parser.add_argument('--caller', help="only show this DAO function (e.g. books_dao.search_books)")
+    parser.add_argument('--regressions', action='store_true',
+                        help="only show plans with risks that were not in the first capture")
+    args = parser.parse_args(argv)
+
+    if not args.store or not os.path.exists(args.store):
+        print(f"No plan store at {args.store} - no slow statements captured yet")
+        return 1
+
+    report = build_report(load_plans(args.store))
+    if args.caller:
+        report = {args.caller: report.get(args.caller, [])}
+    print(format_report(report, regressions_only=args.regressions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
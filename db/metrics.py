@@ -0,0 +1,248 @@
+"""
+Query metrics
+Per-caller timing registry and slow-query log for DBConnection
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Frames from these modules are skipped when looking for the calling DAO function
+# (contextlib: db.transaction() is entered through a @contextmanager wrapper)
+_INTERNAL_MODULES = frozenset(('db.connection', 'db.metrics', 'contextlib'))
+
+
+def caller_tag():
+    """Return 'module.function' of the first frame outside the DB layer internals"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module not in _INTERNAL_MODULES:
+            return f"{module.rpartition('.')[2]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _CallerStats:
+    """Running totals for one caller plus a window of recent timings"""
+
+    __slots__ = ('count', 'errors', 'rows', 'total', 'max', 'acquire_total',
+                 'acquire_max', 'samples')
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.acquire_total = 0.0
+        self.acquire_max = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+
+class QueryTimer:
+    """
+    Times one statement from connection checkout to completion
+
+    Created by MetricsRegistry.timer(); DBConnection calls acquired() once it
+    holds a connection, sets rows/error, and calls finish() in its finally.
+    """
+
+    __slots__ = ('registry', 'caller', 'query', 'params', 'start', 'acquired_at',
+                 'rows', 'error')
+
+    def __init__(self, registry, caller, query, params):
+        self.registry = registry
+        self.caller = caller
+        self.query = query
+        self.params = params
+        self.rows = None
+        self.error = None
+        self.acquired_at = None
+        self.start = time.perf_counter()
+
+    def acquired(self):
+        self.acquired_at = time.perf_counter()
+
+    def finish(self, statement_time=None):
+        """Record the statement; statement_time overrides the time since acquired()"""
+        end = time.perf_counter()
+        acquired_at = self.acquired_at or end
+        if statement_time is None:
+            statement_time = end - acquired_at
+        self.registry.record(self, acquired_at - self.start, statement_time)
+
+
+class _NullTimer:
+    """Stand-in used when metrics are disabled"""
+
+    __slots__ = ('rows', 'error', 'query')
+
+    def __init__(self):
+        self.rows = None
+        self.error = None
+        self.query = None
+
+    def acquired(self):
+        pass
+
+    def finish(self, statement_time=None):
+        pass
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of query timings keyed by calling DAO function
+
+    Counts, totals and maxima cover the whole process lifetime; percentiles
+    are taken over the last sample_size statements of each caller. Statements
+    slower than slow_query_ms are appended to slow_query_log as JSON lines.
+
+    Args:
+        enabled: If False, timer() returns a no-op timer
+        sample_size: Recent timings kept per caller for percentiles
+        slow_query_ms: Threshold (statement time, milliseconds) for the slow-query log
+        slow_query_log: Path of the slow-query log, or None to disable it
+        log_params: If True, include query parameters in slow-query entries
+    """
+
+    def __init__(self, enabled=True, sample_size=1024, slow_query_ms=500,
+                 slow_query_log=None, log_params=False):
+        self.enabled = enabled
+        self.sample_size = sample_size
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        self.log_params = log_params
+        self._slow_seconds = slow_query_ms / 1000.0
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._callers = {}
+        self._slow_listeners = []
+
+    def timer(self, query, params=None):
+        """Start timing a statement issued by the caller of the DBConnection method"""
+        if not self.enabled:
+            return _NullTimer()
+        return QueryTimer(self, caller_tag(), query, params)
+
+    def add_slow_listener(self, listener):
+        """Register listener(entry, timer) to be called for every slow statement"""
+        self._slow_listeners.append(listener)
+
+    def record(self, timer, acquire_time, statement_time):
+        """Fold one finished statement into the registry"""
+        with self._lock:
+            stats = self._callers.get(timer.caller)
+            if stats is None:
+                stats = self._callers[timer.caller] = _CallerStats(self.sample_size)
+            stats.count += 1
+            stats.total += statement_time
+            stats.samples.append(statement_time)
+            if statement_time > stats.max:
+                stats.max = statement_time
+            stats.acquire_total += acquire_time
+            if acquire_time > stats.acquire_max:
+                stats.acquire_max = acquire_time
+            if timer.rows:
+                stats.rows += timer.rows
+            if timer.error is not None:
+                stats.errors += 1
+
+        if statement_time >= self._slow_seconds:
+            self._slow_query(timer, acquire_time, statement_time)
+
+    def _slow_query(self, timer, acquire_time, statement_time):
+        """Write a slow-query log entry and notify listeners"""
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'caller': timer.caller,
+            'ms': round(statement_time * 1000, 3),
+            'acquire_ms': round(acquire_time * 1000, 3),
+            'rows': timer.rows,
+            'query': ' '.join(timer.query.split()),
+        }
+        if self.log_params and timer.params is not None:
+            entry['params'] = repr(timer.params)
+        if timer.error is not None:
+            entry['error'] = str(timer.error)
+
+        for listener in self._slow_listeners:
+            try:
+                listener(entry, timer)
+            except Exception as e:
+                print(f"Slow-query listener failed: {e}")
+
+        if self.slow_query_log:
+            self._append_log(entry)
+
+    def _append_log(self, entry):
+        line = json.dumps(entry, default=str) + '\n'
+        with self._log_lock:
+            try:
+                directory = os.path.dirname(self.slow_query_log)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.slow_query_log, 'a', encoding='utf-8') as log:
+                    log.write(line)
+            except OSError as e:
+                print(f"Error writing slow-query log: {e}")
+
+    def snapshot(self):
+        """
+        Return per-caller statistics, slowest total time first
+
+        Returns:
+            List of dicts with caller, count, errors, rows, total_ms, avg_ms,
+            p50_ms, p95_ms, p99_ms, max_ms, acquire_avg_ms, acquire_max_ms
+        """
+        with self._lock:
+            items = [(caller, stats, sorted(stats.samples))
+                     for caller, stats in self._callers.items()]
+            report = []
+            for caller, stats, samples in items:
+                report.append({
+                    'caller': caller,
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'rows': stats.rows,
+                    'total_ms': stats.total * 1000,
+                    'avg_ms': stats.total * 1000 / stats.count,
+                    'p50_ms': percentile(samples, 0.50) * 1000,
+                    'p95_ms': percentile(samples, 0.95) * 1000,
+                    'p99_ms': percentile(samples, 0.99) * 1000,
+                    'max_ms': stats.max * 1000,
+                    'acquire_avg_ms': stats.acquire_total * 1000 / stats.count,
+                    'acquire_max_ms': stats.acquire_max * 1000,
+                })
+        report.sort(key=lambda row: row['total_ms'], reverse=True)
+        return report
+
+    def reset(self):
+        """Clear all collected statistics"""
+        with self._lock:
+            self._callers.clear()
+
+    def format_report(self):
+        """Render snapshot() as a fixed-width text table"""
+        lines = [f"{'caller':<45} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} "
+                 f"{'p99 ms':>8} {'max ms':>8} {'rows':>9} {'acq ms':>7}"]
+        for row in self.snapshot():
+            lines.append(
+                f"{row['caller']:<45} {row['count']:>7} {row['p50_ms']:>8.2f} "
+                f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f} "
+                f"{row['rows']:>9} {row['acquire_avg_ms']:>7.2f}"
+            )
+        return '\n'.join(lines)
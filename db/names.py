@@ -0,0 +1,81 @@
+"""
+Name resolution
+Batched name -> id upserts for the Authors and Publishers lookup tables
+"""
+
+
+def _placeholders(count):
+    return ', '.join(['%s'] * count)
+
+
+def _fetch_ids(cursor, table, id_column, names):
+    """Locking read of name -> id for names (sees rows committed by concurrent writers)"""
+    cursor.execute(
+        f"SELECT name, {id_column} FROM {table} "
+        f"WHERE name IN ({_placeholders(len(names))}) LOCK IN SHARE MODE",
+        tuple(names)
+    )
+    return {name: row_id for name, row_id in cursor.fetchall()}
+
+
+def _match(requested, found):
+    """
+    Map each requested name to an id from found
+
+    The name columns use a case-insensitive collation, so the stored
+    spelling can differ from the requested one.
+    """
+    folded = {name.casefold(): row_id for name, row_id in found.items()}
+    ids = {}
+    for name in requested:
+        row_id = found.get(name)
+        if row_id is None:
+            row_id = folded.get(name.casefold())
+        if row_id is not None:
+            ids[name] = row_id
+    return ids
+
+
+def resolve_name_ids(cursor, table, id_column, names):
+    """
+    Get or create rows for names inside the caller's transaction
+
+    Existing names are read in one query and the missing ones are created
+    with a single multi-row INSERT ... ON DUPLICATE KEY, so the cost does
+    not grow with the number of names. Names still unmatched afterwards
+    (collation edge cases) fall back to one upsert each.
+
+    Args:
+        cursor: Cursor from db.transaction()
+        table: 'Authors' or 'Publishers' (name must be UNIQUE)
+        id_column: Primary key column of table
+        names: Iterable of non-empty names
+
+    Returns:
+        Dict of name -> id for every requested name
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+
+    ids = _match(names, _fetch_ids(cursor, table, id_column, names))
+    missing = [name for name in names if name not in ids]
+    if not missing:
+        return ids
+
+    cursor.execute(
+        f"INSERT INTO {table}(name) VALUES {', '.join(['(%s)'] * len(missing))} "
+        f"ON DUPLICATE KEY UPDATE {id_column} = {id_column}",
+        tuple(missing)
+    )
+    ids.update(_match(missing, _fetch_ids(cursor, table, id_column, missing)))
+
+    for name in missing:
+        if name not in ids:
+            cursor.execute(
+                f"INSERT INTO {table}(name) VALUES (%s) "
+                f"ON DUPLICATE KEY UPDATE {id_column} = LAST_INSERT_ID({id_column})",
+                (name,)
+            )
+            ids[name] = cursor.lastrowid
+    return ids
@@ -0,0 +1,279 @@
+"""
+Connection pool
+Bounded, thread-safe pool of MySQL connections used by DBConnection
+"""
+
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+
+class _PooledConnection:
+    """Bookkeeping for one physical connection owned by the pool"""
+
+    __slots__ = ('connection', 'created_at', 'last_used', 'state')
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+        self.state = {}
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable MySQL connections
+
+    Connections are handed out most-recently-used first so the warmest
+    socket is reused, and idle connections above min_size are closed
+    after idle_timeout seconds.
+
+    Args:
+        config: Keyword arguments for mysql.connector.connect
+        min_size: Idle connections kept open by eviction
+        max_size: Hard limit on open connections
+        idle_timeout: Seconds before an idle connection above min_size is closed
+        max_lifetime: Seconds before a connection is recycled (0 = never)
+        acquire_timeout: Seconds to wait for a free connection before failing
+        health_check_after: Idle seconds after which a connection is pinged on checkout
+    """
+
+    def __init__(self, config, min_size=1, max_size=10, idle_timeout=300,
+                 max_lifetime=3600, acquire_timeout=30, health_check_after=5):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.acquire_timeout = acquire_timeout
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()      # _PooledConnection, most recently used on the right
+        self._in_use = {}         # id(connection) -> _PooledConnection
+        self._size = 0            # open connections plus connections being opened
+        self._closed = False
+
+        self._created = 0
+        self._recycled = 0
+        self._evicted = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    # ============= CHECKOUT / RETURN =============
+
+    def acquire(self):
+        """
+        Check out a connection, opening a new one if the pool is not full
+
+        Raises:
+            PoolError: if no connection frees up within acquire_timeout
+        """
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        waited = False
+
+        while True:
+            entry = None
+            stale = []
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("Connection pool is closed")
+
+                    stale.extend(self._evict_idle_locked())
+
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+
+                    if self._size < self.max_size:
+                        # Reserve a slot and open the connection outside the lock
+                        self._size += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolError(
+                            f"Timed out after {self.acquire_timeout}s waiting for a "
+                            f"database connection (pool size {self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            for connection in stale:
+                self._close_quietly(connection)
+
+            if entry is not None and not self._is_healthy(entry):
+                self._discard(entry)
+                continue
+
+            if entry is None:
+                entry = self._open()
+
+            break
+
+        wait_time = time.monotonic() - start
+        with self._cond:
+            self._in_use[id(entry.connection)] = entry
+            self._checkouts += 1
+            self._wait_time += wait_time
+            if waited:
+                self._waits += 1
+            if wait_time > self._max_wait_time:
+                self._max_wait_time = wait_time
+
+        return entry.connection
+
+    def release(self, connection, discard=False):
+        """
+        Return a connection to the pool
+
+        Any open transaction is rolled back so the next borrower starts
+        clean and does not read through a stale snapshot.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+
+        if entry is None:
+            # Not one of ours (or already released) - just close it
+            self._close_quietly(connection)
+            return
+
+        if not discard:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except Error:
+                discard = True
+
+        if discard or self._closed or self._expired(entry):
+            self._discard(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def connection_state(self, connection):
+        """
+        Per-connection scratch dict that lives exactly as long as the connection
+
+        Used to hang caches (e.g. prepared statements) off a pooled connection.
+        Only valid while the caller has the connection checked out.
+        """
+        with self._cond:
+            return self._in_use[id(connection)].state
+
+    def close_all(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+        for entry in idle:
+            self._discard(entry)
+
+    # ============= STATISTICS =============
+
+    def stats(self):
+        """Return a snapshot of pool counters"""
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'created': self._created,
+                'recycled': self._recycled,
+                'evicted': self._evicted,
+                'checkouts': checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'total_wait_time': self._wait_time,
+                'avg_wait_time': self._wait_time / checkouts if checkouts else 0.0,
+                'max_wait_time': self._max_wait_time,
+            }
+
+    # ============= INTERNALS =============
+
+    def _open(self):
+        """Open a physical connection for a slot reserved in acquire()"""
+        try:
+            connection = mysql.connector.connect(**self.config)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(connection)
+
+    def _is_healthy(self, entry):
+        """Ping connections that have been idle long enough to have gone stale"""
+        if self._expired(entry):
+            return False
+        if time.monotonic() - entry.last_used < self.health_check_after:
+            return True
+        try:
+            return entry.connection.is_connected()
+        except Error:
+            return False
+
+    def _expired(self, entry):
+        return bool(self.max_lifetime) and time.monotonic() - entry.created_at > self.max_lifetime
+
+    def _evict_idle_locked(self):
+        """
+        Drop connections idle longer than idle_timeout (caller holds the lock)
+
+        Returns the evicted connections so they can be closed outside the lock.
+        """
+        evicted = []
+        if not self.idle_timeout:
+            return evicted
+
+        now = time.monotonic()
+        # Oldest idle connections sit on the left
+        while len(self._idle) > self.min_size and now - self._idle[0].last_used > self.idle_timeout:
+            entry = self._idle.popleft()
+            self._size -= 1
+            self._evicted += 1
+            evicted.append(entry.connection)
+        return evicted
+
+    def _discard(self, entry):
+        """Close a connection and free its slot"""
+        self._close_quietly(entry.connection)
+        with self._cond:
+            self._size -= 1
+            self._recycled += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -3,7 +3,13 @@ Publishers data access object
 Handles publisher-related database operations
 """
 
+from config import NAME_CACHE_SIZE
+from db.cache import LRUCache
 from db.connection import db
+from db.names import resolve_name_ids
+
+# name -> publisher_id; only this process's writes invalidate it
+_publisher_ids = LRUCache(NAME_CACHE_SIZE)
 
 
 def get_all_publishers(limit=None):
@@ -17,13 +23,13 @@ def get_all_publishers(limit=None):
 def get_publisher_by_id(publisher_id):
     """Get publisher by ID"""
     query = "SELECT publisher_id, name FROM Publishers WHERE publisher_id = %s"
-    return db.execute_query(query, (publisher_id,), fetch_one=True)
+    return db.execute_query(query, (publisher_id,), fetch_one=True, prepared=True)
 
 
 def get_publisher_by_name(name):
     """Get publisher by exact name"""
     query = "SELECT publisher_id, name FROM Publishers WHERE name = %s"
-    return db.execute_query(query, (name,), fetch_one=True)
+    return db.execute_query(query, (name,), fetch_one=True, prepared=True)
 
 
 def search_publishers(name_pattern):
@@ -42,27 +48,78 @@ def add_publisher(name):
     """Add new publisher"""
     query = "INSERT INTO Publishers(name) VALUES (%s)"
     publisher_id = db.execute_update(query, (name,), return_lastrowid=True)
+    if publisher_id:
+        _publisher_ids.put(name, publisher_id)
     return publisher_id
 
 
 def get_or_create_publisher(name):
-    """Get existing publisher or create new one"""
+    """
+    Get existing publisher ID or create the publisher
+    
+    Names resolved before are answered from an in-process LRU cache. On a
+    miss the publisher is looked up, and only if absent inserted with
+    ON DUPLICATE KEY so a concurrent insert of the same name returns the
+    existing row's ID instead of failing.
+    """
     if not name:
         return None
     
-    # Try to find existing
+    publisher_id = _publisher_ids.get(name)
+    if publisher_id is not None:
+        return publisher_id
+    
+    # Look up first so existing names do not burn AUTO_INCREMENT values
     publisher = get_publisher_by_name(name)
     if publisher:
-        return publisher['publisher_id']
+        publisher_id = publisher['publisher_id']
+    else:
+        query = """
+            INSERT INTO Publishers(name) VALUES (%s)
+            ON DUPLICATE KEY UPDATE publisher_id = LAST_INSERT_ID(publisher_id)
+        """
+        publisher_id = db.execute_update(query, (name,), return_lastrowid=True, prepared=True)
     
-    # Create new
-    return add_publisher(name)
+    if publisher_id:
+        _publisher_ids.put(name, publisher_id)
+    return publisher_id
+
+
+def resolve_publisher_ids(cursor, names):
+    """
+    Get or create IDs for many publisher names inside an open db.transaction()
+    
+    Cached names cost nothing; the rest are resolved in a constant number
+    of statements. Pass the result to remember_publisher_ids() once the
+    transaction has committed.
+    
+    Returns:
+        Dict of name -> publisher_id
+    """
+    ids = {}
+    missing = []
+    for name in dict.fromkeys(names):
+        publisher_id = _publisher_ids.get(name)
+        if publisher_id is None:
+            missing.append(name)
+        else:
+            ids[name] = publisher_id
+    ids.update(resolve_name_ids(cursor, 'Publishers', 'publisher_id', missing))
+    return ids
+
+
+def remember_publisher_ids(ids):
+    """Cache name -> ID pairs resolved in a committed transaction"""
+    for name, publisher_id in ids.items():
+        _publisher_ids.put(name, publisher_id)
 
 
 def update_publisher(publisher_id, name):
     """Update publisher name"""
     query = "UPDATE Publishers SET name = %s WHERE publisher_id = %s"
     rows = db.execute_update(query, (name, publisher_id))
+    if rows:
+        _publisher_ids.pop_value(publisher_id)
     return rows is not None and rows > 0
 
 
@@ -70,4 +127,16 @@ def delete_publisher(publisher_id):
     """Delete publisher (will set books.publisher_id to NULL due to FK)"""
     query = "DELETE FROM Publishers WHERE publisher_id = %s"
     rows = db.execute_update(query, (publisher_id,))
-    return rows is not None and rows > 0
\ No newline at end of file
+    if rows:
+        _publisher_ids.pop_value(publisher_id)
+    return rows is not None and rows > 0
+
+
+def get_publisher_cache_stats():
+    """Get name -> ID cache counters (size, hits, misses, hit rate)"""
+    return _publisher_ids.stats()
+
+
+def clear_publisher_cache():
+    """Forget cached name -> ID lookups (e.g. after bulk loads by other processes)"""
+    _publisher_ids.clear()
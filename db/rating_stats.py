@@ -0,0 +1,278 @@
+"""
+Rating aggregates
+Keeps Book_Rating_Stats (per book) and User_Rating_Summary / User_Author_Counts
+(per user) in step with Ratings
+
+The maintenance helpers take the cursor of an open db.transaction() so the
+aggregate changes commit or roll back together with the rating write.
+Changes to a book's author links go through apply_author_link in the same way.
+
+Full rebuild (after bulk loads or direct SQL edits), from the project root:
+
+    python -m db.rating_stats
+"""
+
+import argparse
+import sys
+
+from mysql.connector import Error
+from db.sql.statements import REBUILD_SCRIPT, read_statements
+
+RATING_VALUES = range(0, 11)
+HISTOGRAM_COLUMNS = [f"r{value}" for value in RATING_VALUES]
+
+
+
+def is_valid_rating(rating):
+    """True for an integer rating the histogram has a column for (0-10)"""
+    try:
+        value = int(rating)
+    except (TypeError, ValueError):
+        return False
+    if isinstance(rating, float) and rating != value:
+        return False
+    return value in RATING_VALUES
+
+
+def _bucket(rating):
+    """Histogram column for a rating (validated, since it is put into SQL text)"""
+    rating = int(rating)
+    if rating not in RATING_VALUES:
+        raise ValueError(f"Rating out of range: {rating}")
+    return f"r{rating}"
+
+
+def _apply_histogram_change(cursor, table, key_column, key, old_rating, new_rating):
+    """Apply one rating write to the count/sum/histogram row of table keyed by key_column"""
+    if old_rating is None:
+        column = _bucket(new_rating)
+        cursor.execute(f"""
+            INSERT INTO {table} ({key_column}, rating_count, rating_sum, {column})
+            VALUES (%s, 1, %s, 1)
+            ON DUPLICATE KEY UPDATE
+                rating_count = rating_count + 1,
+                rating_sum = rating_sum + VALUES(rating_sum),
+                {column} = {column} + 1
+        """, (key, int(new_rating)))
+
+    elif new_rating is None:
+        column = _bucket(old_rating)
+        cursor.execute(f"""
+            UPDATE {table}
+            SET rating_count = rating_count - 1,
+                rating_sum = rating_sum - %s,
+                {column} = {column} - 1
+            WHERE {key_column} = %s
+        """, (int(old_rating), key))
+
+    elif int(old_rating) != int(new_rating):
+        old_column = _bucket(old_rating)
+        new_column = _bucket(new_rating)
+        cursor.execute(f"""
+            UPDATE {table}
+            SET rating_sum = rating_sum + %s,
+                {old_column} = {old_column} - 1,
+                {new_column} = {new_column} + 1
+            WHERE {key_column} = %s
+        """, (int(new_rating) - int(old_rating), key))
+
+
+def _refresh_user_authors(cursor, where, params):
+    """Recompute distinct_authors and top_author_id for the summary rows matched by where"""
+    cursor.execute(f"""
+        UPDATE User_Rating_Summary s
+        SET s.distinct_authors = (
+                SELECT COUNT(*) FROM User_Author_Counts c
+                WHERE c.user_id = s.user_id
+            ),
+            s.top_author_id = (
+                SELECT c.author_id FROM User_Author_Counts c
+                WHERE c.user_id = s.user_id
+                ORDER BY c.rating_count DESC, c.author_id
+                LIMIT 1
+            )
+        WHERE {where}
+    """, params)
+
+
+def apply_rating_change(cursor, user_id, isbn, old_rating, new_rating):
+    """
+    Update the book and user aggregates for one rating write
+
+    Args:
+        cursor: Cursor of the transaction that wrote the rating
+        user_id: User who owns the rating
+        isbn: Book the rating belongs to
+        old_rating: Previous value, or None for a new rating
+        new_rating: New value, or None for a deleted rating
+    """
+    if old_rating is None and new_rating is None:
+        return
+
+    _apply_histogram_change(cursor, 'Book_Rating_Stats', 'ISBN', isbn, old_rating, new_rating)
+    _apply_histogram_change(cursor, 'User_Rating_Summary', 'user_id', user_id, old_rating, new_rating)
+
+    if old_rating is not None and new_rating is not None:
+        # Same book, so the per-author counts are unchanged
+        return
+
+    if old_rating is None:
+        cursor.execute("""
+            INSERT INTO User_Author_Counts (user_id, author_id, rating_count)
+            SELECT %s, author_id, 1 FROM Book_Authors WHERE ISBN = %s
+            ON DUPLICATE KEY UPDATE rating_count = rating_count + 1
+        """, (user_id, isbn))
+    else:
+        cursor.execute("""
+            UPDATE User_Author_Counts c
+            JOIN Book_Authors ba ON ba.author_id = c.author_id AND ba.ISBN = %s
+            SET c.rating_count = c.rating_count - 1
+            WHERE c.user_id = %s
+        """, (isbn, user_id))
+        cursor.execute(
+            "DELETE FROM User_Author_Counts WHERE user_id = %s AND rating_count <= 0",
+            (user_id,)
+        )
+    _refresh_user_authors(cursor, "s.user_id = %s", (user_id,))
+
+
+def apply_author_link(cursor, isbn, author_id, linked):
+    """
+    Update the per-author counts of a book's raters after the book gains or loses an author
+
+    Args:
+        cursor: Cursor of the transaction that changed Book_Authors
+        isbn: Book whose author links changed
+        author_id: Author linked to (linked=True) or unlinked from the book
+        linked: True for an added link, False for a removed one
+    """
+    if linked:
+        cursor.execute("""
+            INSERT INTO User_Author_Counts (user_id, author_id, rating_count)
+            SELECT user_id, %s, 1 FROM Ratings WHERE ISBN = %s
+            ON DUPLICATE KEY UPDATE rating_count = rating_count + 1
+        """, (author_id, isbn))
+    else:
+        cursor.execute("""
+            UPDATE User_Author_Counts c
+            JOIN Ratings r ON r.user_id = c.user_id AND r.ISBN = %s
+            SET c.rating_count = c.rating_count - 1
+            WHERE c.author_id = %s
+        """, (isbn, author_id))
+        cursor.execute(
+            "DELETE FROM User_Author_Counts WHERE author_id = %s AND rating_count <= 0",
+            (author_id,)
+        )
+    _refresh_user_authors(
+        cursor, "s.user_id IN (SELECT user_id FROM Ratings WHERE ISBN = %s)", (isbn,)
+    )
+
+
+def remove_user_ratings(cursor, user_id):
+    """
+    Subtract all of a user's ratings from the book aggregates (before the user is deleted)
+
+    The user's own summary rows go with the user through ON DELETE CASCADE.
+    """
+    buckets = ',\n                '.join(
+        f"SUM(rating = {value}) AS r{value}" for value in RATING_VALUES
+    )
+    updates = ',\n            '.join(
+        f"s.{column} = s.{column} - d.{column}" for column in HISTOGRAM_COLUMNS
+    )
+    cursor.execute(f"""
+        UPDATE Book_Rating_Stats s
+        JOIN (
+            SELECT
+                ISBN,
+                COUNT(*) AS rating_count,
+                SUM(rating) AS rating_sum,
+                {buckets}
+            FROM Ratings
+            WHERE user_id = %s
+            GROUP BY ISBN
+        ) d ON d.ISBN = s.ISBN
+        SET s.rating_count = s.rating_count - d.rating_count,
+            s.rating_sum = s.rating_sum - d.rating_sum,
+            {updates}
+    """, (user_id,))
+
+
+def remove_book_ratings(cursor, isbn):
+    """Subtract all of a book's ratings from its raters' summaries (before the book is deleted)"""
+    updates = ',\n            '.join(
+        f"s.{column} = s.{column} - (r.rating = {value})"
+        for value, column in zip(RATING_VALUES, HISTOGRAM_COLUMNS)
+    )
+    cursor.execute(f"""
+        UPDATE User_Rating_Summary s
+        JOIN Ratings r ON r.user_id = s.user_id AND r.ISBN = %s
+        SET s.rating_count = s.rating_count - 1,
+            s.rating_sum = s.rating_sum - r.rating,
+            {updates}
+    """, (isbn,))
+    cursor.execute("""
+        UPDATE User_Author_Counts c
+        JOIN Ratings r ON r.user_id = c.user_id AND r.ISBN = %s
+        JOIN Book_Authors ba ON ba.ISBN = r.ISBN AND ba.author_id = c.author_id
+        SET c.rating_count = c.rating_count - 1
+    """, (isbn,))
+    cursor.execute("""
+        DELETE FROM User_Author_Counts
+        WHERE rating_count <= 0
+          AND user_id IN (SELECT user_id FROM Ratings WHERE ISBN = %s)
+    """, (isbn,))
+    _refresh_user_authors(
+        cursor, "s.user_id IN (SELECT user_id FROM Ratings WHERE ISBN = %s)", (isbn,)
+    )
+
+
+def read_rebuild_statements(path=REBUILD_SCRIPT):
+    """Statements of the rebuild script, in order (comments dropped)"""
+    return read_statements(path)
+
+
+def rebuild_rating_stats(cursor):
+    """
+    Recompute every book and user aggregate from Ratings
+
+    Returns:
+        Dict with the number of 'books' and 'users' summarised
+    """
+    for statement in read_rebuild_statements():
+        cursor.execute(statement)
+    cursor.execute("SELECT COUNT(*) FROM Book_Rating_Stats")
+    books = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM User_Rating_Summary")
+    users = cursor.fetchone()[0]
+    return {'books': books, 'users': users}
+
+
+def histogram_case(prefix="s", pick="min"):
+    """
+    SQL expression giving the lowest (pick='min') or highest rating present in a histogram
+
+    Returns NULL when the histogram is empty.
+    """
+    values = RATING_VALUES if pick == "min" else reversed(RATING_VALUES)
+    branches = ' '.join(f"WHEN {prefix}.r{value} > 0 THEN {value}" for value in values)
+    return f"CASE {branches} END"
+
+
+def main(argv=None):
+    from db.connection import db
+
+    parser = argparse.ArgumentParser(description="Rebuild the precomputed rating aggregates from Ratings")
+    parser.parse_args(argv)
+
+    try:
+        with db.transaction() as cursor:
+            counts = rebuild_rating_stats(cursor)
+    except Error:
+        return 1
+    print(f"Rebuilt rating stats for {counts['books']} books and {counts['users']} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,52 @@ Ratings data access object
 Handles rating-related database operations
 """
 
+from mysql.connector import Error
 from db.connection import db
+from db.rating_stats import apply_rating_change, histogram_case, is_valid_rating
 
 
-def get_ratings(user_id=None, isbn=None, min_rating=None, limit=100):
-    """Get ratings with optional filters"""
-    query = """
+def get_ratings(user_id=None, isbn=None, min_rating=None, limit=100, after=None, before=None,
+                at=None):
+    """
+    Get ratings with optional filters, newest first
+    
+    Paged by keyset on rating_id: pass the last rating_id shown as after
+    for the next (older) page, or the first one as before for the previous
+    (newer) page; at reloads the page starting at that rating. Authors are
+    only aggregated for the rows on the page.
+    """
+    page = "SELECT r.rating_id FROM Ratings r WHERE 1=1"
+    params = []
+    
+    if user_id:
+        page += " AND r.user_id = %s"
+        params.append(user_id)
+    
+    if isbn:
+        page += " AND r.ISBN = %s"
+        params.append(isbn)
+    
+    if min_rating:
+        page += " AND r.rating >= %s"
+        params.append(min_rating)
+    
+    if after:
+        page += " AND r.rating_id < %s"
+        params.append(after)
+    
+    if before:
+        page += " AND r.rating_id > %s"
+        params.append(before)
+    
+    if at:
+        page += " AND r.rating_id <= %s"
+        params.append(at)
+    
+    page += " ORDER BY r.rating_id ASC" if before else " ORDER BY r.rating_id DESC"
+    page += f" LIMIT {int(limit)}"
+    
+    query = f"""
         SELECT 
             r.rating_id,
             r.user_id,
@@ -17,11 +57,38 @@ def get_ratings(user_id=None, isbn=None, min_rating=None, limit=100):
             u.username,
             b.title as book_title,
             GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors
-        FROM Ratings r
+        FROM ({page}) page
+        JOIN Ratings r ON r.rating_id = page.rating_id
         JOIN Users u ON r.user_id = u.user_id
         JOIN Books b ON r.ISBN = b.ISBN
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
+        GROUP BY r.rating_id, r.user_id, r.ISBN, r.rating, u.username, b.title
+        ORDER BY r.rating_id DESC
+    """
+    
+    return db.execute_query(query, tuple(params), row_format='record')
+
+
+def iter_ratings(user_id=None, isbn=None, min_rating=None, batch_size=5000):
+    """
+    Stream ratings with optional filters, for exports over the full table
+    
+    Yields row dicts lazily (see DBConnection.iter_query). Unlike get_ratings
+    there is no author GROUP_CONCAT, so the server can stream rows in
+    rating_id order without building a temporary table first.
+    """
+    query = """
+        SELECT 
+            r.rating_id,
+            r.user_id,
+            r.ISBN,
+            r.rating,
+            u.username,
+            b.title as book_title
+        FROM Ratings r
+        JOIN Users u ON r.user_id = u.user_id
+        JOIN Books b ON r.ISBN = b.ISBN
         WHERE 1=1
     """
     
@@ -39,11 +106,9 @@ def get_ratings(user_id=None, isbn=None, min_rating=None, limit=100):
         query += " AND r.rating >= %s"
         params.append(min_rating)
     
-    query += " GROUP BY r.rating_id, r.user_id, r.ISBN, r.rating, u.username, b.title"
-    query += " ORDER BY r.rating_id DESC"
-    query += f" LIMIT {limit}"
+    query += " ORDER BY r.rating_id"
     
-    return db.execute_query(query, tuple(params))
+    return db.iter_query(query, tuple(params), batch_size=batch_size)
 
 
 def get_rating_by_id(rating_id):
@@ -61,7 +126,7 @@ def get_rating_by_id(rating_id):
         JOIN Books b ON r.ISBN = b.ISBN
         WHERE r.rating_id = %s
     """
-    return db.execute_query(query, (rating_id,), fetch_one=True)
+    return db.execute_query(query, (rating_id,), fetch_one=True, prepared=True)
 
 
 def get_user_book_rating(user_id, isbn):
@@ -71,67 +136,112 @@ def get_user_book_rating(user_id, isbn):
         FROM Ratings
         WHERE user_id = %s AND ISBN = %s
     """
-    return db.execute_query(query, (user_id, isbn), fetch_one=True)
+    return db.execute_query(query, (user_id, isbn), fetch_one=True, prepared=True)
 
 
 def add_rating(user_id, isbn, rating):
     """Add new rating (or update if exists due to UNIQUE constraint)"""
-    query = """
-        INSERT INTO Ratings(user_id, ISBN, rating)
-        VALUES (%s, %s, %s)
-        ON DUPLICATE KEY UPDATE rating = %s
-    """
-    rows = db.execute_update(query, (user_id, isbn, rating, rating))
-    return rows is not None and rows > 0
+    if not is_valid_rating(rating):
+        return False
+    try:
+        with db.transaction() as cursor:
+            # Lock the (user, book) slot so the aggregate sees the value being replaced
+            cursor.execute(
+                "SELECT rating FROM Ratings WHERE user_id = %s AND ISBN = %s FOR UPDATE",
+                (user_id, isbn)
+            )
+            row = cursor.fetchone()
+            cursor.execute("""
+                INSERT INTO Ratings(user_id, ISBN, rating)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE rating = %s
+            """, (user_id, isbn, rating, rating))
+            rows = cursor.rowcount
+            apply_rating_change(cursor, user_id, isbn, row[0] if row else None, rating)
+    except Error:
+        return False
+    return rows > 0
 
 
 def update_rating(rating_id, new_rating):
     """Update existing rating"""
-    query = "UPDATE Ratings SET rating = %s WHERE rating_id = %s"
-    rows = db.execute_update(query, (new_rating, rating_id))
-    return rows is not None and rows > 0
+    if not is_valid_rating(new_rating):
+        return False
+    try:
+        with db.transaction() as cursor:
+            cursor.execute(
+                "SELECT user_id, ISBN, rating FROM Ratings WHERE rating_id = %s FOR UPDATE",
+                (rating_id,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            cursor.execute("UPDATE Ratings SET rating = %s WHERE rating_id = %s", (new_rating, rating_id))
+            rows = cursor.rowcount
+            apply_rating_change(cursor, row[0], row[1], row[2], new_rating)
+    except Error:
+        return False
+    return rows > 0
+
+
+def _delete_locked(cursor, where, params):
+    """Delete one rating matched by where and take it out of the aggregates"""
+    cursor.execute(f"SELECT user_id, ISBN, rating FROM Ratings WHERE {where} FOR UPDATE", params)
+    row = cursor.fetchone()
+    if row is None:
+        return 0
+    cursor.execute(f"DELETE FROM Ratings WHERE {where}", params)
+    rows = cursor.rowcount
+    apply_rating_change(cursor, row[0], row[1], row[2], None)
+    return rows
 
 
 def delete_rating(rating_id):
     """Delete rating"""
-    query = "DELETE FROM Ratings WHERE rating_id = %s"
-    rows = db.execute_update(query, (rating_id,))
-    return rows is not None and rows > 0
+    try:
+        with db.transaction() as cursor:
+            rows = _delete_locked(cursor, "rating_id = %s", (rating_id,))
+    except Error:
+        return False
+    return rows > 0
 
 
 def delete_user_book_rating(user_id, isbn):
     """Delete specific user's rating for a book"""
-    query = "DELETE FROM Ratings WHERE user_id = %s AND ISBN = %s"
-    rows = db.execute_update(query, (user_id, isbn))
-    return rows is not None and rows > 0
+    try:
+        with db.transaction() as cursor:
+            rows = _delete_locked(cursor, "user_id = %s AND ISBN = %s", (user_id, isbn))
+    except Error:
+        return False
+    return rows > 0
 
 
 def get_book_ratings_summary(isbn):
-    """Get rating statistics for a book"""
-    query = """
+    """Get rating statistics for a book (from the precomputed Book_Rating_Stats)"""
+    query = f"""
         SELECT 
-            COUNT(*) as rating_count,
-            AVG(rating) as avg_rating,
-            MIN(rating) as min_rating,
-            MAX(rating) as max_rating,
-            SUM(CASE WHEN rating >= 8 THEN 1 ELSE 0 END) as high_ratings,
-            SUM(CASE WHEN rating >= 5 AND rating < 8 THEN 1 ELSE 0 END) as medium_ratings,
-            SUM(CASE WHEN rating < 5 THEN 1 ELSE 0 END) as low_ratings
-        FROM Ratings
-        WHERE ISBN = %s
+            COALESCE(MAX(s.rating_count), 0) as rating_count,
+            MAX(s.avg_rating) as avg_rating,
+            MAX({histogram_case('s', 'min')}) as min_rating,
+            MAX({histogram_case('s', 'max')}) as max_rating,
+            COALESCE(MAX(s.r8 + s.r9 + s.r10), 0) as high_ratings,
+            COALESCE(MAX(s.r5 + s.r6 + s.r7), 0) as medium_ratings,
+            COALESCE(MAX(s.r0 + s.r1 + s.r2 + s.r3 + s.r4), 0) as low_ratings
+        FROM Book_Rating_Stats s
+        WHERE s.ISBN = %s
     """
     return db.execute_query(query, (isbn,), fetch_one=True)
 
 
 def get_user_ratings_summary(user_id):
-    """Get rating statistics for a user"""
+    """Get rating statistics for a user (from the precomputed User_Rating_Summary)"""
     query = """
-        SELECT 
-            COUNT(*) as rating_count,
-            AVG(rating) as avg_rating,
-            MIN(rating) as min_rating,
-            MAX(rating) as max_rating
-        FROM Ratings
-        WHERE user_id = %s
+        SELECT
+            COALESCE(MAX(rating_count), 0) as rating_count,
+            MAX(avg_rating) as avg_rating,
+            MAX(min_rating) as min_rating,
+            MAX(max_rating) as max_rating
+        FROM User_Rating_Summary
+        WHERE user_id = %s AND rating_count > 0
     """
-    return db.execute_query(query, (user_id,), fetch_one=True)
\ No newline at end of file
+    return db.execute_query(query, (user_id,), fetch_one=True, prepared=True)
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Row sources
+Result sets read on demand, a batch at a time, for views that only show a window of rows
+
+A row source keeps the rows read so far in a list (record tuples, much
+lighter than widget items) and reads further batches only when a view
+scrolls past them. Sorting re-runs the query with an ORDER BY on the server.
+
+Interface shared with ui.virtual_tree.ListRowSource:
+    rows / complete    rows read so far, and whether the result is exhausted
+    fetch(stop)        read until stop rows are available (worker thread)
+    sortable(name)     whether a view column can be sorted
+    sort(name, desc)   restart in a new order (Tk thread, returns at once)
+    close()            release the connection held by an unfinished read
+"""
+
+import threading
+from mysql.connector import Error
+from db.connection import db
+
+# Rows read from the server per round trip
+BATCH_SIZE = 500
+
+SORTED_QUERY = "SELECT * FROM ({query}) AS results ORDER BY {column} {direction}"
+
+
+class QueryRowSource:
+    """
+    Rows of a SELECT, streamed from one open cursor as they are needed
+
+    Args:
+        query: SELECT statement (its own ORDER BY gives the initial order)
+        params: Query parameters
+        sort_columns: Dict of view column -> result column name the view may sort by
+        batch_size: Rows fetched per round trip
+    """
+
+    def __init__(self, query, params=None, sort_columns=None, batch_size=BATCH_SIZE):
+        self.query = query
+        self.params = params
+        self.sort_columns = dict(sort_columns or {})
+        self.batch_size = batch_size
+        self._order = None          # (result column, descending) or None for the query's order
+        # (generation, rows read) swapped as one value by sort(); reads of older generations are dropped
+        self._current = (0, [])
+        self._stream = None
+        self._stream_generation = None
+        self._complete_generation = None
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self):
+        return self._current[1]
+
+    @property
+    def complete(self):
+        """True once every row of the current order has been read"""
+        return self._complete_generation == self._current[0]
+
+    def sortable(self, name):
+        return name in self.sort_columns
+
+    def sort(self, name, descending=False):
+        """Restart the result sorted by a view column (the next fetch re-runs the query)"""
+        self._order = (self.sort_columns[name], descending)
+        self._current = (self._current[0] + 1, [])
+
+    def cached(self, index):
+        """Row at index if it has been read, else None (never blocks)"""
+        rows = self.rows
+        return rows[index] if index < len(rows) else None
+
+    def fetch(self, stop):
+        """
+        Read until at least stop rows are available or the result is exhausted
+
+        Runs on a worker thread. A cursor that was dropped while the view sat
+        idle (e.g. by the server's net_write_timeout) is reopened once and the
+        rows already read are skipped.
+
+        Returns:
+            Number of rows available
+        """
+        with self._lock:
+            generation, rows = self._current
+            if self._stream_generation != generation:
+                self._close_stream()
+            retried = False
+            while len(rows) < stop and self._complete_generation != generation:
+                if generation != self._current[0]:
+                    break
+                if self._stream is None:
+                    self._stream = self._open(len(rows))
+                    self._stream_generation = generation
+                try:
+                    batch = next(self._stream, None)
+                except Error:
+                    self._stream = None
+                    if retried:
+                        raise
+                    retried = True
+                    continue
+                if batch is None:
+                    self._stream = None
+                    self._complete_generation = generation
+                    break
+                rows.extend(batch)
+            return len(rows)
+
+    def close(self):
+        """Drop an unfinished read and its connection (worker thread)"""
+        with self._lock:
+            self._close_stream()
+
+    def _open(self, skip):
+        """Start streaming in the current order, skipping the first skip rows"""
+        query = self.query
+        if self._order is not None:
+            column, descending = self._order
+            query = SORTED_QUERY.format(query=query, column=f"`{column}`",
+                                        direction='DESC' if descending else 'ASC')
+        stream = db.iter_query(query, self.params, batch_size=self.batch_size,
+                               batches=True, row_format='record')
+        if skip:
+            stream = _skip_rows(stream, skip)
+        return stream
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._stream_generation = None
+
+
+def _skip_rows(batches, skip):
+    """Drop the first skip rows from a stream of batches"""
+    try:
+        for batch in batches:
+            if skip >= len(batch):
+                skip -= len(batch)
+                continue
+            yield batch[skip:]
+            skip = 0
+    finally:
+        batches.close()
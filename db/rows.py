@@ -0,0 +1,68 @@
+"""
+Compact row records
+Tuple-backed rows that share one column index per query shape
+"""
+
+from functools import lru_cache
+
+
+class Record(tuple):
+    """
+    Read-only row that answers both row['column'] and row[0]
+
+    A record is a plain tuple of values; the column names live once on the
+    generated class instead of being repeated in every row as dict keys.
+    get(), keys(), items() and `in` behave like the dict rows returned by
+    default, so code written against dict rows keeps working.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def to_dict(self):
+        return dict(zip(self._fields, self))
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={value!r}" for name, value in zip(self._fields, self))
+        return f"Record({fields})"
+
+
+@lru_cache(maxsize=256)
+def record_type(columns):
+    """Return the Record subclass for a tuple of column names (one class per query shape)"""
+    columns = tuple(columns)
+    return type('Record', (Record,), {
+        '__slots__': (),
+        '_fields': columns,
+        '_index': {name: i for i, name in enumerate(columns)},
+    })
+
+
+def make_records(columns, rows):
+    """Wrap raw cursor tuples as records sharing a single column index"""
+    cls = record_type(tuple(columns))
+    return list(map(cls, rows))
@@ -0,0 +1,156 @@
+"""
+Search helpers
+Turn user search text into index-friendly SQL conditions (FULLTEXT, prefix LIKE, exact ISBN)
+"""
+
+import re
+from db.connection import db
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_TOKEN = 3
+
+# InnoDB's built-in stopword list (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD),
+# used when the server's list cannot be read
+DEFAULT_STOPWORDS = frozenset((
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for',
+    'from', 'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the',
+    'this', 'to', 'was', 'what', 'when', 'where', 'who', 'will', 'with', 'und', 'www',
+))
+
+# Relevance weight of each field in keyword searches
+TITLE_WEIGHT = 3
+AUTHOR_WEIGHT = 2
+PUBLISHER_WEIGHT = 1
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_ISBN_CHARS = re.compile(r"[\s-]")
+
+_stopwords = None
+
+
+def fulltext_stopwords():
+    """
+    Words the server leaves out of its FULLTEXT indexes, read once and cached
+
+    Uses innodb_ft_server_stopword_table when one is configured, else the
+    built-in list; nothing when innodb_ft_enable_stopword is off.
+    """
+    global _stopwords
+    if _stopwords is not None:
+        return _stopwords
+
+    settings = db.execute_query(
+        "SELECT @@innodb_ft_enable_stopword AS enabled, "
+        "@@innodb_ft_server_stopword_table AS stopword_table",
+        fetch_one=True
+    )
+    if not settings:
+        # Server unreachable - try again on the next search
+        return DEFAULT_STOPWORDS
+    if not settings['enabled']:
+        _stopwords = frozenset()
+        return _stopwords
+
+    table = settings['stopword_table']
+    if table:
+        schema, name = table.split('/', 1)
+        rows = db.execute_query(f"SELECT value FROM `{schema}`.`{name}`")
+    else:
+        # Needs the PROCESS privilege; the copy above is the same list
+        rows = db.execute_query("SELECT value FROM INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD")
+    _stopwords = frozenset(row['value'].lower() for row in rows) if rows else DEFAULT_STOPWORDS
+    return _stopwords
+
+
+def boolean_terms(text, require_all=True):
+    """
+    Build a MATCH ... AGAINST boolean-mode string from free text
+
+    Every word becomes a prefix term (word*), required (+word*) when
+    require_all is set. Words too short for the FULLTEXT index and
+    stopwords are dropped: the index has no entries for them, so a
+    required term would match nothing.
+
+    Returns:
+        Boolean-mode search string, or None if no word is indexable
+    """
+    stopwords = fulltext_stopwords()
+    words = [word for word in _WORD.findall(text or '')
+             if len(word) >= FULLTEXT_MIN_TOKEN and word.lower() not in stopwords]
+    if not words:
+        return None
+    prefix = '+' if require_all else ''
+    return ' '.join(f"{prefix}{word}*" for word in words)
+
+
+def like_prefix(text):
+    """LIKE pattern matching values that start with text (can use a B-tree index)"""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def text_condition(column, text):
+    """
+    Condition matching column against user text
+
+    Uses the column's FULLTEXT index when the text has indexable words
+    (long enough and not stopwords), otherwise a prefix LIKE on its B-tree
+    index. Either way words match from their start, not anywhere inside.
+
+    Returns:
+        (sql, params) tuple
+    """
+    terms = boolean_terms(text)
+    if terms:
+        return f"MATCH({column}) AGAINST (%s IN BOOLEAN MODE)", [terms]
+    return f"{column} LIKE %s", [like_prefix(text.strip())]
+
+
+def isbn_condition(column, isbn):
+    """
+    Exact primary key lookup for a complete ISBN, prefix range scan otherwise
+
+    Returns:
+        (sql, params) tuple
+    """
+    isbn = _ISBN_CHARS.sub('', isbn).upper()
+    if len(isbn) in (10, 13):
+        return f"{column} = %s", [isbn]
+    return f"{column} LIKE %s", [like_prefix(isbn)]
+
+
+def relevance_subquery(keywords):
+    """
+    Derived table of (ISBN, relevance) for books matching keywords
+
+    Title, author and publisher matches are scored by their FULLTEXT
+    relevance, weighted, and summed per book. Any matching word counts;
+    books matching more words or more fields rank higher.
+
+    Returns:
+        (sql, params) tuple, or (None, []) if keywords has no indexable words
+    """
+    terms = boolean_terms(keywords, require_all=False)
+    if not terms:
+        return None, []
+
+    sql = f"""
+        SELECT ISBN, SUM(score) AS relevance
+        FROM (
+            SELECT ISBN, MATCH(title) AGAINST (%s IN BOOLEAN MODE) * {TITLE_WEIGHT} AS score
+            FROM Books
+            WHERE MATCH(title) AGAINST (%s IN BOOLEAN MODE)
+            UNION ALL
+            SELECT ba.ISBN, MATCH(a.name) AGAINST (%s IN BOOLEAN MODE) * {AUTHOR_WEIGHT}
+            FROM Authors a
+            JOIN Book_Authors ba ON ba.author_id = a.author_id
+            WHERE MATCH(a.name) AGAINST (%s IN BOOLEAN MODE)
+            UNION ALL
+            SELECT pb.ISBN, MATCH(p.name) AGAINST (%s IN BOOLEAN MODE) * {PUBLISHER_WEIGHT}
+            FROM Publishers p
+            JOIN Books pb ON pb.publisher_id = p.publisher_id
+            WHERE MATCH(p.name) AGAINST (%s IN BOOLEAN MODE)
+        ) matches
+        GROUP BY ISBN
+    """
+    return sql, [terms] * 6
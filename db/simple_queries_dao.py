@@ -4,6 +4,7 @@ Contains 10 simple analytical queries
 """
 
 from db.connection import db
+from db.rating_stats import RATING_VALUES, HISTOGRAM_COLUMNS
 
 
 def get_books_trending_in_clubs(limit=20):
@@ -18,20 +19,20 @@ def get_books_trending_in_clubs(limit=20):
             GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
             p.name as publisher,
             COUNT(DISTINCT rq.club_id) as clubs_count,
-            AVG(r.rating) as avg_rating,
-            COUNT(DISTINCT r.rating_id) as rating_count
+            s.avg_rating,
+            COALESCE(s.rating_count, 0) as rating_count
         FROM Books b
         JOIN Reading_Queue rq ON b.ISBN = rq.ISBN
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
         LEFT JOIN Publishers p ON b.publisher_id = p.publisher_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
-        GROUP BY b.ISBN, b.title, p.name
+        LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
+        GROUP BY b.ISBN, b.title, p.name, s.avg_rating, s.rating_count
         HAVING clubs_count > 0
         ORDER BY clubs_count DESC, avg_rating DESC
         LIMIT %s
     """
-    return db.execute_query(query, (limit,))
+    return db.execute_query(query, (limit,), row_format='record')
 
 
 def get_most_discussed_books(limit=20):
@@ -46,17 +47,17 @@ def get_most_discussed_books(limit=20):
             GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
             COUNT(DISTINCT cd.discussion_id) as discussion_count,
             COUNT(DISTINCT cd.club_id) as clubs_discussing,
-            AVG(r.rating) as avg_rating
+            s.avg_rating
         FROM Books b
         JOIN Chapter_Discussions cd ON b.ISBN = cd.ISBN
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
-        GROUP BY b.ISBN, b.title
+        LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
+        GROUP BY b.ISBN, b.title, s.avg_rating
         ORDER BY discussion_count DESC, clubs_discussing DESC
         LIMIT %s
     """
-    return db.execute_query(query, (limit,))
+    return db.execute_query(query, (limit,), row_format='record')
 
 def get_publisher_comparison():
     """
@@ -80,7 +81,7 @@ def get_publisher_comparison():
         ORDER BY total_books DESC, avg_rating DESC
         LIMIT 50
     """
-    return db.execute_query(query)
+    return db.execute_query(query, row_format='record')
 
 
 def get_most_prolific_authors(limit=20):
@@ -105,7 +106,7 @@ def get_most_prolific_authors(limit=20):
         ORDER BY book_count DESC, avg_rating DESC
         LIMIT %s
     """
-    return db.execute_query(query, (limit,))
+    return db.execute_query(query, (limit,), row_format='record')
 
 
 def get_location_based_stats():
@@ -136,13 +137,14 @@ def get_location_based_stats():
         ORDER BY user_count DESC
         LIMIT 30
     """
-    return db.execute_query(query)
+    return db.execute_query(query, row_format='record')
 
 
 def get_top_rated_books(min_ratings=10, limit=50):
     """
     Get top-rated books with minimum rating threshold
     """
+    # Rank on the stats table (idx_avg_rating) first, then fetch details for the winners
     query = """
         SELECT 
             b.ISBN,
@@ -150,19 +152,23 @@ def get_top_rated_books(min_ratings=10, limit=50):
             GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
             p.name as publisher,
             b.year_of_publication,
-            AVG(r.rating) as avg_rating,
-            COUNT(r.rating_id) as rating_count
-        FROM Books b
+            top.avg_rating,
+            top.rating_count
+        FROM (
+            SELECT ISBN, avg_rating, rating_count
+            FROM Book_Rating_Stats
+            WHERE rating_count >= %s
+            ORDER BY avg_rating DESC, rating_count DESC
+            LIMIT %s
+        ) top
+        JOIN Books b ON b.ISBN = top.ISBN
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
         LEFT JOIN Publishers p ON b.publisher_id = p.publisher_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
-        GROUP BY b.ISBN, b.title, p.name, b.year_of_publication
-        HAVING rating_count >= %s
-        ORDER BY avg_rating DESC, rating_count DESC
-        LIMIT %s
+        GROUP BY b.ISBN, b.title, p.name, b.year_of_publication, top.avg_rating, top.rating_count
+        ORDER BY top.avg_rating DESC, top.rating_count DESC
     """
-    return db.execute_query(query, (min_ratings, limit))
+    return db.execute_query(query, (min_ratings, limit), row_format='record')
 
 
 def get_club_activity_metrics():
@@ -186,7 +192,7 @@ def get_club_activity_metrics():
         GROUP BY bc.club_id, bc.name
         ORDER BY total_discussions DESC, member_count DESC
     """
-    return db.execute_query(query)
+    return db.execute_query(query, row_format='record')
 
 
 def get_inactive_users(days=90):
@@ -215,17 +221,17 @@ def get_inactive_users(days=90):
 def get_rating_distribution_for_book(isbn):
     """
     Get rating distribution (1-10) for a specific book
-    """
-    query = """
-        SELECT 
-            r.rating,
-            COUNT(*) as count
-        FROM Ratings r
-        WHERE r.ISBN = %s
-        GROUP BY r.rating
-        ORDER BY r.rating
-    """
-    return db.execute_query(query, (isbn,))
+    Read from the precomputed histogram in Book_Rating_Stats
+    """
+    query = f"SELECT {', '.join(HISTOGRAM_COLUMNS)} FROM Book_Rating_Stats WHERE ISBN = %s"
+    stats = db.execute_query(query, (isbn,), fetch_one=True, prepared=True)
+    if stats is None:
+        return []
+    return [
+        {'rating': value, 'count': stats[f"r{value}"]}
+        for value in RATING_VALUES
+        if stats[f"r{value}"]
+    ]
 
 
 def get_books_by_year_range(start_year, end_year, limit=100):
@@ -239,15 +245,15 @@ def get_books_by_year_range(start_year, end_year, limit=100):
             b.year_of_publication,
             GROUP_CONCAT(DISTINCT a.name SEPARATOR ', ') as authors,
             p.name as publisher,
-            AVG(r.rating) as avg_rating,
-            COUNT(DISTINCT r.rating_id) as rating_count
+            s.avg_rating,
+            COALESCE(s.rating_count, 0) as rating_count
         FROM Books b
         LEFT JOIN Book_Authors ba ON b.ISBN = ba.ISBN
         LEFT JOIN Authors a ON ba.author_id = a.author_id
         LEFT JOIN Publishers p ON b.publisher_id = p.publisher_id
-        LEFT JOIN Ratings r ON b.ISBN = r.ISBN
+        LEFT JOIN Book_Rating_Stats s ON s.ISBN = b.ISBN
         WHERE b.year_of_publication BETWEEN %s AND %s
-        GROUP BY b.ISBN, b.title, b.year_of_publication, p.name
+        GROUP BY b.ISBN, b.title, b.year_of_publication, p.name, s.avg_rating, s.rating_count
         ORDER BY b.year_of_publication DESC, avg_rating DESC
         LIMIT %s
     """
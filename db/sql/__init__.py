@@ -0,0 +1,4 @@
+"""
+SQL scripts
+Scripts shared by the app and the data loaders, and the parser that splits them into statements
+"""
@@ -0,0 +1,76 @@
+-- ============================================
+-- Rebuild the precomputed rating aggregates from Ratings
+-- Executed statement by statement by db/rating_stats.py and data_loader/load_ratings.py
+-- ============================================
+
+DELETE FROM Book_Rating_Stats;
+
+INSERT INTO Book_Rating_Stats (ISBN, rating_count, rating_sum, r0, r1, r2, r3, r4, r5, r6, r7, r8, r9, r10)
+SELECT
+    ISBN,
+    COUNT(*),
+    SUM(rating),
+    SUM(rating = 0),
+    SUM(rating = 1),
+    SUM(rating = 2),
+    SUM(rating = 3),
+    SUM(rating = 4),
+    SUM(rating = 5),
+    SUM(rating = 6),
+    SUM(rating = 7),
+    SUM(rating = 8),
+    SUM(rating = 9),
+    SUM(rating = 10)
+FROM Ratings
+GROUP BY ISBN;
+
+DELETE FROM User_Author_Counts;
+
+INSERT INTO User_Author_Counts (user_id, author_id, rating_count)
+SELECT r.user_id, ba.author_id, COUNT(*)
+FROM Ratings r
+JOIN Book_Authors ba ON ba.ISBN = r.ISBN
+GROUP BY r.user_id, ba.author_id;
+
+DELETE FROM User_Rating_Summary;
+
+INSERT INTO User_Rating_Summary (user_id, rating_count, rating_sum, r0, r1, r2, r3, r4, r5, r6, r7, r8, r9, r10)
+SELECT
+    user_id,
+    COUNT(*),
+    SUM(rating),
+    SUM(rating = 0),
+    SUM(rating = 1),
+    SUM(rating = 2),
+    SUM(rating = 3),
+    SUM(rating = 4),
+    SUM(rating = 5),
+    SUM(rating = 6),
+    SUM(rating = 7),
+    SUM(rating = 8),
+    SUM(rating = 9),
+    SUM(rating = 10)
+FROM Ratings
+GROUP BY user_id;
+
+UPDATE User_Rating_Summary s
+JOIN (
+    SELECT user_id, COUNT(*) AS distinct_authors
+    FROM User_Author_Counts
+    GROUP BY user_id
+) d ON d.user_id = s.user_id
+SET s.distinct_authors = d.distinct_authors;
+
+UPDATE User_Rating_Summary s
+JOIN (
+    SELECT user_id, author_id
+    FROM (
+        SELECT
+            user_id,
+            author_id,
+            ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY rating_count DESC, author_id) AS author_rank
+        FROM User_Author_Counts
+    ) ranked
+    WHERE author_rank = 1
+) t ON t.user_id = s.user_id
+SET s.top_author_id = t.author_id;
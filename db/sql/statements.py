@@ -0,0 +1,18 @@
+"""
+SQL script statements
+Splits the scripts in this folder into statements a cursor can run one at a time
+
+Imports nothing from the app, so the data loaders (which cannot import the db
+package) load this file by its path too.
+"""
+
+import os
+
+REBUILD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rebuild_rating_stats.sql')
+
+
+def read_statements(path):
+    """Statements of a script, in order (comment lines dropped)"""
+    with open(path, encoding='utf-8') as script:
+        lines = [line for line in script if not line.lstrip().startswith('--')]
+    return [statement.strip() for statement in ''.join(lines).split(';') if statement.strip()]
@@ -3,11 +3,20 @@ Users data access object
 Handles user-related database operations
 """
 
+from mysql.connector import Error
 from db.connection import db
+from db.rating_stats import remove_user_ratings
 
 
-def search_users(username=None, location=None, min_birth_year=None, max_birth_year=None, limit=100):
-    """Search users with filters"""
+def search_users(username=None, location=None, min_birth_year=None, max_birth_year=None,
+                 limit=100, after=None, before=None, at=None):
+    """
+    Search users with filters
+    
+    Results are ordered by username and paged by keyset: pass the last
+    username shown as after for the next page, or the first one as before
+    for the previous page (or as at to reload the page starting there).
+    """
     query = """
         SELECT user_id, username, location, birth_year
         FROM Users
@@ -32,22 +41,37 @@ def search_users(username=None, location=None, min_birth_year=None, max_birth_ye
         query += " AND birth_year <= %s"
         params.append(max_birth_year)
     
-    query += " ORDER BY username"
-    query += f" LIMIT {limit}"
+    if after:
+        query += " AND username > %s"
+        params.append(after)
+    
+    if at:
+        query += " AND username >= %s"
+        params.append(at)
     
-    return db.execute_query(query, tuple(params))
+    if before:
+        # Read backwards from the cursor, then put the page back in order
+        query += " AND username < %s"
+        params.append(before)
+        query += f" ORDER BY username DESC LIMIT {int(limit)}"
+        query = f"SELECT * FROM ({query}) page ORDER BY username"
+    else:
+        query += " ORDER BY username"
+        query += f" LIMIT {int(limit)}"
+    
+    return db.execute_query(query, tuple(params), row_format='record')
 
 
 def get_user_by_id(user_id):
     """Get user by ID"""
     query = "SELECT user_id, username, location, birth_year FROM Users WHERE user_id = %s"
-    return db.execute_query(query, (user_id,), fetch_one=True)
+    return db.execute_query(query, (user_id,), fetch_one=True, prepared=True)
 
 
 def get_user_by_username(username):
     """Get user by username"""
     query = "SELECT user_id, username, password, location, birth_year FROM Users WHERE username = %s"
-    return db.execute_query(query, (username,), fetch_one=True)
+    return db.execute_query(query, (username,), fetch_one=True, prepared=True)
 
 
 def add_user(user_id, username, password, location, birth_year):
@@ -93,9 +117,15 @@ def update_user(user_id, username=None, password=None, location=None, birth_year
 
 def delete_user(user_id):
     """Delete user (cascades to ratings, club memberships, etc.)"""
-    query = "DELETE FROM Users WHERE user_id = %s"
-    rows = db.execute_update(query, (user_id,))
-    return rows is not None and rows > 0
+    try:
+        with db.transaction() as cursor:
+            # The cascade bypasses ratings_dao, so take the ratings out of the aggregates first
+            remove_user_ratings(cursor, user_id)
+            cursor.execute("DELETE FROM Users WHERE user_id = %s", (user_id,))
+            rows = cursor.rowcount
+    except Error:
+        return False
+    return rows > 0
 
 
 def get_user_reading_statistics(user_id):
@@ -107,31 +137,23 @@ def get_user_reading_statistics(user_id):
         - Average rating given
         - Favorite author (most rated)
         - Reading diversity (unique authors rated)
+
+    Served from User_Rating_Summary, kept current by the rating writes.
     """
     query = """
-        SELECT 
+        SELECT
             u.user_id,
             u.username,
-            COUNT(DISTINCT r.ISBN) as books_rated,
-            AVG(r.rating) as avg_rating_given,
-            COUNT(DISTINCT ba.author_id) as unique_authors_rated,
-            (
-                SELECT a.name
-                FROM Ratings r2
-                JOIN Book_Authors ba2 ON r2.ISBN = ba2.ISBN
-                JOIN Authors a ON ba2.author_id = a.author_id
-                WHERE r2.user_id = u.user_id
-                GROUP BY a.author_id, a.name
-                ORDER BY COUNT(*) DESC
-                LIMIT 1
-            ) as favorite_author
+            COALESCE(s.rating_count, 0) as books_rated,
+            s.avg_rating as avg_rating_given,
+            COALESCE(s.distinct_authors, 0) as unique_authors_rated,
+            a.name as favorite_author
         FROM Users u
-        LEFT JOIN Ratings r ON u.user_id = r.user_id
-        LEFT JOIN Book_Authors ba ON r.ISBN = ba.ISBN
+        LEFT JOIN User_Rating_Summary s ON s.user_id = u.user_id
+        LEFT JOIN Authors a ON a.author_id = s.top_author_id
         WHERE u.user_id = %s
-        GROUP BY u.user_id, u.username
     """
-    return db.execute_query(query, (user_id,), fetch_one=True)
+    return db.execute_query(query, (user_id,), fetch_one=True, prepared=True)
 
 
 def get_all_users_count():
@@ -9,35 +9,55 @@ from tkinter import messagebox
 import sys
 import traceback
 
-# Test database connection first
-try:
-    from db.connection import db
-    # Test connection
+from db.connection import db
+from ui.main_window import MainWindow
+
+
+def check_connection():
+    """Name of the connected database (raises if the database is unreachable)"""
     result = db.execute_query("SELECT DATABASE()", fetch_one=True)
-    if result:
-        print(f"✓ Connected to database: {result.get('DATABASE()')}")
-    else:
-        print("✗ Database connection failed")
-        sys.exit(1)
-except Exception as e:
-    print(f"✗ Error connecting to database: {e}")
-    traceback.print_exc()
-    sys.exit(1)
+    if not result:
+        raise RuntimeError("Database connection failed")
+    return result.get('DATABASE()')
 
-from ui.main_window import MainWindow
+
+def start(root):
+    """
+    Build the main window and test the database connection in the background
+
+    The window is shown straight away; if the connection test fails an error
+    is shown and the window closes (app.failed is set).
+    """
+    app = MainWindow(root)
+    app.failed = False
+
+    def connected(name):
+        print(f"✓ Connected to database: {name}")
+
+    def failed(error):
+        print(f"✗ Error connecting to database: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+        app.failed = True
+        messagebox.showerror("Database Error", f"Could not connect to the database:\n{error}")
+        app.close()
+
+    app.tasks.submit(check_connection, on_done=connected, on_error=failed)
+    return app
 
 
 def main():
     """Main application entry point"""
     try:
         root = tk.Tk()
-        app = MainWindow(root)
+        app = start(root)
         root.mainloop()
     except Exception as e:
         messagebox.showerror("Fatal Error", f"Application error:\n{str(e)}")
         traceback.print_exc()
         sys.exit(1)
+    if app.failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,37 @@
+-- ============================================
+-- 001: Make Authors.name unique
+-- Lets authors_dao create authors race-free with INSERT ... ON DUPLICATE KEY
+-- Run against an existing database: mysql -u root -p <database> < migrations/001_unique_author_names.sql
+-- ============================================
+
+START TRANSACTION;
+
+-- Point book links at the lowest author_id for each name
+INSERT IGNORE INTO Book_Authors (ISBN, author_id)
+SELECT ba.ISBN, keeper.author_id
+FROM Book_Authors ba
+JOIN Authors a ON ba.author_id = a.author_id
+JOIN (
+    SELECT name, MIN(author_id) AS author_id
+    FROM Authors
+    GROUP BY name
+    HAVING COUNT(*) > 1
+) keeper ON a.name = keeper.name
+WHERE ba.author_id <> keeper.author_id;
+
+-- Remove the duplicates (their Book_Authors rows cascade)
+DELETE a
+FROM Authors a
+JOIN (
+    SELECT name, MIN(author_id) AS author_id
+    FROM Authors
+    GROUP BY name
+    HAVING COUNT(*) > 1
+) keeper ON a.name = keeper.name
+WHERE a.author_id <> keeper.author_id;
+
+COMMIT;
+
+ALTER TABLE Authors
+    DROP INDEX idx_name,
+    ADD UNIQUE INDEX idx_name (name);
@@ -0,0 +1,9 @@
+-- ============================================
+-- 002: FULLTEXT indexes for book search
+-- Used by books_dao.search_books (word matching and keyword relevance)
+-- Run against an existing database: mysql -u root -p <database> < migrations/002_fulltext_search.sql
+-- ============================================
+
+ALTER TABLE Books ADD FULLTEXT INDEX ft_title (title);
+ALTER TABLE Authors ADD FULLTEXT INDEX ft_name (name);
+ALTER TABLE Publishers ADD FULLTEXT INDEX ft_name (name);
@@ -0,0 +1,40 @@
+-- ============================================
+-- 003: Precomputed per-book rating aggregates
+-- Maintained by ratings_dao writes; rebuild any time with: python -m db.rating_stats
+-- Run against an existing database: mysql -u root -p <database> < migrations/003_book_rating_stats.sql
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS Book_Rating_Stats (
+    ISBN VARCHAR(13) PRIMARY KEY,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    r0 INT NOT NULL DEFAULT 0,
+    r1 INT NOT NULL DEFAULT 0,
+    r2 INT NOT NULL DEFAULT 0,
+    r3 INT NOT NULL DEFAULT 0,
+    r4 INT NOT NULL DEFAULT 0,
+    r5 INT NOT NULL DEFAULT 0,
+    r6 INT NOT NULL DEFAULT 0,
+    r7 INT NOT NULL DEFAULT 0,
+    r8 INT NOT NULL DEFAULT 0,
+    r9 INT NOT NULL DEFAULT 0,
+    r10 INT NOT NULL DEFAULT 0,
+    avg_rating DECIMAL(6,4) AS (rating_sum / NULLIF(rating_count, 0)) STORED,
+    INDEX idx_avg_rating (avg_rating, rating_count),
+    INDEX idx_rating_count (rating_count),
+    FOREIGN KEY (ISBN) REFERENCES Books(ISBN)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+DELETE FROM Book_Rating_Stats;
+
+INSERT INTO Book_Rating_Stats (ISBN, rating_count, rating_sum, r0, r1, r2, r3, r4, r5, r6, r7, r8, r9, r10)
+SELECT
+    ISBN,
+    COUNT(*),
+    SUM(rating),
+    SUM(rating = 0), SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5),
+    SUM(rating = 6), SUM(rating = 7), SUM(rating = 8), SUM(rating = 9), SUM(rating = 10)
+FROM Ratings
+GROUP BY ISBN;
@@ -0,0 +1,48 @@
+-- ============================================
+-- 004: Per-user rating summary
+-- Maintained by ratings_dao writes. After creating the tables, backfill them with:
+--     python -m db.rating_stats
+-- Run against an existing database: mysql -u root -p <database> < migrations/004_user_rating_summary.sql
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS User_Rating_Summary (
+    user_id INT PRIMARY KEY,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    r0 INT NOT NULL DEFAULT 0,
+    r1 INT NOT NULL DEFAULT 0,
+    r2 INT NOT NULL DEFAULT 0,
+    r3 INT NOT NULL DEFAULT 0,
+    r4 INT NOT NULL DEFAULT 0,
+    r5 INT NOT NULL DEFAULT 0,
+    r6 INT NOT NULL DEFAULT 0,
+    r7 INT NOT NULL DEFAULT 0,
+    r8 INT NOT NULL DEFAULT 0,
+    r9 INT NOT NULL DEFAULT 0,
+    r10 INT NOT NULL DEFAULT 0,
+    distinct_authors INT NOT NULL DEFAULT 0,
+    top_author_id INT NULL,
+    avg_rating DECIMAL(6,4) AS (rating_sum / NULLIF(rating_count, 0)) STORED,
+    min_rating TINYINT AS (CASE WHEN r0 > 0 THEN 0 WHEN r1 > 0 THEN 1 WHEN r2 > 0 THEN 2 WHEN r3 > 0 THEN 3 WHEN r4 > 0 THEN 4 WHEN r5 > 0 THEN 5 WHEN r6 > 0 THEN 6 WHEN r7 > 0 THEN 7 WHEN r8 > 0 THEN 8 WHEN r9 > 0 THEN 9 WHEN r10 > 0 THEN 10 END) STORED,
+    max_rating TINYINT AS (CASE WHEN r10 > 0 THEN 10 WHEN r9 > 0 THEN 9 WHEN r8 > 0 THEN 8 WHEN r7 > 0 THEN 7 WHEN r6 > 0 THEN 6 WHEN r5 > 0 THEN 5 WHEN r4 > 0 THEN 4 WHEN r3 > 0 THEN 3 WHEN r2 > 0 THEN 2 WHEN r1 > 0 THEN 1 WHEN r0 > 0 THEN 0 END) STORED,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    FOREIGN KEY (top_author_id) REFERENCES Authors(author_id)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS User_Author_Counts (
+    user_id INT,
+    author_id INT,
+    rating_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, author_id),
+    INDEX idx_user_count (user_id, rating_count),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+    FOREIGN KEY (author_id) REFERENCES Authors(author_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
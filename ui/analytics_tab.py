@@ -5,12 +5,16 @@ Displays complex analytical queries and simple queries
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+from config import VIRTUAL_TREE_CONFIG
 from db import analytics_dao, simple_queries_dao
+from ui.tasks import BusyIndicator, TaskRunner
+from ui.virtual_tree import VirtualTree, ListRowSource
 
 
 class AnalyticsTab:
-    def __init__(self, parent):
+    def __init__(self, parent, tasks=None):
         self.frame = ttk.Frame(parent, padding="10")
+        self.tasks = tasks or TaskRunner(self.frame)
         self.setup_ui()
     
     def setup_ui(self):
@@ -19,6 +23,9 @@ class AnalyticsTab:
         ttk.Label(self.frame, text="Analytics Dashboard", 
                  font=('Helvetica', 14, 'bold')).pack(pady=(0, 10))
         
+        self.busy = BusyIndicator(self.frame, text="Running query...")
+        self.busy.frame.pack(anchor=tk.E)
+        
         # Create notebook for different analytics
         notebook = ttk.Notebook(self.frame)
         notebook.pack(fill=tk.BOTH, expand=True)
@@ -112,24 +119,25 @@ class AnalyticsTab:
             messagebox.showerror("Error", "Parameters must be numbers")
             return
         
-        results = analytics_dao.get_top_publishers_by_rating(min_books, min_ratings)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Top Publishers by Rating",
-            ["Publisher Name", "Total Books", "Avg Rating", "Total Ratings"],
-            results,
-            lambda r: (
-                r.get('publisher_name'),
-                r.get('total_books'),
-                f"{r.get('avg_rating', 0):.2f}",
-                r.get('total_ratings')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Top Publishers by Rating",
+                ["Publisher Name", "Total Books", "Avg Rating", "Total Ratings"],
+                results,
+                lambda r: (
+                    r.get('publisher_name'),
+                    r.get('total_books'),
+                    f"{r.get('avg_rating', 0):.2f}",
+                    r.get('total_ratings')
+                )
             )
-        )
-
+        
+        self.tasks.submit(analytics_dao.get_top_publishers_by_rating, min_books, min_ratings,
+                          key='analytics', busy=self.busy, on_done=show)
 
     def run_age_group_books(self):
         """Run age group books query"""
@@ -142,31 +150,36 @@ class AnalyticsTab:
         # Get book search term (empty string if not provided)
         book_search = self.book_search_var.get().strip() or None
         
-        # Call DAO with book search parameter
-        results = analytics_dao.get_top_rated_books_by_age_group(min_ratings, book_search)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available for the specified criteria")
-            return
-        
-        # Update title based on whether search was used
-        if book_search:
-            title = f"Top Rated Books by Age Group - Search: '{book_search}'"
-        else:
-            title = "Top Rated Books by Age Group - All Books"
-        
-        self.show_results_table(
-            title,
-            ["Age Group", "ISBN", "Title", "Num Ratings", "Avg Rating"],
-            results,
-            lambda r: (
-                r.get('age_group'),
-                r.get('ISBN'),
-                r.get('title'),
-                r.get('num_ratings'),
-                f"{r.get('avg_rating', 0):.2f}"
+        # Rows are read from the server as the results window scrolls
+        source = analytics_dao.top_rated_books_by_age_group_source(min_ratings, book_search)
+        
+        def show(loaded):
+            if not loaded:
+                messagebox.showinfo("Results", "No data available for the specified criteria")
+                return
+        
+            # Update title based on whether search was used
+            if book_search:
+                title = f"Top Rated Books by Age Group - Search: '{book_search}'"
+            else:
+                title = "Top Rated Books by Age Group - All Books"
+        
+            self.show_results_table(
+                title,
+                ["Age Group", "ISBN", "Title", "Num Ratings", "Avg Rating"],
+                source,
+                lambda r: (
+                    r.get('age_group'),
+                    r.get('ISBN'),
+                    r.get('title'),
+                    r.get('num_ratings'),
+                    f"{r.get('avg_rating', 0):.2f}"
+                )
             )
-        )
+        
+        # Read the first page before opening the window
+        self.tasks.submit(source.fetch, VIRTUAL_TREE_CONFIG['page_size'],
+                          key='analytics', busy=self.busy, on_done=show)
 
     def run_active_clubs(self):
         """Run active clubs query"""
@@ -176,27 +189,29 @@ class AnalyticsTab:
             messagebox.showerror("Error", "Min members must be a number")
             return
         
-        results = analytics_dao.get_most_active_book_clubs(min_members)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Most Active Book Clubs",
-            ["Club ID", "Club Name", "Members", "Books Read", "Discussions", "Comments", "Disc/Member"],
-            results,
-            lambda r: (
-                r.get('club_id'),
-                r.get('club_name'),
-                r.get('member_count'),
-                r.get('books_read'),
-                r.get('total_discussions'),
-                r.get('total_comments'),
-                f"{r.get('discussions_per_member', 0):.2f}"
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Most Active Book Clubs",
+                ["Club ID", "Club Name", "Members", "Books Read", "Discussions", "Comments", "Disc/Member"],
+                results,
+                lambda r: (
+                    r.get('club_id'),
+                    r.get('club_name'),
+                    r.get('member_count'),
+                    r.get('books_read'),
+                    r.get('total_discussions'),
+                    r.get('total_comments'),
+                    f"{r.get('discussions_per_member', 0):.2f}"
+                )
             )
-        )
-    
+        
+        self.tasks.submit(analytics_dao.get_most_active_book_clubs, min_members,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def setup_simple_queries(self, parent):
         """Setup simple queries section"""
         # Create scrollable frame
@@ -244,32 +259,34 @@ class AnalyticsTab:
     
     def run_club_analytics(self):
         """Run club analytics query"""
-        results = analytics_dao.get_club_analytics()
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        # Create results window
-        self.show_results_table(
-            "Club Analytics Results",
-            ["Club ID", "Name", "Public", "Members", "Avg Age", "Discussions", 
-             "Current Book", "Book Rating", "Completed", "In Queue"],
-            results,
-            lambda r: (
-                r.get('club_id'),
-                r.get('club_name'),
-                'Yes' if r.get('is_public') else 'No',
-                r.get('member_count'),
-                r.get('avg_member_age'),
-                r.get('total_discussions'),
-                r.get('current_book_title', 'None'),
-                f"{r.get('current_book_avg_rating', 0):.2f}" if r.get('current_book_avg_rating') else 'N/A',
-                r.get('books_completed'),
-                r.get('books_in_queue')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            # Create results window
+            self.show_results_table(
+                "Club Analytics Results",
+                ["Club ID", "Name", "Public", "Members", "Avg Age", "Discussions", 
+                 "Current Book", "Book Rating", "Completed", "In Queue"],
+                results,
+                lambda r: (
+                    r.get('club_id'),
+                    r.get('club_name'),
+                    'Yes' if r.get('is_public') else 'No',
+                    r.get('member_count'),
+                    r.get('avg_member_age'),
+                    r.get('total_discussions'),
+                    r.get('current_book_title', 'None'),
+                    f"{r.get('current_book_avg_rating', 0):.2f}" if r.get('current_book_avg_rating') else 'N/A',
+                    r.get('books_completed'),
+                    r.get('books_in_queue')
+                )
             )
-        )
-    
+        
+        self.tasks.submit(analytics_dao.get_club_analytics,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_cross_generational(self):
         """Run cross-generational reading patterns query"""
         try:
@@ -278,28 +295,30 @@ class AnalyticsTab:
             messagebox.showerror("Error", "Min ratings must be a number")
             return
         
-        results = analytics_dao.get_cross_generational_reading_patterns(min_ratings)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Cross-Generational Reading Patterns",
-            ["Age Group", "ISBN", "Title", "Authors", "Publisher", "Readers", "Avg Rating", "Count"],
-            results,
-            lambda r: (
-                r.get('age_group'),
-                r.get('ISBN'),
-                r.get('book_title'),
-                r.get('authors', 'Unknown'),
-                r.get('publisher', 'Unknown'),
-                r.get('readers_in_group'),
-                f"{r.get('avg_rating', 0):.2f}",
-                r.get('rating_count')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Cross-Generational Reading Patterns",
+                ["Age Group", "ISBN", "Title", "Authors", "Publisher", "Readers", "Avg Rating", "Count"],
+                results,
+                lambda r: (
+                    r.get('age_group'),
+                    r.get('ISBN'),
+                    r.get('book_title'),
+                    r.get('authors', 'Unknown'),
+                    r.get('publisher', 'Unknown'),
+                    r.get('readers_in_group'),
+                    f"{r.get('avg_rating', 0):.2f}",
+                    r.get('rating_count')
+                )
             )
-        )
-    
+        
+        self.tasks.submit(analytics_dao.get_cross_generational_reading_patterns, min_ratings,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_publisher_analysis(self):
         """Run publisher success analysis query"""
         try:
@@ -308,187 +327,208 @@ class AnalyticsTab:
             messagebox.showerror("Error", "Min books must be a number")
             return
         
-        results = analytics_dao.get_publisher_success_analysis(min_books)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Publisher Success Analysis",
-            ["Publisher", "Books", "Avg Rating", "Ratings", "Club Selections", "In Queue",
-             "High %", "Top Book"],
-            results,
-            lambda r: (
-                r.get('publisher_name'),
-                r.get('total_books'),
-                f"{r.get('avg_rating', 0):.2f}",
-                r.get('total_ratings'),
-                r.get('club_selections'),
-                r.get('times_in_queue'),
-                f"{r.get('high_rating_percentage', 0):.1f}%",
-                r.get('top_rated_book', 'N/A')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Publisher Success Analysis",
+                ["Publisher", "Books", "Avg Rating", "Ratings", "Club Selections", "In Queue",
+                 "High %", "Top Book"],
+                results,
+                lambda r: (
+                    r.get('publisher_name'),
+                    r.get('total_books'),
+                    f"{r.get('avg_rating', 0):.2f}",
+                    r.get('total_ratings'),
+                    r.get('club_selections'),
+                    r.get('times_in_queue'),
+                    f"{r.get('high_rating_percentage', 0):.1f}%",
+                    r.get('top_rated_book', 'N/A')
+                )
             )
-        )
-    
+        
+        self.tasks.submit(analytics_dao.get_publisher_success_analysis, min_books,
+                          key='analytics', busy=self.busy, on_done=show)
+
     # Simple Query Methods
     
     def run_trending_books(self):
         """Run trending books query"""
-        results = simple_queries_dao.get_books_trending_in_clubs(limit=30)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Books Trending in Clubs",
-            ["ISBN", "Title", "Authors", "Publisher", "Clubs", "Avg Rating", "Ratings"],
-            results,
-            lambda r: (
-                r.get('ISBN'),
-                r.get('title'),
-                r.get('authors', 'Unknown'),
-                r.get('publisher', 'Unknown'),
-                r.get('clubs_count'),
-                f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A',
-                r.get('rating_count', 0)
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Books Trending in Clubs",
+                ["ISBN", "Title", "Authors", "Publisher", "Clubs", "Avg Rating", "Ratings"],
+                results,
+                lambda r: (
+                    r.get('ISBN'),
+                    r.get('title'),
+                    r.get('authors', 'Unknown'),
+                    r.get('publisher', 'Unknown'),
+                    r.get('clubs_count'),
+                    f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A',
+                    r.get('rating_count', 0)
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_books_trending_in_clubs, limit=30,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_discussed_books(self):
         """Run most discussed books query"""
-        results = simple_queries_dao.get_most_discussed_books(limit=30)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Most Discussed Books",
-            ["ISBN", "Title", "Authors", "Discussions", "Clubs", "Avg Rating"],
-            results,
-            lambda r: (
-                r.get('ISBN'),
-                r.get('title'),
-                r.get('authors', 'Unknown'),
-                r.get('discussion_count'),
-                r.get('clubs_discussing'),
-                f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A'
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Most Discussed Books",
+                ["ISBN", "Title", "Authors", "Discussions", "Clubs", "Avg Rating"],
+                results,
+                lambda r: (
+                    r.get('ISBN'),
+                    r.get('title'),
+                    r.get('authors', 'Unknown'),
+                    r.get('discussion_count'),
+                    r.get('clubs_discussing'),
+                    f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A'
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_most_discussed_books, limit=30,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_publisher_comparison(self):
         """Run publisher comparison query"""
-        results = simple_queries_dao.get_publisher_comparison()
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Publisher Comparison",
-            ["Publisher ID", "Publisher Name", "Books", "Avg Rating", "Ratings", "Club Selections"],
-            results,
-            lambda r: (
-                r.get('publisher_id'),
-                r.get('publisher_name'),
-                r.get('total_books'),
-                f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A',
-                r.get('total_ratings', 0),
-                r.get('club_selections', 0)
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Publisher Comparison",
+                ["Publisher ID", "Publisher Name", "Books", "Avg Rating", "Ratings", "Club Selections"],
+                results,
+                lambda r: (
+                    r.get('publisher_id'),
+                    r.get('publisher_name'),
+                    r.get('total_books'),
+                    f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A',
+                    r.get('total_ratings', 0),
+                    r.get('club_selections', 0)
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_publisher_comparison,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_prolific_authors(self):
         """Run most prolific authors query"""
-        results = simple_queries_dao.get_most_prolific_authors(limit=30)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Most Prolific Authors",
-            ["Author ID", "Author Name", "Books", "Avg Rating", "Ratings"],
-            results,
-            lambda r: (
-                r.get('author_id'),
-                r.get('author_name'),
-                r.get('book_count'),
-                f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A',
-                r.get('total_ratings', 0)
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Most Prolific Authors",
+                ["Author ID", "Author Name", "Books", "Avg Rating", "Ratings"],
+                results,
+                lambda r: (
+                    r.get('author_id'),
+                    r.get('author_name'),
+                    r.get('book_count'),
+                    f"{r.get('avg_rating', 0):.2f}" if r.get('avg_rating') else 'N/A',
+                    r.get('total_ratings', 0)
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_most_prolific_authors, limit=30,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_location_stats(self):
         """Run location-based statistics query"""
-        results = simple_queries_dao.get_location_based_stats()
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Location-Based Statistics",
-            ["Location", "Users", "Ratings", "Avg Rating", "Most Popular Book"],
-            results,
-            lambda r: (
-                r.get('location'),
-                r.get('user_count'),
-                r.get('total_ratings', 0),
-                f"{r.get('avg_rating_given', 0):.2f}" if r.get('avg_rating_given') else 'N/A',
-                r.get('most_popular_book', 'N/A')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Location-Based Statistics",
+                ["Location", "Users", "Ratings", "Avg Rating", "Most Popular Book"],
+                results,
+                lambda r: (
+                    r.get('location'),
+                    r.get('user_count'),
+                    r.get('total_ratings', 0),
+                    f"{r.get('avg_rating_given', 0):.2f}" if r.get('avg_rating_given') else 'N/A',
+                    r.get('most_popular_book', 'N/A')
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_location_based_stats,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_top_rated(self):
         """Run top rated books query"""
-        results = simple_queries_dao.get_top_rated_books(min_ratings=10, limit=50)
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Top Rated Books",
-            ["ISBN", "Title", "Authors", "Publisher", "Year", "Avg Rating", "Ratings"],
-            results,
-            lambda r: (
-                r.get('ISBN'),
-                r.get('title'),
-                r.get('authors', 'Unknown'),
-                r.get('publisher', 'Unknown'),
-                r.get('year_of_publication', 'N/A'),
-                f"{r.get('avg_rating', 0):.2f}",
-                r.get('rating_count')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Top Rated Books",
+                ["ISBN", "Title", "Authors", "Publisher", "Year", "Avg Rating", "Ratings"],
+                results,
+                lambda r: (
+                    r.get('ISBN'),
+                    r.get('title'),
+                    r.get('authors', 'Unknown'),
+                    r.get('publisher', 'Unknown'),
+                    r.get('year_of_publication', 'N/A'),
+                    f"{r.get('avg_rating', 0):.2f}",
+                    r.get('rating_count')
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_top_rated_books, min_ratings=10, limit=50,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def run_club_activity(self):
         """Run club activity metrics query"""
-        results = simple_queries_dao.get_club_activity_metrics()
-        
-        if not results:
-            messagebox.showinfo("Results", "No data available")
-            return
-        
-        self.show_results_table(
-            "Club Activity Metrics",
-            ["Club ID", "Club Name", "Members", "Discussions", "Completed", "In Queue"],
-            results,
-            lambda r: (
-                r.get('club_id'),
-                r.get('club_name'),
-                r.get('member_count'),
-                r.get('total_discussions'),
-                r.get('books_completed'),
-                r.get('books_in_queue')
+        def show(results):
+            if not results:
+                messagebox.showinfo("Results", "No data available")
+                return
+        
+            self.show_results_table(
+                "Club Activity Metrics",
+                ["Club ID", "Club Name", "Members", "Discussions", "Completed", "In Queue"],
+                results,
+                lambda r: (
+                    r.get('club_id'),
+                    r.get('club_name'),
+                    r.get('member_count'),
+                    r.get('total_discussions'),
+                    r.get('books_completed'),
+                    r.get('books_in_queue')
+                )
             )
-        )
-    
+        
+        self.tasks.submit(simple_queries_dao.get_club_activity_metrics,
+                          key='analytics', busy=self.busy, on_done=show)
+
     def show_results_table(self, title, columns, results, row_mapper):
-        """Show results in a table dialog"""
+        """
+        Show results in a table dialog
+        
+        results is a list of rows or a row source (db.row_source); either way
+        only the rows on screen become Treeview items.
+        """
         # Create results window
         dialog = tk.Toplevel(self.frame)
         dialog.title(title)
@@ -499,42 +539,21 @@ class AnalyticsTab:
         
         ttk.Label(frame, text=title, font=('Helvetica', 12, 'bold')).pack(pady=(0, 10))
         
-        # Create treeview
-        tree_frame = ttk.Frame(frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True)
-        
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
-        
-        tree = ttk.Treeview(
-            tree_frame,
-            columns=columns,
-            show="headings",
-            yscrollcommand=vsb.set,
-            xscrollcommand=hsb.set
-        )
-        
-        vsb.config(command=tree.yview)
-        hsb.config(command=tree.xview)
-        
-        # Configure columns
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        if isinstance(results, list):
+            results = ListRowSource(results, columns, row_mapper)
         
-        tree_frame.rowconfigure(0, weight=1)
-        tree_frame.columnconfigure(0, weight=1)
+        # Info label (packed below the table)
+        info_label = ttk.Label(frame)
         
-        # Load data
-        for result in results:
-            tree.insert("", tk.END, values=row_mapper(result))
+        def update_count(shown, total, complete):
+            if complete:
+                info_label.config(text=f"Total Results: {total}")
+            else:
+                info_label.config(text=f"Results loaded: {total} (more as you scroll)")
         
-        # Info label
-        info_label = ttk.Label(frame, text=f"Total Results: {len(results)}")
+        # Create table; click a heading to sort
+        table = VirtualTree(frame, columns, results, row_mapper, self.tasks, on_change=update_count)
+        table.frame.pack(fill=tk.BOTH, expand=True)
         info_label.pack(pady=(10, 0))
 
         
@@ -4,16 +4,21 @@ Handles book search, CRUD operations, and related queries
 """
 
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, messagebox
 from db import books_dao, publishers_dao, authors_dao
 from ui.dialogs import AddBookDialog, EditBookDialog, BookDetailsDialog
+from ui.pagination import KeysetPager, PagerControls
+from ui.tasks import BusyIndicator, TaskRunner
+from ui.tree_sync import TreeSync
 
 
 class BooksTab:
-    def __init__(self, parent):
+    def __init__(self, parent, tasks=None):
         self.frame = ttk.Frame(parent, padding="10")
+        self.tasks = tasks or TaskRunner(self.frame)
+        self.pager = KeysetPager(books_dao.search_books, key=lambda book: (book['title'], book['ISBN']))
         self.setup_ui()
-        self.load_books()
     
     def setup_ui(self):
         """Setup the UI components"""
@@ -42,6 +47,10 @@ class BooksTab:
         self.year_var = tk.StringVar()
         ttk.Entry(search_frame, textvariable=self.year_var, width=10).grid(row=1, column=3, sticky=tk.W, padx=(0, 10), pady=(5, 0))
         
+        ttk.Label(search_frame, text="Keywords:").grid(row=2, column=0, sticky=tk.W, padx=(0, 5), pady=(5, 0))
+        self.keywords_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.keywords_var, width=50).grid(row=2, column=1, columnspan=3, sticky=(tk.W, tk.E), padx=(0, 10), pady=(5, 0))
+        
         # Search buttons
         ttk.Button(search_frame, text="Search", command=self.search_books).grid(row=1, column=4, padx=5, pady=(5, 0))
         ttk.Button(search_frame, text="Clear", command=self.clear_search).grid(row=1, column=5, padx=5, pady=(5, 0))
@@ -86,6 +95,7 @@ class BooksTab:
         
         # Grid layout
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.rows = TreeSync(self.tree, key=lambda book: book.get('ISBN'), values=self.book_values)
         vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
         hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
@@ -102,35 +112,40 @@ class BooksTab:
         ttk.Button(buttons_frame, text="View Details", command=self.view_details).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Refresh", command=self.refresh).pack(side=tk.RIGHT, padx=5)
         
+        self.busy = BusyIndicator(buttons_frame)
+        self.pager_controls = PagerControls(buttons_frame, self.pager, self.show_books,
+                                            tasks=self.tasks, busy=self.busy)
+        self.pager_controls.frame.pack(side=tk.RIGHT, padx=20)
+        self.busy.frame.pack(side=tk.RIGHT, padx=5)
+        
         # Bind double-click to view details
         self.tree.bind("<Double-1>", lambda e: self.view_details())
 
-    def load_books(self, books=None):
-        """Load books into the table"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        if books is None:
-            books = books_dao.search_books(limit=500)
-        
-        if books:
-            for book in books:
-                # Handle avg_rating - it could be None or a number
-                avg_rating = book.get('avg_rating')
-                if avg_rating is not None:
-                    rating_display = f"{float(avg_rating):.2f}"
-                else:
-                    rating_display = "N/A"
-                
-                self.tree.insert("", tk.END, values=(
-                    book.get('ISBN', ''),
-                    book.get('title', ''),
-                    book.get('authors', 'Unknown'),
-                    book.get('publisher_name', 'Unknown'),
-                    book.get('year_of_publication', ''),
-                    rating_display
-                ))
+    def load_books(self, on_loaded=None):
+        """Load the first page of books for the current search (in the background)"""
+        self.pager_controls.load('first', on_loaded)
+    
+    def show_books(self, books):
+        """Show a page of books in the table (only changed rows are touched)"""
+        self.rows.update(books)
+    
+    def book_values(self, book):
+        """Table values for one book"""
+        # Handle avg_rating - it could be None or a number
+        avg_rating = book.get('avg_rating')
+        if avg_rating is not None:
+            rating_display = f"{float(avg_rating):.2f}"
+        else:
+            rating_display = "N/A"
+        
+        return (
+            book.get('ISBN', ''),
+            book.get('title', ''),
+            book.get('authors', 'Unknown'),
+            book.get('publisher_name', 'Unknown'),
+            book.get('year_of_publication', ''),
+            rating_display
+        )
     
     def search_books(self):
         """Search books based on filters"""
@@ -139,6 +154,7 @@ class BooksTab:
         isbn = self.isbn_var.get().strip() or None
         publisher = self.publisher_var.get().strip() or None
         year = self.year_var.get().strip() or None
+        keywords = self.keywords_var.get().strip() or None
         
         if year:
             try:
@@ -147,17 +163,24 @@ class BooksTab:
                 messagebox.showerror("Error", "Year must be a number")
                 return
         
-        books = books_dao.search_books(
+        # Keyword results are ranked by relevance, so they come as a single page
+        self.pager.set_fetch(partial(
+            books_dao.search_books,
             title=title,
             author=author,
             isbn=isbn,
             publisher=publisher,
             year=year,
-            limit=500
-        )
+            keywords=keywords
+        ), pageable=not keywords)
         
-        self.load_books(books)
-        messagebox.showinfo("Search Results", f"Found {len(books) if books else 0} books")
+        # A new search replaces one that is still running
+        self.load_books(on_loaded=self.report_results)
+    
+    def report_results(self, books):
+        """Tell how many books the search found"""
+        more = " (more on the next pages)" if self.pager.has_next else ""
+        messagebox.showinfo("Search Results", f"Found {len(books)} books{more}")
     
     def clear_search(self):
         """Clear search fields and reload all books"""
@@ -166,6 +189,8 @@ class BooksTab:
         self.isbn_var.set("")
         self.publisher_var.set("")
         self.year_var.set("")
+        self.keywords_var.set("")
+        self.pager.set_fetch(books_dao.search_books)
         self.load_books()
     
     def add_book(self):
@@ -202,11 +227,10 @@ class BooksTab:
         title = item['values'][1]
         
         if messagebox.askyesno("Confirm Delete", f"Delete book '{title}'?\n\nThis will also delete all ratings and club references."):
-            if books_dao.delete_book(isbn):
-                self.refresh()
-                messagebox.showinfo("Success", "Book deleted successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to delete book")
+            self.tasks.run_action(books_dao.delete_book, isbn, busy=self.busy,
+                                  then=lambda _: self.refresh(),
+                                  success="Book deleted successfully!",
+                                  failure="Failed to delete book")
     
     def view_details(self):
         """View detailed book information"""
@@ -221,5 +245,5 @@ class BooksTab:
         BookDetailsDialog(self.frame, isbn)
     
     def refresh(self):
-        """Refresh the books list"""
-        self.clear_search()
\ No newline at end of file
+        """Reload the page of books shown, keeping the current search"""
+        self.pager_controls.reload()
\ No newline at end of file
@@ -8,14 +8,16 @@ from tkinter import ttk, messagebox
 from db import clubs_dao
 from ui.dialogs import (AddClubDialog, EditClubDialog, ClubDetailsDialog,
                         AddClubMemberDialog, AddToQueueDialog, AddDiscussionDialog)
+from ui.tasks import BusyIndicator, TaskRunner
+from ui.tree_sync import TreeSync
 
 
 class ClubsTab:
-    def __init__(self, parent):
+    def __init__(self, parent, tasks=None):
         self.frame = ttk.Frame(parent, padding="10")
+        self.tasks = tasks or TaskRunner(self.frame)
         self.selected_club_id = None
         self.setup_ui()
-        self.load_clubs()
     
     def setup_ui(self):
         """Setup the UI components"""
@@ -56,6 +58,8 @@ class ClubsTab:
         self.clubs_tree.column("Public", width=60)
         
         self.clubs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.clubs_rows = TreeSync(self.clubs_tree, key=lambda club: club.get('club_id'),
+                                   values=self.club_values)
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Clubs buttons
@@ -75,6 +79,9 @@ class ClubsTab:
                                        font=('Helvetica', 12, 'bold'))
         self.details_label.pack(pady=(0, 10))
         
+        self.busy = BusyIndicator(right_frame)
+        self.busy.frame.pack(anchor=tk.E)
+        
         # Create notebook for different club sections
         self.club_notebook = ttk.Notebook(right_frame)
         self.club_notebook.pack(fill=tk.BOTH, expand=True)
@@ -129,6 +136,8 @@ class ClubsTab:
         self.members_tree.column("Location", width=200)
         
         self.members_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.members_rows = TreeSync(self.members_tree, key=lambda member: member.get('user_id'),
+                                     values=self.member_values)
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Buttons
@@ -167,6 +176,9 @@ class ClubsTab:
         self.queue_tree.column("Avg Rating", width=100)
         
         self.queue_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # queue_id is kept as the item's tag
+        self.queue_rows = TreeSync(self.queue_tree, key=lambda item: item.get('queue_id'),
+                                   values=self.queue_item_values, tags=lambda item: (item.get('queue_id'),))
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Buttons
@@ -206,6 +218,8 @@ class ClubsTab:
         self.history_tree.column("Avg Rating", width=100)
         
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.history_rows = TreeSync(self.history_tree, key=lambda item: item.get('history_id'),
+                                     values=self.history_item_values)
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Buttons
@@ -244,6 +258,8 @@ class ClubsTab:
         self.discussions_tree.column("Date", width=150)
         
         self.discussions_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.discussions_rows = TreeSync(self.discussions_tree, key=self.discussion_key,
+                                         values=self.discussion_values, tags=self.discussion_key)
         vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
         hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
@@ -263,21 +279,13 @@ class ClubsTab:
         ttk.Button(buttons, text="Refresh", command=self.load_discussions).pack(side=tk.LEFT, padx=5)
     
     def load_clubs(self):
-        """Load clubs list"""
-        # Clear existing items
-        for item in self.clubs_tree.get_children():
-            self.clubs_tree.delete(item)
-        
-        clubs = clubs_dao.get_all_clubs(limit=100)
-        
-        if clubs:
-            for club in clubs:
-                self.clubs_tree.insert("", tk.END, values=(
-                    club.get('club_id', ''),
-                    club.get('name', ''),
-                    club.get('member_count', 0),
-                    'Yes' if club.get('is_public') else 'No'
-                ))
+        """Load clubs list (in the background)"""
+        self.tasks.submit(clubs_dao.get_all_clubs, limit=100, key='clubs', busy=self.busy,
+                          on_done=self.show_clubs)
+    
+    def show_clubs(self, clubs):
+        """Show the clubs list (only changed rows are touched)"""
+        self.clubs_rows.update(clubs)
     
     def on_club_selected(self, event):
         """Handle club selection"""
@@ -290,105 +298,131 @@ class ClubsTab:
         club_name = item['values'][1]
         
         self.details_label.config(text=f"Club: {club_name}")
-        
-        # Load club details
-        self.load_members()
-        self.load_queue()
-        self.load_history()
-        self.load_discussions()
+        self.load_snapshot()
     
-    def load_members(self):
-        """Load club members"""
+    def load_snapshot(self):
+        """Load every club section from one snapshot (one connection, fixed query count)"""
         if not self.selected_club_id:
             return
         
-        # Clear existing items
-        for item in self.members_tree.get_children():
-            self.members_tree.delete(item)
+        # Selecting another club replaces a snapshot that is still loading
+        self.tasks.submit(clubs_dao.get_club_snapshot, self.selected_club_id, discussion_limit=50,
+                          key='club-details', busy=self.busy, on_done=self.show_snapshot)
+    
+    def show_snapshot(self, snapshot):
+        """Render all club sections from a snapshot"""
+        if snapshot is None:
+            return
         
-        members = clubs_dao.get_club_members(self.selected_club_id)
+        club = snapshot['club']
+        if club:
+            text = f"Club: {club.get('name', '')} ({club.get('member_count', 0)} members)"
+            current = snapshot['current_book']
+            if current:
+                text += f" - reading '{current.get('title', '')}'"
+            self.details_label.config(text=text)
+        
+        self.render_members(snapshot['members'])
+        self.render_queue(snapshot['queue'])
+        self.render_history(snapshot['history'])
+        self.render_discussions(snapshot['discussions'])
+    
+    def load_section(self, name, fetch, render, **kwargs):
+        """Reload one section of the selected club in the background"""
+        club_id = self.selected_club_id
+        if not club_id:
+            return
         
-        if members:
-            for member in members:
-                self.members_tree.insert("", tk.END, values=(
-                    member.get('user_id', ''),
-                    member.get('username', ''),
-                    member.get('role', ''),
-                    member.get('location', '')
-                ))
+        def done(rows):
+            # Ignore results for a club that is no longer selected
+            if club_id == self.selected_club_id:
+                render(rows)
+        self.tasks.submit(fetch, club_id, key=f'club-{name}', busy=self.busy, on_done=done, **kwargs)
+    
+    def load_members(self):
+        """Load club members"""
+        self.load_section('members', clubs_dao.get_club_members, self.render_members)
     
     def load_queue(self):
         """Load reading queue"""
-        if not self.selected_club_id:
-            return
-        
-        # Clear existing items
-        for item in self.queue_tree.get_children():
-            self.queue_tree.delete(item)
-        
-        queue = clubs_dao.get_club_reading_queue(self.selected_club_id)
-        
-        if queue:
-            for item in queue:
-                # Store queue_id as a tag or in values
-                item_id = self.queue_tree.insert("", tk.END, values=(
-                    item.get('queue_position', ''),
-                    item.get('title', ''),
-                    item.get('authors', 'Unknown'),
-                    item.get('added_by_username', 'Unknown'),
-                    f"{item.get('avg_rating', 0):.2f}" if item.get('avg_rating') else 'N/A'
-                ))
-                # Store queue_id as tag
-                self.queue_tree.item(item_id, tags=(item.get('queue_id'),))
-
+        self.load_section('queue', clubs_dao.get_club_reading_queue, self.render_queue)
+    
     def load_history(self):
         """Load reading history"""
-        if not self.selected_club_id:
-            return
-        
-        # Clear existing items
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        history = clubs_dao.get_club_reading_history(self.selected_club_id)
-        
-        if history:
-            for item in history:
-                self.history_tree.insert("", tk.END, values=(
-                    item.get('title', ''),
-                    item.get('authors', 'Unknown'),
-                    item.get('start_date', ''),
-                    item.get('end_date', 'Current'),
-                    item.get('status', ''),
-                    f"{item.get('avg_rating', 0):.2f}" if item.get('avg_rating') else 'N/A'
-                ))
+        self.load_section('history', clubs_dao.get_club_reading_history, self.render_history)
     
     def load_discussions(self):
-        """Load discussions with IDs stored in tags"""
-        if not self.selected_club_id:
-            return
-        
-        # Clear existing items
-        for item in self.discussions_tree.get_children():
-            self.discussions_tree.delete(item)
-        
-        discussions = clubs_dao.get_club_recent_discussions(self.selected_club_id, limit=50)
-        
-        if discussions:
-            for disc in discussions:
-                disc_type = disc.get('discussion_type', '').lower()
-                disc_id = disc.get('discussion_id')
-                
-                # Insert row
-                item_id = self.discussions_tree.insert("", tk.END, values=(
-                    disc_type.title(),
-                    disc.get('title', ''),
-                    disc.get('username', ''),
-                    disc.get('created_date', '')
-                ))
-                
-                # Store discussion_id and type as tags (type, id)
-                self.discussions_tree.item(item_id, tags=(disc_type, str(disc_id)))
+        """Load discussions"""
+        self.load_section('discussions', clubs_dao.get_club_recent_discussions,
+                          self.render_discussions, limit=50)
+    
+    def render_members(self, members):
+        """Show club members"""
+        self.members_rows.update(members)
+    
+    def render_queue(self, queue):
+        """Show reading queue"""
+        self.queue_rows.update(queue)
+
+    def render_history(self, history):
+        """Show reading history"""
+        self.history_rows.update(history)
+    
+    def render_discussions(self, discussions):
+        """Show discussions with IDs stored in tags"""
+        self.discussions_rows.update(discussions)
+    
+    def club_values(self, club):
+        """Table values for one club"""
+        return (
+            club.get('club_id', ''),
+            club.get('name', ''),
+            club.get('member_count', 0),
+            'Yes' if club.get('is_public') else 'No'
+        )
+    
+    def member_values(self, member):
+        """Table values for one club member"""
+        return (
+            member.get('user_id', ''),
+            member.get('username', ''),
+            member.get('role', ''),
+            member.get('location', '')
+        )
+    
+    def queue_item_values(self, item):
+        """Table values for one reading queue entry"""
+        return (
+            item.get('queue_position', ''),
+            item.get('title', ''),
+            item.get('authors', 'Unknown'),
+            item.get('added_by_username', 'Unknown'),
+            f"{item.get('avg_rating', 0):.2f}" if item.get('avg_rating') else 'N/A'
+        )
+    
+    def history_item_values(self, item):
+        """Table values for one reading history entry"""
+        return (
+            item.get('title', ''),
+            item.get('authors', 'Unknown'),
+            item.get('start_date', ''),
+            item.get('end_date', 'Current'),
+            item.get('status', ''),
+            f"{item.get('avg_rating', 0):.2f}" if item.get('avg_rating') else 'N/A'
+        )
+    
+    def discussion_key(self, disc):
+        """(type, id) - general and chapter discussions are numbered separately"""
+        return (disc.get('discussion_type', '').lower(), str(disc.get('discussion_id')))
+    
+    def discussion_values(self, disc):
+        """Table values for one discussion"""
+        return (
+            disc.get('discussion_type', '').title(),
+            disc.get('title', ''),
+            disc.get('username', ''),
+            disc.get('created_date', '')
+        )
     
     def create_club(self):
         """Create new club"""
@@ -425,13 +459,15 @@ class ClubsTab:
         
         if messagebox.askyesno("Confirm Delete", 
                                f"Delete club '{club_name}'?\n\nThis will also delete all members, queue, history, and discussions."):
-            if clubs_dao.delete_club(club_id):
-                self.selected_club_id = None
-                self.details_label.config(text="Select a club to view details")
+            def deleted(_):
+                if self.selected_club_id == club_id:
+                    self.selected_club_id = None
+                    self.details_label.config(text="Select a club to view details")
                 self.load_clubs()
-                messagebox.showinfo("Success", "Club deleted successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to delete club")
+            
+            self.tasks.run_action(clubs_dao.delete_club, club_id, busy=self.busy, then=deleted,
+                                  success="Club deleted successfully!",
+                                  failure="Failed to delete club")
     
     def add_member(self):
         """Add member to club"""
@@ -460,11 +496,10 @@ class ClubsTab:
         username = item['values'][1]
         
         if messagebox.askyesno("Confirm Remove", f"Remove member '{username}' from club?"):
-            if clubs_dao.remove_club_member(self.selected_club_id, user_id):
-                self.load_members()
-                messagebox.showinfo("Success", "Member removed successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to remove member")
+            self.tasks.run_action(clubs_dao.remove_club_member, self.selected_club_id, user_id,
+                                  busy=self.busy, then=lambda _: self.load_members(),
+                                  success="Member removed successfully!",
+                                  failure="Failed to remove member")
     
     def change_role(self):
         """Change member role"""
@@ -497,14 +532,16 @@ class ClubsTab:
         ttk.Combobox(dialog, textvariable=role_var, values=['member', 'moderator', 'admin'], 
                     state='readonly').pack(pady=5)
         
+        def updated(_):
+            self.load_members()
+            dialog.destroy()
+        
         def save():
             new_role = role_var.get()
-            if clubs_dao.update_member_role(self.selected_club_id, user_id, new_role):
-                self.load_members()
-                dialog.destroy()
-                messagebox.showinfo("Success", "Role updated successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to update role")
+            self.tasks.run_action(clubs_dao.update_member_role, self.selected_club_id, user_id, new_role,
+                                  busy=self.busy, then=updated,
+                                  success="Role updated successfully!",
+                                  failure="Failed to update role")
         
         ttk.Button(dialog, text="Save", command=save).pack(side=tk.LEFT, padx=20, pady=10)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=20, pady=10)
@@ -540,11 +577,10 @@ class ClubsTab:
             return
         
         if messagebox.askyesno("Confirm Remove", f"Remove '{title}' from reading queue?"):
-            if clubs_dao.remove_from_reading_queue(queue_id):
-                self.load_queue()
-                messagebox.showinfo("Success", "Book removed from queue!")
-            else:
-                messagebox.showerror("Error", "Failed to remove book from queue")
+            self.tasks.run_action(clubs_dao.remove_from_reading_queue, queue_id,
+                                  busy=self.busy, then=lambda _: self.load_queue(),
+                                  success="Book removed from queue!",
+                                  failure="Failed to remove book from queue")
 
     def start_reading(self):
         """Start reading first book in queue"""
@@ -552,25 +588,28 @@ class ClubsTab:
             messagebox.showwarning("Warning", "Please select a club first")
             return
         
-        # Get first book from queue
-        queue = clubs_dao.get_club_reading_queue(self.selected_club_id)
-        if not queue:
-            messagebox.showinfo("Info", "Queue is empty")
-            return
+        club_id = self.selected_club_id
         
-        first_book = queue[0]
-        isbn = first_book.get('ISBN')
-        title = first_book.get('title')
+        def start(book):
+            if not clubs_dao.set_current_book(club_id, book.get('ISBN')):
+                return False
+            # Remove from queue
+            clubs_dao.remove_from_reading_queue(book.get('queue_id'))
+            return True
         
-        if messagebox.askyesno("Confirm", f"Start reading '{title}'?"):
-            if clubs_dao.set_current_book(self.selected_club_id, isbn):
-                # Remove from queue
-                clubs_dao.remove_from_reading_queue(first_book.get('queue_id'))
-                self.load_queue()
-                self.load_history()
-                messagebox.showinfo("Success", "Started reading book!")
-            else:
-                messagebox.showerror("Error", "Failed to start reading")
+        def confirm(queue):
+            if not queue:
+                messagebox.showinfo("Info", "Queue is empty")
+                return
+            first_book = queue[0]
+            if messagebox.askyesno("Confirm", f"Start reading '{first_book.get('title')}'?"):
+                self.tasks.run_action(start, first_book, busy=self.busy,
+                                      then=lambda _: self.load_snapshot(),
+                                      success="Started reading book!",
+                                      failure="Failed to start reading")
+        
+        # Get first book from queue
+        self.tasks.submit(clubs_dao.get_club_reading_queue, club_id, busy=self.busy, on_done=confirm)
     
     def complete_book(self):
         """Complete current book"""
@@ -579,11 +618,10 @@ class ClubsTab:
             return
         
         if messagebox.askyesno("Confirm", "Mark current book as completed?"):
-            if clubs_dao.complete_current_book(self.selected_club_id):
-                self.load_history()
-                messagebox.showinfo("Success", "Book marked as completed!")
-            else:
-                messagebox.showerror("Error", "Failed to complete book")
+            self.tasks.run_action(clubs_dao.complete_current_book, self.selected_club_id,
+                                  busy=self.busy, then=lambda _: self.load_snapshot(),
+                                  success="Book marked as completed!",
+                                  failure="Failed to complete book")
     
     def add_discussion(self):
         """Add new discussion"""
@@ -625,23 +663,20 @@ class ClubsTab:
             return
         
         # Delete based on type
-        success = False
-        try:
-            if discussion_type == 'general':
-                success = clubs_dao.delete_general_discussion(discussion_id)
-            elif discussion_type == 'chapter':
-                success = clubs_dao.delete_chapter_discussion(discussion_id)
-            else:
-                messagebox.showerror("Error", f"Unknown discussion type: {discussion_type}")
-                return
-            
-            if success:
-                self.load_discussions()
-                messagebox.showinfo("Success", "Discussion deleted successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to delete discussion")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error deleting discussion: {str(e)}")
+        if discussion_type == 'general':
+            delete = clubs_dao.delete_general_discussion
+        elif discussion_type == 'chapter':
+            delete = clubs_dao.delete_chapter_discussion
+        else:
+            messagebox.showerror("Error", f"Unknown discussion type: {discussion_type}")
+            return
+        
+        self.tasks.run_action(delete, discussion_id, busy=self.busy,
+                              then=lambda _: self.load_discussions(),
+                              on_error=lambda e: messagebox.showerror(
+                                  "Error", f"Error deleting discussion: {str(e)}"),
+                              success="Discussion deleted successfully!",
+                              failure="Failed to delete discussion")
 
     def view_discussion(self):
         """View discussion details with comments"""
@@ -667,7 +702,8 @@ class ClubsTab:
         
         # Open discussion viewer dialog
         from ui.dialogs import ViewDiscussionDialog
-        ViewDiscussionDialog(self.frame, self.selected_club_id, discussion_type, discussion_id)
+        ViewDiscussionDialog(self.frame, self.selected_club_id, discussion_type, discussion_id,
+                             tasks=self.tasks)
     
     def refresh(self):
         """Refresh clubs list"""
@@ -1202,10 +1202,11 @@ class AddDiscussionDialog:
 # ==================== DISCUSSION VIEWER DIALOG ====================
 
 class ViewDiscussionDialog:
-    def __init__(self, parent, club_id, discussion_type, discussion_id):
+    def __init__(self, parent, club_id, discussion_type, discussion_id, tasks=None):
         self.club_id = club_id
         self.discussion_type = discussion_type  # 'general' or 'chapter'
         self.discussion_id = discussion_id
+        self.tasks = tasks  # ui.tasks.TaskRunner; comments load in the background when given
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("View Discussion")
@@ -1350,12 +1351,15 @@ class ViewDiscussionDialog:
     
     def load_comments(self):
         """Load and display all comments"""
+        if self.tasks is None:
+            self.show_comments(self.fetch_comments())
+        else:
+            self.tasks.submit(self.fetch_comments, key=self, on_done=self.show_comments)
+    
+    def fetch_comments(self):
+        """Query the discussion's comments (no widget access, may run on a worker thread)"""
         from db.connection import db
         
-        # Clear existing comments
-        for widget in self.comments_inner_frame.winfo_children():
-            widget.destroy()
-        
         # Load comments based on type
         if self.discussion_type == 'general':
             query = """
@@ -1385,7 +1389,16 @@ class ViewDiscussionDialog:
                 ORDER BY c.created_date ASC
             """
         
-        comments = db.execute_query(query, (self.discussion_id,))
+        return db.execute_query(query, (self.discussion_id,))
+    
+    def show_comments(self, comments):
+        """Display the loaded comments"""
+        if not self.dialog.winfo_exists():
+            return
+        
+        # Clear existing comments
+        for widget in self.comments_inner_frame.winfo_children():
+            widget.destroy()
         
         if not comments:
             ttk.Label(self.comments_inner_frame, 
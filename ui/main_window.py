@@ -10,6 +10,17 @@ from ui.users_tab import UsersTab
 from ui.ratings_tab import RatingsTab
 from ui.clubs_tab import ClubsTab
 from ui.analytics_tab import AnalyticsTab
+from ui.tasks import TaskRunner
+
+
+# (attribute, tab class, notebook label) in notebook order
+TABS = [
+    ('books_tab', BooksTab, " Books"),
+    ('users_tab', UsersTab, " Users"),
+    ('ratings_tab', RatingsTab, " Ratings"),
+    ('clubs_tab', ClubsTab, " Clubs"),
+    ('analytics_tab', AnalyticsTab, " Analytics"),
+]
 
 
 class MainWindow:
@@ -44,28 +55,53 @@ class MainWindow:
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # Create tabs
-        self.books_tab = BooksTab(self.notebook)
-        self.users_tab = UsersTab(self.notebook)
-        self.ratings_tab = RatingsTab(self.notebook)
-        self.clubs_tab = ClubsTab(self.notebook)
-        self.analytics_tab = AnalyticsTab(self.notebook)
-        
-        # Add tabs to notebook
-        self.notebook.add(self.books_tab.frame, text=" Books")
-        self.notebook.add(self.users_tab.frame, text=" Users")
-        self.notebook.add(self.ratings_tab.frame, text=" Ratings")
-        self.notebook.add(self.clubs_tab.frame, text=" Clubs")
-        self.notebook.add(self.analytics_tab.frame, text=" Analytics")
+        # Database calls run on a shared worker pool so the window never blocks
+        self.tasks = TaskRunner(root)
+        root.protocol("WM_DELETE_WINDOW", self.close)
         
+        # Tabs are built (and load their data) the first time they are selected,
+        # so the window appears before any query runs; empty frames hold their place
+        self.placeholders = []
+        for attribute, tab_class, label in TABS:
+            setattr(self, attribute, None)
+            placeholder = ttk.Frame(self.notebook)
+            self.notebook.add(placeholder, text=label)
+            self.placeholders.append(placeholder)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+    
+    def on_tab_changed(self, event=None):
+        """Build the selected tab on first activation"""
+        self.build_tab(self.notebook.index('current'))
+    
+    def build_tab(self, index):
+        """Create tab number index and start its initial load (once)"""
+        attribute, tab_class, label = TABS[index]
+        tab = getattr(self, attribute)
+        if tab is None:
+            tab = tab_class(self.placeholders[index], self.tasks)
+            tab.frame.pack(fill=tk.BOTH, expand=True)
+            setattr(self, attribute, tab)
+            if hasattr(tab, 'refresh'):
+                tab.refresh()
+        return tab
+    
+    def built_tabs(self):
+        """Tabs that have been built so far"""
+        tabs = (getattr(self, attribute) for attribute, _, _ in TABS)
+        return [tab for tab in tabs if tab is not None]
+    
+    def close(self):
+        """Drop outstanding database tasks and close the window"""
+        self.tasks.shutdown()
+        self.root.destroy()
     
     def refresh_all(self):
         """Refresh all tabs"""
         try:
-            self.books_tab.refresh()
-            self.users_tab.refresh()
-            self.ratings_tab.refresh()
-            self.clubs_tab.refresh()
+            # Tabs not built yet load fresh data when first opened
+            for tab in self.built_tabs():
+                if hasattr(tab, 'refresh'):
+                    tab.refresh()
             messagebox.showinfo("Success", "All data refreshed successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to refresh data:\n{str(e)}")
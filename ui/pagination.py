@@ -0,0 +1,206 @@
+"""
+Keyset pagination
+Page state for DAO list functions that take after/before cursors, plus Previous/Next controls
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from config import PAGE_SIZE
+
+
+class KeysetPager:
+    """
+    Tracks the current page of a keyset-paged DAO query
+
+    fetch is called as fetch(limit=..., after=..., before=...) and must
+    return rows in display order; reloading the current page calls it with
+    at=... (the page's first key, inclusive). One extra row is requested to
+    learn whether another page exists in that direction.
+
+    Args:
+        fetch: DAO list function (usually a functools.partial with the filters bound)
+        key: Function returning the cursor value of a row
+        page_size: Rows per page
+    """
+
+    def __init__(self, fetch, key, page_size=PAGE_SIZE):
+        self.fetch = fetch
+        self.key = key
+        self.page_size = page_size
+        self.pageable = True
+        self.page = 0
+        self.has_next = False
+        self.has_previous = False
+        self._first_key = None
+        self._last_key = None
+
+    def set_fetch(self, fetch, pageable=True):
+        """Switch to a new query (e.g. new search filters); call first() next"""
+        self.fetch = fetch
+        self.pageable = pageable
+
+    def request(self, direction):
+        """
+        Fetch call for the page in direction ('first', 'next', 'previous',
+        or 'current' to reload the page shown, e.g. after an edit)
+
+        The returned function only reads the database, so it may run on a
+        worker thread; pass its result to accept() on the Tk thread.
+
+        Returns:
+            Zero-argument function returning (direction, rows), or None when
+            there is no page in that direction
+        """
+        if direction == 'next' and not self.has_next:
+            return None
+        if direction == 'previous' and not self.has_previous:
+            return None
+
+        fetch, pageable, size = self.fetch, self.pageable, self.page_size
+        first_key, last_key = self._first_key, self._last_key
+        # The first page is reloaded from the top, so rows added ahead of it show up
+        reload_first = not pageable or not self.has_previous or first_key is None
+
+        def load_first():
+            if not pageable:
+                return fetch(limit=size) or []
+            return fetch(limit=size + 1) or []
+
+        def load():
+            if direction == 'first' or (direction == 'current' and reload_first):
+                return 'first', load_first()
+            if direction == 'next':
+                return 'next', fetch(limit=size + 1, after=last_key)
+            if direction == 'current':
+                rows = fetch(limit=size + 1, at=first_key) or []
+                if rows:
+                    return 'current', rows
+                # Everything from the first row on is gone: step back a page
+            rows = fetch(limit=size + 1, before=first_key)
+            if not rows:
+                return 'first', load_first()
+            return 'previous', rows
+        return load
+
+    def accept(self, result):
+        """
+        Make a fetched page current
+
+        Returns:
+            The rows to display, or None if the page turned out to be empty
+        """
+        direction, rows = result
+        if direction == 'first':
+            self.page = 1
+            self.has_previous = False
+            self.has_next = self.pageable and len(rows) > self.page_size
+            return self._keep(rows[:self.page_size])
+        if direction == 'current':
+            self.has_next = len(rows) > self.page_size
+            return self._keep(rows[:self.page_size])
+        if direction == 'next':
+            if not rows:
+                self.has_next = False
+                return None
+            self.page += 1
+            self.has_previous = True
+            self.has_next = len(rows) > self.page_size
+            return self._keep(rows[:self.page_size])
+        self.page = max(1, self.page - 1)
+        self.has_next = True
+        self.has_previous = len(rows) > self.page_size
+        if not self.has_previous:
+            # Rows may have been added or removed since - resync the page number
+            self.page = 1
+        return self._keep(rows[-self.page_size:])
+
+    def first(self):
+        """Load the first page"""
+        return self.accept(self.request('first')())
+
+    def next(self):
+        """Load the page after the current one"""
+        load = self.request('next')
+        return self.accept(load()) if load else None
+
+    def reload(self):
+        """Load the current page again"""
+        return self.accept(self.request('current')())
+
+    def previous(self):
+        """Load the page before the current one"""
+        load = self.request('previous')
+        return self.accept(load()) if load else None
+
+    def _keep(self, rows):
+        if rows:
+            self._first_key = self.key(rows[0])
+            self._last_key = self.key(rows[-1])
+        return rows
+
+
+class PagerControls:
+    """Previous / page number / Next buttons bound to a KeysetPager"""
+
+    def __init__(self, parent, pager, on_page, tasks=None, busy=None):
+        """
+        Args:
+            parent: Parent widget
+            pager: KeysetPager to drive
+            on_page: Callback(rows) that displays a newly loaded page
+            tasks: TaskRunner to fetch pages in the background (None = on the Tk thread)
+            busy: BusyIndicator shown while a page loads
+        """
+        self.pager = pager
+        self.on_page = on_page
+        self.tasks = tasks
+        self.busy = busy
+
+        self.frame = ttk.Frame(parent)
+        self.prev_button = ttk.Button(self.frame, text="◀ Previous", command=self.previous)
+        self.prev_button.pack(side=tk.LEFT, padx=2)
+        self.page_label = ttk.Label(self.frame, text="Page 1", width=10, anchor=tk.CENTER)
+        self.page_label.pack(side=tk.LEFT, padx=5)
+        self.next_button = ttk.Button(self.frame, text="Next ▶", command=self.next)
+        self.next_button.pack(side=tk.LEFT, padx=2)
+        self.update()
+
+    def load(self, direction, on_loaded=None):
+        """
+        Load a page and show it; a newer load of the same pager replaces an unfinished one
+
+        Args:
+            direction: 'first', 'next', 'previous' or 'current'
+            on_loaded: Callback(rows) after the page is shown
+        """
+        load = self.pager.request(direction)
+        if load is None:
+            return
+        if self.tasks is None:
+            self._show(self.pager.accept(load()), on_loaded)
+        else:
+            self.tasks.submit(load, key=self, busy=self.busy,
+                              on_done=lambda result: self._show(self.pager.accept(result), on_loaded))
+
+    def _show(self, rows, on_loaded):
+        if rows is not None:
+            self.on_page(rows)
+        self.update()
+        if on_loaded is not None:
+            on_loaded(rows or [])
+
+    def reload(self, on_loaded=None):
+        """Load the page shown again with the current query (after an add, edit or delete)"""
+        self.load('current', on_loaded)
+
+    def previous(self):
+        self.load('previous')
+
+    def next(self):
+        self.load('next')
+
+    def update(self):
+        """Refresh button states and the page number"""
+        self.page_label.config(text=f"Page {self.pager.page or 1}")
+        self.prev_button.state(['!disabled'] if self.pager.has_previous else ['disabled'])
+        self.next_button.state(['!disabled'] if self.pager.has_next else ['disabled'])
@@ -4,16 +4,21 @@ Handles rating CRUD operations and filtering
 """
 
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, messagebox
 from db import ratings_dao, users_dao, books_dao
 from ui.dialogs import AddRatingDialog, EditRatingDialog
+from ui.pagination import KeysetPager, PagerControls
+from ui.tasks import BusyIndicator, TaskRunner
+from ui.tree_sync import TreeSync
 
 
 class RatingsTab:
-    def __init__(self, parent):
+    def __init__(self, parent, tasks=None):
         self.frame = ttk.Frame(parent, padding="10")
+        self.tasks = tasks or TaskRunner(self.frame)
+        self.pager = KeysetPager(ratings_dao.get_ratings, key=lambda rating: rating['rating_id'])
         self.setup_ui()
-        self.load_ratings()
     
     def setup_ui(self):
         """Setup the UI components"""
@@ -79,6 +84,7 @@ class RatingsTab:
         
         # Grid layout
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.rows = TreeSync(self.tree, key=lambda rating: rating.get('rating_id'), values=self.rating_values)
         vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
         hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
@@ -93,26 +99,31 @@ class RatingsTab:
         ttk.Button(buttons_frame, text="Edit Rating", command=self.edit_rating).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Delete Rating", command=self.delete_rating).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Refresh", command=self.refresh).pack(side=tk.RIGHT, padx=5)
+        
+        self.busy = BusyIndicator(buttons_frame)
+        self.pager_controls = PagerControls(buttons_frame, self.pager, self.show_ratings,
+                                            tasks=self.tasks, busy=self.busy)
+        self.pager_controls.frame.pack(side=tk.RIGHT, padx=20)
+        self.busy.frame.pack(side=tk.RIGHT, padx=5)
     
-    def load_ratings(self, ratings=None):
-        """Load ratings into the table"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        if ratings is None:
-            ratings = ratings_dao.get_ratings(limit=500)
-        
-        if ratings:
-            for rating in ratings:
-                self.tree.insert("", tk.END, values=(
-                    rating.get('rating_id', ''),
-                    rating.get('user_id', ''),
-                    rating.get('username', ''),
-                    rating.get('ISBN', ''),
-                    rating.get('book_title', ''),
-                    rating.get('rating', '')
-                ))
+    def load_ratings(self, on_loaded=None):
+        """Load the first page of ratings for the current filter (in the background)"""
+        self.pager_controls.load('first', on_loaded)
+    
+    def show_ratings(self, ratings):
+        """Show a page of ratings in the table (only changed rows are touched)"""
+        self.rows.update(ratings)
+    
+    def rating_values(self, rating):
+        """Table values for one rating"""
+        return (
+            rating.get('rating_id', ''),
+            rating.get('user_id', ''),
+            rating.get('username', ''),
+            rating.get('ISBN', ''),
+            rating.get('book_title', ''),
+            rating.get('rating', '')
+        )
     
     def filter_ratings(self):
         """Filter ratings based on criteria"""
@@ -144,21 +155,27 @@ class RatingsTab:
         else:
             min_rating = None
         
-        ratings = ratings_dao.get_ratings(
+        self.pager.set_fetch(partial(
+            ratings_dao.get_ratings,
             user_id=user_id,
             isbn=isbn,
-            min_rating=min_rating,
-            limit=500
-        )
+            min_rating=min_rating
+        ))
         
-        self.load_ratings(ratings)
-        messagebox.showinfo("Filter Results", f"Found {len(ratings) if ratings else 0} ratings")
+        # A new filter replaces one that is still running
+        self.load_ratings(on_loaded=self.report_results)
+    
+    def report_results(self, ratings):
+        """Tell how many ratings the filter found"""
+        more = " (more on the next pages)" if self.pager.has_next else ""
+        messagebox.showinfo("Filter Results", f"Found {len(ratings)} ratings{more}")
     
     def clear_filter(self):
         """Clear filter fields and reload all ratings"""
         self.user_id_var.set("")
         self.isbn_var.set("")
         self.min_rating_var.set("")
+        self.pager.set_fetch(ratings_dao.get_ratings)
         self.load_ratings()
     
     def add_rating(self):
@@ -197,12 +214,11 @@ class RatingsTab:
         
         if messagebox.askyesno("Confirm Delete", 
                                f"Delete rating by '{username}' for '{book_title}'?"):
-            if ratings_dao.delete_rating(rating_id):
-                self.refresh()
-                messagebox.showinfo("Success", "Rating deleted successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to delete rating")
+            self.tasks.run_action(ratings_dao.delete_rating, rating_id, busy=self.busy,
+                                  then=lambda _: self.refresh(),
+                                  success="Rating deleted successfully!",
+                                  failure="Failed to delete rating")
     
     def refresh(self):
-        """Refresh the ratings list"""
-        self.clear_filter()
\ No newline at end of file
+        """Reload the page of ratings shown, keeping the current filter"""
+        self.pager_controls.reload()
\ No newline at end of file
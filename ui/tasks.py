@@ -0,0 +1,221 @@
+"""
+Background tasks
+Runs DAO calls on worker threads and hands the results back to the Tk main thread
+
+Tk is not thread-safe, so workers never touch widgets: finished tasks are
+queued and a root.after() poll on the main thread calls their callbacks.
+Tasks submitted with a key replace the unfinished task with the same key
+(a new search supersedes the previous one); the replaced task's callbacks
+are never called. A query that is already running is not interrupted - its
+connection goes back to the pool when it finishes and the result is dropped.
+"""
+
+import queue
+import threading
+import traceback
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, messagebox
+from config import TASK_CONFIG
+
+
+class BusyIndicator:
+    """'Loading...' label and an indeterminate progress bar, active while any of its tasks runs"""
+
+    def __init__(self, parent, text="Loading..."):
+        self.text = text
+        self.frame = ttk.Frame(parent)
+        self.label = ttk.Label(self.frame, text="", width=len(text) + 1)
+        self.label.pack(side=tk.LEFT)
+        self.progress = ttk.Progressbar(self.frame, mode='indeterminate', length=80)
+        self.progress.pack(side=tk.LEFT, padx=(5, 0))
+        self._count = 0
+
+    def start(self):
+        self._count += 1
+        if self._count == 1:
+            self.label.config(text=self.text)
+            self.progress.start(15)
+
+    def stop(self):
+        self._count = max(0, self._count - 1)
+        if self._count == 0:
+            self.label.config(text="")
+            self.progress.stop()
+
+
+class Task:
+    """A submitted call; cancel() drops it before its callbacks run"""
+
+    def __init__(self, runner, key, on_done, on_error, busy):
+        self.runner = runner
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.busy = busy
+        self.future = None
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self):
+        """Drop the task (Tk thread only); a call that has not started yet is skipped"""
+        if self.finished:
+            return
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+        self.runner._release(self)
+
+
+class TaskRunner:
+    """
+    Thread pool for DAO calls made from the UI
+
+    Args:
+        widget: Widget whose after() polls for finished tasks (usually the root)
+        workers: Worker threads (each uses at most one pooled connection at a time)
+        poll_ms: Milliseconds between polls while tasks are outstanding
+    """
+
+    def __init__(self, widget, workers=TASK_CONFIG['workers'], poll_ms=TASK_CONFIG['poll_ms']):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ui-task')
+        self._finished = queue.Queue()
+        self._active = set()
+        self._by_key = {}
+        self._polling = False
+        self._closed = False
+        self._main_thread = threading.current_thread()
+
+    def submit(self, fn, *args, key=None, on_done=None, on_error=None, busy=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker thread (call from the Tk thread)
+
+        Args:
+            fn: Function to run, typically a DAO call
+            key: Tasks with the same key supersede each other (e.g. the tab's list load)
+            on_done: Callback(result), run on the Tk thread
+            on_error: Callback(exception), run on the Tk thread (default: error dialog)
+            busy: BusyIndicator shown while the task is outstanding
+
+        Returns:
+            The Task
+        """
+        assert threading.current_thread() is self._main_thread, "submit() from the Tk thread only"
+        if self._closed:
+            return None
+        if key is not None and key in self._by_key:
+            self._by_key[key].cancel()
+
+        task = Task(self, key, on_done, on_error or self.report_error, busy)
+        self._active.add(task)
+        if key is not None:
+            self._by_key[key] = task
+        if busy is not None:
+            busy.start()
+        task.future = self.pool.submit(self._run, task, fn, args, kwargs)
+        self._schedule()
+        return task
+
+    def run_action(self, fn, *args, success=None, failure=None, then=None, busy=None,
+                   on_error=None, **kwargs):
+        """
+        Run a DAO write that returns a truthy value on success and report the outcome
+
+        Args:
+            fn: DAO function to call with args and kwargs
+            success: Message shown when fn succeeded
+            failure: Message shown when fn returned a falsy value
+            then: Callback(result) run on success, before the message (e.g. a reload)
+            busy: BusyIndicator shown while fn runs
+            on_error: Callback(exception) if fn raised (default: error dialog)
+        """
+        def done(result):
+            if result:
+                if then is not None:
+                    then(result)
+                if success:
+                    messagebox.showinfo("Success", success)
+            elif failure:
+                messagebox.showerror("Error", failure)
+        return self.submit(fn, *args, on_done=done, on_error=on_error, busy=busy, **kwargs)
+
+    def cancel(self, key):
+        """Drop the outstanding task with this key, if any"""
+        task = self._by_key.get(key)
+        if task is not None:
+            task.cancel()
+
+    def busy(self, key):
+        """True while a task with this key is outstanding"""
+        return key in self._by_key
+
+    def pending(self):
+        """Number of outstanding tasks"""
+        return len(self._active)
+
+    def _run(self, task, fn, args, kwargs):
+        # Worker thread: no Tk calls here
+        if task.cancelled:
+            return
+        try:
+            self._finished.put((task, fn(*args, **kwargs), None))
+        except Exception as e:
+            self._finished.put((task, None, e))
+
+    def _schedule(self):
+        if self._polling or self._closed:
+            return
+        try:
+            self.widget.after(self.poll_ms, self._poll)
+            self._polling = True
+        except tk.TclError:
+            # The window is gone
+            self._closed = True
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                task, result, error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task, result, error)
+        if self._active:
+            self._schedule()
+
+    def _release(self, task):
+        """Forget a task and stop its busy indicator (once)"""
+        if task.finished:
+            return
+        task.finished = True
+        self._active.discard(task)
+        if task.key is not None and self._by_key.get(task.key) is task:
+            del self._by_key[task.key]
+        if task.busy is not None:
+            try:
+                task.busy.stop()
+            except tk.TclError:
+                pass
+
+    def _deliver(self, task, result, error):
+        if task.cancelled:
+            return
+        self._release(task)
+        if error is not None:
+            task.on_error(error)
+        elif task.on_done is not None:
+            task.on_done(result)
+
+    def report_error(self, error):
+        """Default error callback: print the traceback and show the message"""
+        traceback.print_exception(type(error), error, error.__traceback__)
+        messagebox.showerror("Error", f"Operation failed:\n{error}")
+
+    def shutdown(self):
+        """Stop polling and drop queued tasks; running calls finish in the background"""
+        self._closed = True
+        for task in list(self._active):
+            task.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
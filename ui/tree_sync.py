@@ -0,0 +1,99 @@
+"""
+Keyed Treeview updates
+Bring a Treeview in line with a new list of rows by primary key instead of clearing it
+
+Each row's item id is its key, so a refresh only inserts the new rows,
+rewrites the rows whose values changed, moves the rows whose position
+changed and deletes the rest. Untouched items keep their selection and the
+tree keeps its scroll position; refreshing after a one-row edit touches one row.
+"""
+
+
+def item_id(key):
+    """Treeview item id for a row key (tuples are joined, e.g. ('general', 7) -> 'general:7')"""
+    if isinstance(key, tuple):
+        return ':'.join(str(part) for part in key)
+    return str(key)
+
+
+class TreeSync:
+    """
+    Keeps a Treeview showing a list of rows, keyed by primary key
+
+    Args:
+        tree: The ttk.Treeview (its items should only be added through this object)
+        key: Function returning a row's primary key (e.g. lambda book: book['ISBN'])
+        values: Function returning a row's displayed values
+        tags: Optional function returning a row's item tags
+    """
+
+    def __init__(self, tree, key, values, tags=None):
+        self.tree = tree
+        self.key = key
+        self.values = values
+        self.tags = tags
+        self.shown = {}     # item id -> (values, tags) as last written
+
+    def update(self, rows):
+        """
+        Show rows, in order, changing only what differs from what is displayed
+
+        Returns:
+            Dict with the number of items inserted, updated, moved and removed
+        """
+        tree = self.tree
+        wanted = {}
+        order = []
+        for position, row in enumerate(rows or ()):
+            key = self.key(row)
+            iid = item_id(key) if key is not None else f"#row{position}"
+            if iid in wanted:
+                # Rows without a unique key get a distinct id rather than overwriting each other
+                iid = f"{iid}#{position}"
+            wanted[iid] = (tuple(self.values(row)), tuple(self.tags(row)) if self.tags else ())
+            order.append(iid)
+
+        counts = {'inserted': 0, 'updated': 0, 'moved': 0, 'removed': 0}
+
+        removed = [iid for iid in self.shown if iid not in wanted]
+        if removed:
+            tree.delete(*removed)
+            for iid in removed:
+                del self.shown[iid]
+            counts['removed'] = len(removed)
+        kept = len(self.shown)
+
+        # Walk the wanted order against the current one; an item already in
+        # place is left alone, anything else is inserted or moved to its slot
+        current = tree.get_children() if self.shown else ()
+        moved = set()
+        cursor = 0
+        for position, iid in enumerate(order):
+            while cursor < len(current) and current[cursor] in moved:
+                cursor += 1
+            row_values, row_tags = wanted[iid]
+            if iid not in self.shown:
+                tree.insert("", position, iid=iid, values=row_values, tags=row_tags)
+                counts['inserted'] += 1
+            else:
+                if cursor < len(current) and current[cursor] == iid:
+                    cursor += 1
+                else:
+                    tree.move(iid, "", position)
+                    moved.add(iid)
+                    counts['moved'] += 1
+                if self.shown[iid] != (row_values, row_tags):
+                    tree.item(iid, values=row_values, tags=row_tags)
+                    counts['updated'] += 1
+            self.shown[iid] = (row_values, row_tags)
+
+        if not kept and order:
+            # Entirely new contents (another page or search): start at the top
+            tree.yview_moveto(0)
+        return counts
+
+    def clear(self):
+        """Remove every item"""
+        if self.shown:
+            self.tree.delete(*self.shown)
+            self.shown.clear()
@@ -4,16 +4,21 @@ Handles user search, CRUD operations, and user statistics
 """
 
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, messagebox
 from db import users_dao
 from ui.dialogs import AddUserDialog, EditUserDialog, UserStatisticsDialog
+from ui.pagination import KeysetPager, PagerControls
+from ui.tasks import BusyIndicator, TaskRunner
+from ui.tree_sync import TreeSync
 
 
 class UsersTab:
-    def __init__(self, parent):
+    def __init__(self, parent, tasks=None):
         self.frame = ttk.Frame(parent, padding="10")
+        self.tasks = tasks or TaskRunner(self.frame)
+        self.pager = KeysetPager(users_dao.search_users, key=lambda user: user['username'])
         self.setup_ui()
-        self.load_users()
     
     def setup_ui(self):
         """Setup the UI components"""
@@ -76,6 +81,7 @@ class UsersTab:
         
         # Grid layout
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.rows = TreeSync(self.tree, key=lambda user: user.get('user_id'), values=self.user_values)
         vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
         hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
@@ -92,33 +98,38 @@ class UsersTab:
         ttk.Button(buttons_frame, text="View Statistics", command=self.view_statistics).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Refresh", command=self.refresh).pack(side=tk.RIGHT, padx=5)
         
+        self.busy = BusyIndicator(buttons_frame)
+        self.pager_controls = PagerControls(buttons_frame, self.pager, self.show_users,
+                                            tasks=self.tasks, busy=self.busy)
+        self.pager_controls.frame.pack(side=tk.RIGHT, padx=20)
+        self.busy.frame.pack(side=tk.RIGHT, padx=5)
+        
         # Bind double-click
         self.tree.bind("<Double-1>", lambda e: self.view_statistics())
     
-    def load_users(self, users=None):
-        """Load users into the table"""
+    def load_users(self, on_loaded=None):
+        """Load the first page of users for the current search (in the background)"""
+        self.pager_controls.load('first', on_loaded)
+    
+    def show_users(self, users):
+        """Show a page of users in the table (only changed rows are touched)"""
+        self.rows.update(users)
+    
+    def user_values(self, user):
+        """Table values for one user"""
         from datetime import datetime
         current_year = datetime.now().year
         
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        if users is None:
-            users = users_dao.search_users(limit=500)
-        
-        if users:
-            for user in users:
-                birth_year = user.get('birth_year')
-                age = current_year - birth_year if birth_year else 'N/A'
-                
-                self.tree.insert("", tk.END, values=(
-                    user.get('user_id', ''),
-                    user.get('username', ''),
-                    user.get('location', ''),
-                    birth_year or 'N/A',
-                    age
-                ))
+        birth_year = user.get('birth_year')
+        age = current_year - birth_year if birth_year else 'N/A'
+        
+        return (
+            user.get('user_id', ''),
+            user.get('username', ''),
+            user.get('location', ''),
+            birth_year or 'N/A',
+            age
+        )
     
     def search_users(self):
         """Search users based on filters"""
@@ -137,22 +148,28 @@ class UsersTab:
                 messagebox.showerror("Error", "Birth year must be a number")
                 return
         
-        users = users_dao.search_users(
+        self.pager.set_fetch(partial(
+            users_dao.search_users,
             username=username,
             location=location,
             min_birth_year=min_birth_year,
-            max_birth_year=max_birth_year,
-            limit=500
-        )
+            max_birth_year=max_birth_year
+        ))
         
-        self.load_users(users)
-        messagebox.showinfo("Search Results", f"Found {len(users) if users else 0} users")
+        # A new search replaces one that is still running
+        self.load_users(on_loaded=self.report_results)
+    
+    def report_results(self, users):
+        """Tell how many users the search found"""
+        more = " (more on the next pages)" if self.pager.has_next else ""
+        messagebox.showinfo("Search Results", f"Found {len(users)} users{more}")
     
     def clear_search(self):
         """Clear search fields and reload all users"""
         self.username_var.set("")
         self.location_var.set("")
         self.birth_year_var.set("")
+        self.pager.set_fetch(users_dao.search_users)
         self.load_users()
     
     def add_user(self):
@@ -190,11 +207,10 @@ class UsersTab:
         
         if messagebox.askyesno("Confirm Delete", 
                                f"Delete user '{username}'?\n\nThis will also delete all ratings and club memberships."):
-            if users_dao.delete_user(user_id):
-                self.refresh()
-                messagebox.showinfo("Success", "User deleted successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to delete user")
+            self.tasks.run_action(users_dao.delete_user, user_id, busy=self.busy,
+                                  then=lambda _: self.refresh(),
+                                  success="User deleted successfully!",
+                                  failure="Failed to delete user")
     
     def view_statistics(self):
         """View user statistics"""
@@ -209,5 +225,5 @@ class UsersTab:
         UserStatisticsDialog(self.frame, user_id)
     
     def refresh(self):
-        """Refresh the users list"""
-        self.clear_search()
\ No newline at end of file
+        """Reload the page of users shown, keeping the current search"""
+        self.pager_controls.reload()
\ No newline at end of file
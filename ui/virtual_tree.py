@@ -0,0 +1,295 @@
+"""
+Virtual tree view
+A Treeview that only holds items for the rows on screen and reads more rows as it scrolls
+
+The tree keeps one Tk item per visible line and rewrites their values when
+the view moves, so the item count stays the same whatever the result size.
+Rows come from a row source (db.row_source.QueryRowSource for a query read
+from the server on demand, ListRowSource below for rows already in memory);
+reads run on the task runner and the lines show a placeholder until they arrive.
+The vertical scrollbar is driven by hand: its range is the rows known so far,
+plus one page while more can still be read.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from config import VIRTUAL_TREE_CONFIG
+
+PLACEHOLDER = "..."
+
+
+def sort_key(value):
+    """Order numbers (and numeric text such as '4.50') numerically, then text"""
+    try:
+        return (0, float(value), '')
+    except (TypeError, ValueError):
+        return (1, 0, str(value).lower())
+
+
+def is_blank(value):
+    return value is None or value == '' or value == 'N/A'
+
+
+class ListRowSource:
+    """
+    Row source over a list that is already in memory (sorted in place on the client)
+
+    Args:
+        rows: The rows
+        columns: View column names, in the order row_mapper returns values
+        row_mapper: Function mapping a row to its displayed values (used as the sort key)
+    """
+
+    complete = True
+
+    def __init__(self, rows, columns, row_mapper):
+        self.rows = list(rows)
+        self.columns = list(columns)
+        self.row_mapper = row_mapper
+
+    def sortable(self, name):
+        return name in self.columns
+
+    def sort(self, name, descending=False):
+        index = self.columns.index(name)
+        keyed = [(self.row_mapper(row)[index], row) for row in self.rows]
+        # Blanks stay at the end in either direction
+        filled = [(value, row) for value, row in keyed if not is_blank(value)]
+        filled.sort(key=lambda pair: sort_key(pair[0]), reverse=descending)
+        self.rows = [row for _, row in filled] + [row for value, row in keyed if is_blank(value)]
+
+    def cached(self, index):
+        return self.rows[index] if index < len(self.rows) else None
+
+    def fetch(self, stop):
+        return len(self.rows)
+
+    def close(self):
+        pass
+
+
+class VirtualTree:
+    """
+    Scrollable table over a row source
+
+    Args:
+        parent: Parent widget
+        columns: Column names (headings)
+        source: Row source (see db.row_source)
+        row_mapper: Function mapping a row to the tuple of displayed values
+        tasks: TaskRunner used for reads
+        page_size: Rows read ahead of the view at a time
+        on_change: Callback(shown, total, complete) after the visible rows or row count change
+    """
+
+    def __init__(self, parent, columns, source, row_mapper, tasks,
+                 page_size=VIRTUAL_TREE_CONFIG['page_size'], on_change=None):
+        self.columns = list(columns)
+        self.source = source
+        self.row_mapper = row_mapper
+        self.tasks = tasks
+        self.page_size = page_size
+        self.on_change = on_change
+        self.offset = 0             # index of the first visible row
+        self.items = []             # one item per visible line, reused while scrolling
+        self.selected_index = None  # selection as a row index, so it survives scrolling
+        self.sorted_by = None
+        self.descending = False
+        self._rendering = False
+        self._fetch_key = ('virtual-tree', id(self))
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=self.columns, show="headings",
+                                 selectmode='browse', height=1)
+        self.vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        hsb = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+
+        for col in self.columns:
+            command = (lambda c=col: self.sort_by(c)) if source.sortable(col) else ''
+            self.tree.heading(col, text=col, command=command)
+            self.tree.column(col, width=100)
+
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.vsb.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        hsb.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page-up'), ('<Next>', 'page-down'),
+                          ('<Home>', 'home'), ('<End>', 'end')):
+            self.tree.bind(key, lambda e, step=step: self.move_selection(step))
+        self.frame.bind('<Destroy>', self.on_destroy)
+
+        self.render()
+
+    # ---- geometry ----
+
+    def visible_rows(self):
+        """Lines that fit in the tree's current height"""
+        height = self.tree.winfo_height()
+        box = self.tree.bbox(self.items[0]) if self.items else None
+        if box:
+            heading, row_height = box[1], box[3]
+        else:
+            heading, row_height = 25, int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        return max(1, (height - heading) // row_height)
+
+    def on_resize(self, event=None):
+        wanted = self.visible_rows()
+        if wanted != len(self.items):
+            while len(self.items) < wanted:
+                self.items.append(self.tree.insert("", tk.END, values=()))
+            while len(self.items) > wanted:
+                self.tree.delete(self.items.pop())
+            self.render()
+
+    # ---- scrolling ----
+
+    def total_rows(self):
+        """Scroll range: rows read so far, plus a page while more may follow"""
+        known = len(self.source.rows)
+        return known if self.source.complete else known + self.page_size
+
+    def yview(self, *args):
+        """Scrollbar command ('moveto', fraction) or ('scroll', n, 'units'/'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total_rows()))
+        elif args[0] == 'scroll':
+            count = int(args[1])
+            self.scroll(count * len(self.items) if args[2] == 'pages' else count)
+
+    def on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset):
+        last = max(0, self.total_rows() - len(self.items))
+        offset = max(0, min(offset, last))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def move_selection(self, step):
+        """Keyboard navigation by row index, scrolling the view along"""
+        total = len(self.source.rows)
+        if not total:
+            return "break"
+        current = self.selected_index if self.selected_index is not None else self.offset - 1
+        if step == 'page-up':
+            target = current - len(self.items)
+        elif step == 'page-down':
+            target = current + len(self.items)
+        elif step == 'home':
+            target = 0
+        elif step == 'end':
+            target = total - 1
+        else:
+            target = current + step
+        self.selected_index = max(0, min(target, total - 1))
+        if self.selected_index < self.offset:
+            self.scroll_to(self.selected_index)
+        elif self.selected_index >= self.offset + len(self.items):
+            self.scroll_to(self.selected_index - len(self.items) + 1)
+        self.render()
+        return "break"
+
+    # ---- rendering ----
+
+    def render(self):
+        """Write the visible rows into the reused items and read ahead if needed"""
+        self._rendering = True
+        try:
+            missing = False
+            for position, item in enumerate(self.items):
+                index = self.offset + position
+                row = self.source.cached(index)
+                if row is not None:
+                    self.tree.item(item, values=self.row_mapper(row))
+                elif self.source.complete:
+                    self.tree.item(item, values=())
+                else:
+                    self.tree.item(item, values=(PLACEHOLDER,))
+                    missing = True
+
+            selected = self.selected_index
+            if selected is not None and self.offset <= selected < self.offset + len(self.items) \
+                    and self.source.cached(selected) is not None:
+                self.tree.selection_set(self.items[selected - self.offset])
+            else:
+                self.tree.selection_set(())
+            self.tree.yview_moveto(0)
+        finally:
+            self._rendering = False
+
+        self.update_scrollbar()
+        # Read ahead of the view so scrolling on rarely waits
+        if missing or (not self.source.complete and
+                       self.offset + 2 * len(self.items) > len(self.source.rows)):
+            self.fetch(self.offset + len(self.items) + self.page_size)
+
+    def update_scrollbar(self):
+        total = self.total_rows()
+        if total:
+            first = self.offset / total
+            last = min(1.0, (self.offset + len(self.items)) / total)
+        else:
+            first, last = 0.0, 1.0
+        self.vsb.set(first, last)
+        if self.on_change is not None:
+            shown = min(len(self.items), max(0, len(self.source.rows) - self.offset))
+            self.on_change(shown, len(self.source.rows), self.source.complete)
+
+    def fetch(self, stop):
+        """Read rows up to stop in the background, then redraw"""
+        if self.tasks.busy(self._fetch_key):
+            return
+        self.tasks.submit(self.source.fetch, stop, key=self._fetch_key,
+                          on_done=lambda _: self.render())
+
+    # ---- selection and sorting ----
+
+    def on_select(self, event=None):
+        if self._rendering:
+            return
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            self.selected_index = self.offset + self.items.index(selection[0])
+        else:
+            self.selected_index = None
+
+    def selected_row(self):
+        """The selected row (from the source), or None"""
+        if self.selected_index is None:
+            return None
+        return self.source.cached(self.selected_index)
+
+    def sort_by(self, column):
+        """Sort by a column (again to reverse); a query source re-sorts on the server"""
+        if self.sorted_by == column:
+            self.descending = not self.descending
+        else:
+            self.sorted_by, self.descending = column, False
+        for col in self.columns:
+            arrow = (" ▼" if self.descending else " ▲") if col == column else ""
+            self.tree.heading(col, text=col + arrow)
+
+        self.tasks.cancel(self._fetch_key)
+        self.source.sort(column, self.descending)
+        self.offset = 0
+        self.selected_index = None
+        self.render()
+
+    def on_destroy(self, event):
+        if event.widget is self.frame:
+            self.tasks.cancel(self._fetch_key)
+            # Closing waits for a read in progress, so do it off the Tk thread
+            self.tasks.submit(self.source.close)